@@ -0,0 +1,267 @@
+"""
+Suíte de benchmarks reprodutível do pipeline financeiro.
+
+Mede o reader, as etapas do transformer e cada gerador em vários tamanhos
+de entrada sintética, compara com um baseline salvo e sinaliza regressões
+acima de um limite.
+
+Uso:
+    python -m benchmarks.run_benchmarks                      # compara com o baseline
+    python -m benchmarks.run_benchmarks --sizes 1000,10000
+    python -m benchmarks.run_benchmarks --update-baseline    # regrava o baseline
+    python -m benchmarks.run_benchmarks --currency-rows 10000000  # inclui a conversão de moeda
+    python -m benchmarks.run_benchmarks --anomaly-series 500      # inclui a detecção de anomalias
+    python -m benchmarks.run_benchmarks --forecast-series 1000    # inclui o ajuste da projeção mensal
+"""
+import argparse
+import json
+import logging
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASELINE_PADRAO = Path(__file__).with_name("baseline.json")
+TAMANHOS_PADRAO = (1_000, 10_000, 100_000)
+LIMITE_PADRAO = 0.25  # 25% mais lento que o baseline = regressão
+LINHAS_CAMBIO_PADRAO = 10_000_000
+SERIES_ANOMALIAS_PADRAO = 500
+SERIES_PREVISAO_PADRAO = 1_000
+
+
+# -----------------------------------------------------------
+# 1) Medição
+# -----------------------------------------------------------
+def time_call(func, repeat: int = 3) -> float:
+    """Retorna o melhor tempo (s) entre `repeat` execuções de func()."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_suite(sizes=TAMANHOS_PADRAO, files: int = 4, dirty_share: float = 0.1,
+              date_formats: dict = None, repeat: int = 3, seed: int = 42) -> dict:
+    """
+    Executa todos os casos para cada tamanho e retorna
+    {"<caso>@<tamanho>": segundos}.
+    """
+    from benchmarks.synthetic import generate_synthetic_frame, write_synthetic_workbooks
+    from src.reader import load_excel_files
+    from src.transformer import (
+        normalize_columns, consolidate, clean_and_convert, calculate_profit,
+        calculate_metrics, prepare_chart_data,
+    )
+    from src.excel_generator import generate_excel_report
+    from src.visualizer import ChartRenderer
+    from src.pdf_generator import PdfReportTemplate
+
+    results = {}
+    renderer = ChartRenderer()
+    template = PdfReportTemplate()
+
+    for rows in sizes:
+        df_raw = generate_synthetic_frame(rows, seed=seed, dirty_share=dirty_share, date_formats=date_formats)
+        parts = [df_raw.iloc[i::files].reset_index(drop=True) for i in range(files)]
+
+        df_clean = calculate_profit(clean_and_convert(normalize_columns(df_raw.copy())))
+        metrics = calculate_metrics(df_clean)
+        chart_data = prepare_chart_data(df_clean)
+        chart_png = renderer.render(chart_data)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            raw_dir = Path(tmp) / "raw"
+            write_synthetic_workbooks(str(raw_dir), rows, files=files, seed=seed,
+                                      dirty_share=dirty_share, date_formats=date_formats)
+
+            casos = {
+                "reader.load_excel_files": lambda: load_excel_files(str(raw_dir)),
+                "transformer.consolidate": lambda: consolidate([p.copy() for p in parts]),
+                "transformer.clean_and_convert": lambda: clean_and_convert(df_raw),
+                "transformer.calculate_profit": lambda: calculate_profit(df_clean.copy()),
+                "transformer.calculate_metrics": lambda: calculate_metrics(df_clean),
+                "transformer.prepare_chart_data": lambda: prepare_chart_data(df_clean),
+                "generator.excel": lambda: generate_excel_report(df_clean, tmp, "R$ #,##0.00", "dd/mm/yyyy"),
+                "generator.chart": lambda: renderer.render(chart_data),
+                "generator.pdf": lambda: template.render_to_bytes(metrics, chart=chart_png),
+            }
+
+            for nome, func in casos.items():
+                # O reader é o caso mais lento; uma repetição basta nos tamanhos maiores
+                n = 1 if nome.startswith("reader") and rows >= 100_000 else repeat
+                results[f"{nome}@{rows}"] = round(time_call(func, n), 6)
+                print(f"{nome:<34} {rows:>10,} linhas  {results[f'{nome}@{rows}']:.4f}s")
+
+    return results
+
+
+def run_currency_benchmark(rows: int = LINHAS_CAMBIO_PADRAO, repeat: int = 3, seed: int = 42) -> dict:
+    """
+    Mede a conversão de moeda (junção as-of com a tabela de cotações) em um
+    DataFrame já limpo de `rows` linhas, gerado direto em numpy (o gerador
+    de planilhas sintéticas seria lento demais nessa escala).
+    """
+    import numpy as np
+    import pandas as pd
+    from src.currency import RateTable, convert_currency
+
+    rng = np.random.default_rng(seed)
+    dias = pd.date_range("2020-01-01", "2024-12-31", freq="D")
+    moedas = np.array(["BRL", "USD", "EUR"])
+
+    rates = RateTable.from_frame(pd.DataFrame({
+        "data": np.tile(dias, 2),
+        "moeda": np.repeat(["USD", "EUR"], len(dias)),
+        "taxa": rng.uniform(4.5, 6.5, 2 * len(dias)),
+    }))
+    df = pd.DataFrame({
+        "data": dias[rng.integers(0, len(dias), rows)],
+        "faturamento": rng.integers(0, 500_000, rows) / 100,
+        "custos": rng.integers(0, 300_000, rows) / 100,
+        "moeda": pd.Categorical(moedas[rng.integers(0, len(moedas), rows)]),
+    })
+
+    seconds = round(time_call(lambda: convert_currency(df, rates), repeat), 6)
+    print(f"{'transformer.convert_currency':<34} {rows:>10,} linhas  {seconds:.4f}s")
+    return {f"transformer.convert_currency@{rows}": seconds}
+
+
+def run_anomaly_benchmark(series: int = SERIES_ANOMALIAS_PADRAO, days: int = 730,
+                          repeat: int = 3, seed: int = 42) -> dict:
+    """
+    Mede a detecção de anomalias com `series` filiais (uma linha por filial
+    e dia ao longo de `days` dias), da montagem da matriz ao z-score robusto.
+    """
+    import numpy as np
+    import pandas as pd
+    from src.anomalies import detect_anomalies
+
+    rng = np.random.default_rng(seed)
+    dias = pd.date_range("2023-01-01", periods=days, freq="D")
+    df = pd.DataFrame({
+        "data": np.repeat(dias, series),
+        "filial": np.tile(np.char.add("f", np.arange(series).astype(str)), days),
+        "faturamento": rng.gamma(4.0, 250.0, days * series),
+    })
+    chart_data = df.groupby("data", as_index=False)[["faturamento"]].sum()
+
+    seconds = round(time_call(lambda: detect_anomalies(df, chart_data, ["filial"]), repeat), 6)
+    print(f"{'anomalies.detect_anomalies':<34} {series:>10,} séries  {seconds:.4f}s")
+    return {f"anomalies.detect_anomalies@{series}": seconds}
+
+
+def run_forecast_benchmark(series: int = SERIES_PREVISAO_PADRAO, months: int = 36,
+                           repeat: int = 3, seed: int = 42) -> dict:
+    """
+    Mede o ajuste em lote da projeção (tendência + sazonalidade) de
+    faturamento e lucro para `series` filiais com `months` meses de
+    histórico: o agregado mensal já pronto e só a montagem do sistema e a
+    resolução por mínimos quadrados cronometradas.
+    """
+    import numpy as np
+    from src.forecast import design_matrix, fit_batched
+
+    rng = np.random.default_rng(seed)
+    t = np.arange(months)
+    # Faturamento e lucro de cada filial lado a lado, como em forecast_series
+    Y = (rng.uniform(1e4, 1e5, 2 * series) * (1 + 0.01 * t[:, None])
+         * (1 + 0.1 * np.sin(2 * np.pi * t[:, None] / 12)) + rng.normal(0, 500, (months, 2 * series)))
+    X = design_matrix(t)
+    mask = np.ones(Y.shape, dtype=bool)
+    active = np.ones((Y.shape[1], X.shape[1]), dtype=bool)
+
+    seconds = round(time_call(lambda: fit_batched(X, Y, mask, active), repeat), 6)
+    print(f"{'forecast.fit_batched':<34} {series:>10,} séries  {seconds:.4f}s")
+    return {f"forecast.fit_batched@{series}": seconds}
+
+
+# -----------------------------------------------------------
+# 2) Baseline e detecção de regressões
+# -----------------------------------------------------------
+def compare_to_baseline(results: dict, baseline: dict, threshold: float = LIMITE_PADRAO) -> list:
+    """
+    Compara os tempos atuais com o baseline. Retorna a lista de regressões
+    [(caso, baseline_s, atual_s, razão)] com razão acima de 1 + threshold.
+    Casos ausentes no baseline são ignorados.
+    """
+    regressions = []
+    for case, current in results.items():
+        reference = baseline.get(case)
+        if not reference:
+            continue
+        ratio = current / reference
+        if ratio > 1 + threshold:
+            regressions.append((case, reference, current, ratio))
+    return regressions
+
+
+def load_baseline(path: Path) -> dict:
+    if not path.exists():
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f).get("results", {})
+
+
+def save_baseline(path: Path, results: dict):
+    payload = {
+        "machine": {"python": platform.python_version(), "platform": platform.platform()},
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks do pipeline financeiro")
+    parser.add_argument("--sizes", default=",".join(map(str, TAMANHOS_PADRAO)),
+                        help="Tamanhos (linhas) separados por vírgula")
+    parser.add_argument("--files", type=int, default=4, help="Número de planilhas por tamanho")
+    parser.add_argument("--dirty-share", type=float, default=0.1, help="Fração de valores monetários sujos")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetições por caso (melhor tempo)")
+    parser.add_argument("--threshold", type=float, default=LIMITE_PADRAO, help="Limite de regressão (0.25 = 25%%)")
+    parser.add_argument("--currency-rows", type=int, default=None,
+                        help=f"Também mede a conversão de moeda nesse tamanho (ex.: {LINHAS_CAMBIO_PADRAO})")
+    parser.add_argument("--anomaly-series", type=int, default=None,
+                        help=f"Também mede a detecção de anomalias com N séries (ex.: {SERIES_ANOMALIAS_PADRAO})")
+    parser.add_argument("--forecast-series", type=int, default=None,
+                        help=f"Também mede o ajuste da projeção com N séries (ex.: {SERIES_PREVISAO_PADRAO})")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PADRAO)
+    parser.add_argument("--update-baseline", action="store_true", help="Regrava o baseline com os tempos atuais")
+    args = parser.parse_args(argv)
+
+    # Os logs INFO do pipeline poluiriam a saída e distorceriam as medições;
+    # os demais vão para um log temporário (nem console nem data/reports/logs.txt)
+    from src.logger import configure_logging
+    logging.disable(logging.INFO)
+    configure_logging(path=str(Path(tempfile.gettempdir()) / "financial_benchmarks.log"), console=False)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    results = run_suite(sizes, files=args.files, dirty_share=args.dirty_share, repeat=args.repeat)
+    if args.currency_rows:
+        results.update(run_currency_benchmark(args.currency_rows, repeat=args.repeat))
+    if args.anomaly_series:
+        results.update(run_anomaly_benchmark(args.anomaly_series, repeat=args.repeat))
+    if args.forecast_series:
+        results.update(run_forecast_benchmark(args.forecast_series, repeat=args.repeat))
+
+    if args.update_baseline:
+        save_baseline(args.baseline, results)
+        print(f"Baseline atualizado: {args.baseline}")
+        return 0
+
+    regressions = compare_to_baseline(results, load_baseline(args.baseline), args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regressão(ões) acima de {args.threshold:.0%}:")
+        for case, reference, current, ratio in regressions:
+            print(f"  {case}: {reference:.4f}s -> {current:.4f}s ({ratio:.2f}x)")
+        return 1
+
+    print("\nNenhuma regressão acima do limite.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+# Formatos de data suportados pelo gerador e seus pesos padrão
+FORMATOS_DATA_PADRAO = {"iso": 0.6, "br": 0.3, "datetime": 0.1}
+
+
+# -----------------------------------------------------------
+# 1) Geração determinística de dados financeiros sintéticos
+# -----------------------------------------------------------
+def generate_synthetic_frame(
+    rows: int,
+    seed: int = 42,
+    dirty_share: float = 0.1,
+    date_formats: dict = None,
+    start_date: str = "2020-01-01",
+    days: int = 365 * 3,
+) -> pd.DataFrame:
+    """
+    Gera um DataFrame "bruto" no formato das planilhas de entrada
+    (colunas data, faturamento, custos), de forma determinística pelo `seed`.
+
+    - dirty_share: fração das células de faturamento/custos escritas como
+      texto "sujo" (ex.: "R$1520.30", "1520,30", " 1520.30 ").
+    - date_formats: pesos da mistura de formatos de data
+      ({"iso": "2024-01-31", "br": "31/01/2024", "datetime": objeto datetime}).
+    """
+    rng = np.random.default_rng(seed)
+    date_formats = date_formats or FORMATOS_DATA_PADRAO
+
+    dates = pd.Timestamp(start_date) + pd.to_timedelta(rng.integers(0, days, rows), unit="D")
+    faturamento = np.round(rng.gamma(2.0, 500.0, rows), 2)
+    custos = np.round(faturamento * rng.uniform(0.3, 0.9, rows), 2)
+
+    # Mistura de formatos de data (vetorizada por máscara)
+    nomes = list(date_formats)
+    pesos = np.array([date_formats[n] for n in nomes], dtype=float)
+    escolha = rng.choice(len(nomes), size=rows, p=pesos / pesos.sum())
+
+    data_col = pd.Series(dates.to_pydatetime(), dtype=object)
+    formatos = {"iso": "%Y-%m-%d", "br": "%d/%m/%Y"}
+    for i, nome in enumerate(nomes):
+        mask = escolha == i
+        if nome in formatos and mask.any():
+            data_col[mask] = dates[mask].strftime(formatos[nome])
+
+    return pd.DataFrame({
+        "data": data_col,
+        "faturamento": _sujar_valores(faturamento, dirty_share, rng),
+        "custos": _sujar_valores(custos, dirty_share, rng),
+    })
+
+
+def _sujar_valores(values: np.ndarray, dirty_share: float, rng) -> pd.Series:
+    """Converte uma fração dos valores em strings monetárias 'sujas'."""
+    series = pd.Series(values, dtype=object)
+    dirty = rng.random(len(values)) < dirty_share
+    if not dirty.any():
+        return series
+
+    texto = pd.Series(values[dirty]).map("{:.2f}".format)
+    estilo = rng.integers(0, 3, int(dirty.sum()))
+    texto = np.where(estilo == 0, "R$" + texto,
+             np.where(estilo == 1, texto.str.replace(".", ",", regex=False), " " + texto + " "))
+    series[dirty] = texto
+    return series
+
+
+# -----------------------------------------------------------
+# 2) Escrita das planilhas sintéticas
+# -----------------------------------------------------------
+def write_synthetic_workbooks(
+    folder: str,
+    rows: int,
+    files: int = 1,
+    seed: int = 42,
+    dirty_share: float = 0.1,
+    date_formats: dict = None,
+) -> list:
+    """
+    Escreve `files` planilhas .xlsx em `folder`, totalizando `rows` linhas.
+    Retorna a lista de caminhos criados.
+    """
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+
+    df = generate_synthetic_frame(rows, seed=seed, dirty_share=dirty_share, date_formats=date_formats)
+    paths = []
+
+    for i, part in enumerate(np.array_split(np.arange(rows), files)):
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Dados")
+        ws.append(list(df.columns))
+        for row in df.iloc[part].itertuples(index=False):
+            ws.append(list(row))
+
+        path = folder / f"sintetico_{i:03d}.xlsx"
+        wb.save(path)
+        paths.append(str(path))
+
+    return paths
@@ -1,37 +1,93 @@
-import pandas as pd
-import yaml
+import argparse
+import json
 import os
-from src.reader import load_excel_files, validate_columns
-from src.transformer import process_pipeline
-from src.excel_generator import generate_excel_report
-from src.visualizer import generate_plot
-from src.pdf_generator import generate_pdf_report_advanced
-from src.logger import get_logger
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import ExitStack
+from datetime import datetime
+
+# ⚡ Apenas módulos leves no nível do módulo. Dependências pesadas (pandas,
+# yaml, openpyxl, matplotlib, xlsxwriter, reportlab) são importadas dentro
+# das etapas que as usam, para que etapas não selecionadas não paguem o custo.
+from src.scheduler import Stage, run_stages, STATUS_OK
+from src.instrumentation import RunProfiler, stage
+from src.logger import configure_logging, get_logger, set_log_file
 
 logger = get_logger()
 
+# Etapas selecionáveis pela linha de comando
+ETAPAS = ("process", "reports")
+FORMATOS = ("chart", "excel", "pdf")
+
+
+def _generate_artifact(cache, name, key_parts, output_path, generate):
+    """
+    Gera um artefato, reutilizando a saída anterior quando o cache está
+    habilitado e as entradas (key_parts) não mudaram desde a última execução.
+    """
+    if cache is None:
+        generate()
+        return False
+
+    from src.cache import hash_inputs
+    return cache.run(name, hash_inputs(*key_parts), output_path, generate)
 
-def run_pipeline():
+
+def run_pipeline(config_path: str = "config.yaml", only: str = None, formats=None, file_cache: dict = None,
+                 storage=None):
+    """
+    Executa o pipeline financeiro.
+
+    - only: None (tudo), "process" (apenas o dataset consolidado) ou
+      "reports" (apenas os relatórios, sem regravar o dataset consolidado).
+    - formats: relatórios a gerar entre "chart", "excel" e "pdf" (padrão: todos).
+      O PDF inclui o gráfico, portanto pedir "pdf" também gera o gráfico.
+    - file_cache: cache de planilhas já lidas mantido entre execuções (modo watch).
+    - storage: armazenamento de todos os caminhos do config (padrão: disco
+      local). Com src.storage.MemoryStorage o pipeline roda sem disco:
+      config, planilhas, relatórios, dataset, índice e estado ficam em
+      memória; o cache de artefatos e o SQLite (que exigem arquivos locais)
+      são desativados, e o log do processo não é redirecionado.
+
+    Retorna o status da execução: "ok", "partial" (alguma etapa de saída
+    falhou ou algum arquivo foi para a quarentena), "empty", "no_data" ou "failed".
+    """
     logger.info("Iniciando processamento financeiro...")
 
+    from src.storage import LocalStorage, get_storage
+    storage = get_storage(storage)
+    local = isinstance(storage, LocalStorage)
+
+    run_process = only in (None, "process")
+    selected_formats = set(FORMATOS if formats is None else formats) if only in (None, "reports") else set()
+    if "pdf" in selected_formats:
+        selected_formats.add("chart")
+
     # Variáveis críticas inicializadas como None (boa prática para contexto de erro)
     config = None
-    
+    status = "failed"
+    profiler = None
+    run_reports_dir = None
+    ingestion, tolerant = None, False
+    exit_stack = ExitStack()
+
     try:
         # -------------------------------------------------------
         # 1) Carregar config.yaml e NOVA SEÇÃO (Com Tratamento Graceful)
         # -------------------------------------------------------
+        import yaml
+
         try:
-            with open("config.yaml", "r", encoding="utf-8") as f:
+            with storage.open(config_path, "r") as f:
                 config = yaml.safe_load(f)
         except FileNotFoundError:
             # 🛑 TRATAMENTO GRACEFUL: YAML não encontrado
-            logger.critical("ERRO CRÍTICO: Arquivo 'config.yaml' não encontrado. Verifique se o arquivo existe no diretório raiz.")
-            return # Encerra a função
+            logger.critical(f"ERRO CRÍTICO: Arquivo '{config_path}' não encontrado. Verifique se o arquivo existe no diretório raiz.")
+            return status # Encerra a função
         except yaml.YAMLError as ye:
             # 🛑 TRATAMENTO GRACEFUL: Erro de sintaxe no YAML
-            logger.critical(f"ERRO CRÍTICO: Falha ao analisar 'config.yaml'. Verifique a sintaxe (indentação, chaves, etc.). Detalhe: {ye}")
-            return # Encerra a função
+            logger.critical(f"ERRO CRÍTICO: Falha ao analisar '{config_path}'. Verifique a sintaxe (indentação, chaves, etc.). Detalhe: {ye}")
+            return status # Encerra a função
 
         # Carregamento e Fallback
         paths = config.get("paths", {})
@@ -44,111 +100,688 @@ def run_pipeline():
         report_settings = config.get("report_settings", {})
         currency_format = report_settings.get("currency_format", "R$ #,##0.00")
         date_format = report_settings.get("date_format", "dd/mm/yyyy")
+        pdf_title = report_settings.get("pdf_title", "Relatório Financeiro Consolidado")
+        chart_max_points = report_settings.get("chart_max_points", 1000)
+
+        dimension_columns = config.get("columns", {}).get("dimensions") or []
+        store_settings = config.get("processed_store", {})
+        sqlite_settings = config.get("sqlite", {})
+        cache_settings = config.get("cache", {})
+        budget_settings = config.get("memory_budget") or {}
+        ingestion_settings = config.get("ingestion") or {}
+        currency_settings = config.get("currency") or {}
+        validation_settings = config.get("validation") or {}
+        sketch_settings = config.get("sketches") or {}
+        anomaly_settings = config.get("anomalies") or {}
+        forecast_settings = config.get("forecast") or {}
+        max_workers = config.get("execution", {}).get("max_workers", 4)
+        instrumentation_settings = config.get("instrumentation", {})
         
         # 🛑 TRATAMENTO GRACEFUL: Chaves essenciais ausentes
         if not raw_path or not reports_path or not processed_path or not required_columns:
              logger.critical("ERRO CRÍTICO: Chaves essenciais de configuração ('paths' ou 'columns') estão ausentes ou incompletas no config.yaml.")
-             return 
+             return status
+
+        # Log com rotação/JSON conforme a seção `logging` (arquivo padrão: <paths.reports>/logs.txt)
+        log_settings = config.get("logging")
+        if log_settings and local:
+            configure_logging(**{"path": os.path.join(reports_path, "logs.txt"), **log_settings})
 
         logger.info("config.yaml carregado e verificado.")
 
         # -------------------------------------------------------
         # 1.5) Garantir que os diretórios de saída existam
         # -------------------------------------------------------
-        os.makedirs(reports_path, exist_ok=True)
-        os.makedirs(processed_path, exist_ok=True)
+        storage.makedirs(reports_path)
+        storage.makedirs(processed_path)
         logger.info("Diretórios de saída verificados/criados.")
-        
+
+        cache = None
+        if cache_settings.get("enabled", False) and local:
+            from src.cache import ArtifactCache
+            cache = ArtifactCache(cache_settings.get("dir", "data/cache"))
+
+        # Instrumentação por etapa (tempo, CPU, memória, linhas) com relatório JSON
+        if instrumentation_settings.get("enabled", False):
+            run_reports_dir = instrumentation_settings.get(
+                "reports_dir", os.path.join(reports_path, "run_reports")
+            )
+            profiler = exit_stack.enter_context(RunProfiler(
+                trace_memory=instrumentation_settings.get("trace_memory", False),
+                profile_stage=instrumentation_settings.get("profile_stage"),
+            ))
+
         # -------------------------------------------------------
         # 2) Carregar arquivos Excel brutos e validar
         # -------------------------------------------------------
-        try:
-            files = load_excel_files(raw_path)
+        from src.reader import load_excel_files, quarantine_file, validate_columns
+        from src.transformer import consolidate, process_consolidated, process_pipeline
+
+        # Modo de ingestão: "strict" (padrão, interrompe no primeiro arquivo
+        # inválido) ou "tolerant" (isola arquivos inválidos na quarentena)
+        tolerant = ingestion_settings.get("mode", "strict") == "tolerant"
+        quarantine_dir = ingestion_settings.get("quarantine_dir", os.path.join("data", "quarantine"))
+        ingestion = {"loaded": [], "quarantined": []}
+
+        def load_and_validate(names=None):
+            with stage("load_excel_files") as s:
+                files = load_excel_files(
+                    raw_path, file_cache=file_cache, only=names,
+                    strict=not tolerant, quarantine_dir=quarantine_dir, summary=ingestion,
+                    storage=storage,
+                )
+                s.rows_out = sum(len(df) for df in files.values())
             logger.info(f"{len(files)} arquivos carregados.")
+
+            valid = []
+            with stage("validate_columns", rows_in=sum(len(df) for df in files.values())) as s:
+                for name, df in files.items():
+                    try:
+                        validate_columns(df, required_columns)
+                        valid.append(df)
+                        logger.info("Arquivo validado: %s", name)
+                    except ValueError as ve:
+                        logger.warning(f"Arquivo ignorado devido a colunas ausentes: {name}. Erro: {ve}")
+                        if tolerant:
+                            ingestion["loaded"].remove(name)
+                            ingestion["quarantined"].append(
+                                quarantine_file(os.path.join(raw_path, name), quarantine_dir, ve, storage)
+                            )
+                            if file_cache is not None:
+                                file_cache.pop(name, None)
+                    except Exception as e:
+                        logger.error(f"Erro inesperado na validação do arquivo {name}: {e}")
+                s.rows_out = sum(len(df) for df in valid)
+            return valid
+
+        try:
+            # Plano de memória: estratégia de leitura, lotes e workers
+            plan, batched = None, False
+            if budget_settings.get("limit_mb"):
+                from src.planner import ESTRATEGIA_LOTES, plan_execution
+                with stage("plan"):
+                    plan = plan_execution(
+                        raw_path,
+                        budget_mb=budget_settings["limit_mb"],
+                        max_workers=max_workers,
+                        sample_rows=budget_settings.get("sample_rows", 200),
+                        peak_factor=budget_settings.get("peak_factor", 3.0),
+                        storage=storage,
+                    )
+                max_workers = plan.workers
+                batched = plan.strategy == ESTRATEGIA_LOTES
+                if profiler is not None:
+                    profiler.extra["plan"] = plan.to_dict()
+
+            if batched:
+                # Cada lote é lido, validado e consolidado; os brutos são liberados antes do próximo
+                dfs = []
+                for i, batch in enumerate(plan.batches, start=1):
+                    logger.info("Lote %d/%d: %d arquivo(s).", i, len(plan.batches), len(batch))
+                    valid = load_and_validate(names=batch)
+                    if valid:
+                        with stage("consolidate", rows_in=sum(len(df) for df in valid)) as s:
+                            dfs.append(consolidate(valid))
+                            s.rows_out = len(dfs[-1])
+                    del valid
+            else:
+                dfs = load_and_validate()
         except FileNotFoundError:
             # 🛑 TRATAMENTO GRACEFUL: Diretório RAW não encontrado
             logger.critical(f"ERRO CRÍTICO: Diretório de dados brutos não encontrado: '{raw_path}'. Crie o diretório e adicione os arquivos.")
-            return
-
-        dfs = []
-
-        for name, df in files.items():
-            try:
-                validate_columns(df, required_columns)
-                dfs.append(df)
-                logger.info(f"Arquivo validado: {name}")
-            except ValueError as ve:
-                logger.warning(f"Arquivo ignorado devido a colunas ausentes: {name}. Erro: {ve}")
-            except Exception as e:
-                logger.error(f"Erro inesperado na validação do arquivo {name}: {e}")
+            return status
 
         # -------------------------------------------------------
         # 3) Verificação de Continuidade
         # -------------------------------------------------------
         if not dfs:
             logger.warning("Nenhum DataFrame válido para processamento após validação. Encerrando pipeline.")
-            return 
+            status = "no_data"
+            return status
 
         # -------------------------------------------------------
         # 4) Processamento completo (transformer.py)
         # -------------------------------------------------------
-        df_final, metrics, chart_data = process_pipeline(dfs)
+        convert = None
+        if currency_settings.get("enabled", False):
+            # Conversão para a moeda base pela cotação do dia (ou a anterior mais recente)
+            from functools import partial
+            from src.currency import COL_MOEDA, MOEDA_BASE_PADRAO, convert_currency, load_rates
+            rates = load_rates(
+                currency_settings.get("rates_path", "data/rates/cotacoes.csv"),
+                cache_dir=cache_settings.get("dir", "data/cache") if cache is not None else None,
+                storage=storage,
+            )
+            convert = partial(
+                convert_currency, rates=rates,
+                base=currency_settings.get("base", MOEDA_BASE_PADRAO),
+                currency_col=currency_settings.get("column", COL_MOEDA),
+            )
 
-        # Salvar DataFrame processado
-        processed_file = os.path.join(processed_path, "dados_processados.xlsx")
-        df_final.to_excel(processed_file, index=False)
-        logger.info(f"Arquivo consolidado salvo em: {processed_file}")
+        validate = None
+        if validation_settings.get("enabled", False):
+            # Regras de negócio do config.yaml avaliadas sobre o consolidado
+            from functools import partial
+            from src.rules import ACAO_RELATORIO, RuleSet, apply_rules, default_report_path
+            validation_summary = {}
+            validate = partial(
+                apply_rules,
+                ruleset=RuleSet.from_config(validation_settings.get("rules")),
+                action=validation_settings.get("action", ACAO_RELATORIO),
+                report_path=validation_settings.get("report", default_report_path(reports_path)),
+                storage=storage,
+                summary=validation_summary,
+            )
+            if profiler is not None:
+                profiler.extra["validation"] = validation_summary
 
-        # -------------------------------------------------------
-        # 5) Verificação de Dados Finais
-        # -------------------------------------------------------
-        if df_final.empty:
-            logger.warning("DataFrame final vazio após consolidação e limpeza. Relatórios não serão gerados.")
-            return 
+        sketches = None
+        if sketch_settings.get("enabled", False):
+            # Quantis do ticket e top-N aproximados (mescláveis, alimentados em
+            # blocos de chunk_rows). No plano em lotes também são alimentados
+            # pelo consolidado final: conversão e regras (ex.: action "drop")
+            # rodam sobre ele, e os lotes são concatenados antes disso.
+            from src.sketches import CAPACIDADE_PADRAO, COMPRESSAO_PADRAO, MetricSketches
+            sketches = MetricSketches(
+                dimensions=sketch_settings.get("dimensions") or [],
+                top_n=sketch_settings.get("top_n", 10),
+                compression=sketch_settings.get("compression", COMPRESSAO_PADRAO),
+                capacity=sketch_settings.get("capacity", CAPACIDADE_PADRAO),
+                chunk_rows=sketch_settings.get("chunk_rows", 1_000_000),
+            )
+
+        with stage("process_pipeline", rows_in=sum(len(df) for df in dfs)) as s:
+            if batched:
+                import pandas as pd
+                df_final, metrics, chart_data = process_consolidated(
+                    pd.concat(dfs, ignore_index=True), convert, validate, sketches
+                )
+            else:
+                df_final, metrics, chart_data = process_pipeline(dfs, convert, validate, sketches)
+            s.rows_out = len(df_final)
+
+        if sketches is not None:
+            from src.sketches import ARQUIVO_SKETCHES, write_sketch_report
+            sketch_summary = write_sketch_report(
+                sketches, sketch_settings.get("report", os.path.join(reports_path, ARQUIVO_SKETCHES)), storage
+            )
+            if profiler is not None:
+                profiler.extra["sketches"] = sketch_summary
+
+        # Indicadores de período (médias móveis, MoM/YoY), mantidos
+        # incrementalmente entre execuções a partir do agregado diário
+        indicators = None
+        if selected_formats & {"excel", "pdf"} and not chart_data.empty:
+            from src.indicators import ARQUIVO_INDICADORES, update_indicators
+            with stage("indicators", rows_in=len(chart_data)):
+                indicators = update_indicators(
+                    chart_data, os.path.join(processed_path, ARQUIVO_INDICADORES), storage
+                )
+        latest_indicators = indicators.latest() if indicators is not None else None
+
+        # Dias atípicos na série diária (total e por dimensão), z-score robusto móvel
+        anomalies, anomaly_list = None, None
+        if anomaly_settings.get("enabled", False) and not chart_data.empty:
+            from src.anomalies import (
+                ATIVIDADE_MINIMA, HORIZONTE_PADRAO, JANELA_PADRAO, LIMIAR_PADRAO, anomaly_records,
+                detect_anomalies,
+            )
+            anomaly_dimensions = anomaly_settings.get("dimensions")
+            with stage("anomalies", rows_in=len(chart_data)) as s:
+                anomalies = detect_anomalies(
+                    df_final, chart_data,
+                    dimensions=dimension_columns if anomaly_dimensions is None else anomaly_dimensions,
+                    columns=anomaly_settings.get("columns") or ["faturamento"],
+                    window=anomaly_settings.get("window", JANELA_PADRAO),
+                    threshold=anomaly_settings.get("threshold", LIMIAR_PADRAO),
+                    lookback=anomaly_settings.get("lookback_days", HORIZONTE_PADRAO),
+                    min_active=anomaly_settings.get("min_active", ATIVIDADE_MINIMA),
+                )
+                s.rows_out = len(anomalies)
+            anomaly_list = anomaly_records(anomalies, anomaly_settings.get("report_limit", 10))
+            if profiler is not None:
+                profiler.extra["anomalies"] = len(anomalies)
+
+        # Projeção mensal (tendência + sazonalidade) de todas as séries em um único ajuste
+        forecast_frame, forecast_list = None, None
+        if forecast_settings.get("enabled", False) and "chart" in selected_formats and not chart_data.empty:
+            from src.forecast import (
+                HARMONICOS_PADRAO, HORIZONTE_PADRAO, MESES_SAZONALIDADE, forecast_series,
+            )
+            forecast_dimensions = forecast_settings.get("dimensions")
+            with stage("forecast", rows_in=len(chart_data)) as s:
+                forecast = forecast_series(
+                    df_final, chart_data,
+                    dimensions=dimension_columns if forecast_dimensions is None else forecast_dimensions,
+                    horizon=forecast_settings.get("horizon", HORIZONTE_PADRAO),
+                    harmonics=forecast_settings.get("harmonics", HARMONICOS_PADRAO),
+                    seasonal_min_months=forecast_settings.get("seasonal_min_months", MESES_SAZONALIDADE),
+                )
+                forecast_frame = forecast.chart_frame()
+                forecast_list = forecast.records(forecast_settings.get("report_limit", 20))
+                s.rows_out = len(forecast_list)
 
         # -------------------------------------------------------
-        # 6) Gerar gráfico financeiro
+        # 5) Definição das etapas de saída
         # -------------------------------------------------------
+        # Cada etapa é independente, exceto o PDF, que depende do gráfico.
+        processed_file = os.path.join(processed_path, "dados_processados.xlsx")
         chart_path = os.path.join(reports_path, "grafico_financeiro.png")
-        generate_plot(chart_data, chart_path)
-        logger.info(f"Gráfico gerado: {chart_path}")
+        forecast_chart_path = os.path.join(reports_path, "grafico_previsao.png")
+        excel_output = os.path.join(reports_path, "relatorio_financeiro.xlsx")
+        pdf_output = os.path.join(reports_path, "relatorio_financeiro.pdf")
+        chart_key = [chart_data, {"chart_max_points": chart_max_points}]
+
+        def save_dataset():
+            # Formato canônico: Parquet particionado por ano/mês (só regrava partições alteradas)
+            from src.dataset import DIRETORIO_DATASET, write_partitioned_dataset
+            dataset_dir = store_settings.get("dir", os.path.join(processed_path, DIRETORIO_DATASET))
+            write_partitioned_dataset(df_final, dataset_dir, storage=storage)
+
+        def save_processed():
+            # Cópia do DataFrame processado em Excel
+            from src.storage import open_output
+
+            def write():
+                with open_output(processed_file, storage) as f:
+                    df_final.to_excel(f, index=False)
+
+            _generate_artifact(cache, "processed", [df_final], processed_file, write)
+            logger.info(f"Arquivo consolidado salvo em: {processed_file}")
+
+        def save_sqlite():
+            # Cópia opcional em SQLite (gravação em lote, índices em data/dimensões)
+            from src.sqlite_store import SQLiteStore
+            sqlite_path = sqlite_settings.get("path", os.path.join(processed_path, "consolidado.sqlite"))
+            _generate_artifact(
+                cache, "sqlite", [df_final, {"dimensions": dimension_columns}], sqlite_path,
+                lambda: SQLiteStore(sqlite_path, dimensions=dimension_columns).write(df_final)
+            )
+
+        def save_index():
+            # Índice por data (somas de prefixo) para consultas por período
+            from src.query import ConsolidatedIndex, index_path
+            index_file = index_path(processed_path)
+            _generate_artifact(
+                cache, "index", [df_final], index_file,
+                lambda: ConsolidatedIndex.from_frame(df_final).save(index_file, storage)
+            )
+            logger.info(f"Índice de consultas salvo em: {index_file}")
+
+        def build_chart():
+            from src.visualizer import generate_plot
+            _generate_artifact(
+                cache, "chart", chart_key, chart_path,
+                lambda: generate_plot(chart_data, chart_path, max_points=chart_max_points, storage=storage)
+            )
+            logger.info(f"Gráfico gerado: {chart_path}")
+
+            if forecast_frame is not None:
+                from src.visualizer import generate_forecast_plot
+                _generate_artifact(
+                    cache, "forecast_chart", [forecast_frame], forecast_chart_path,
+                    lambda: generate_forecast_plot(forecast_frame, forecast_chart_path, storage=storage)
+                )
+
+        def build_excel():
+            from src.excel_generator import generate_excel_report
+            excel_key = [df_final, chart_data, anomalies, {"currency_format": currency_format, "date_format": date_format}]
+            _generate_artifact(
+                cache, "excel", excel_key, excel_output,
+                lambda: generate_excel_report(
+                    df=df_final,
+                    reports_path=reports_path,
+                    currency_fmt=currency_format,
+                    date_fmt=date_format,
+                    indicators=indicators,
+                    anomalies=anomalies,
+                    output=excel_output,
+                    storage=storage
+                )
+            )
+            logger.info(f"Relatório Excel gerado: {excel_output}")
+
+        def build_pdf():
+            from src.pdf_generator import generate_pdf_report_advanced
+            logo_stat = storage.stat(logo_path) if logo_path and storage.exists(logo_path) else None
+            pdf_key = [metrics, chart_key, latest_indicators, anomaly_list, forecast_frame, forecast_list,
+                       {"logo": logo_path, "logo_stat": logo_stat, "pdf_title": pdf_title,
+                        "currency_format": currency_format, "date_format": date_format}]
+            _generate_artifact(
+                cache, "pdf", pdf_key, pdf_output,
+                lambda: generate_pdf_report_advanced(
+                    metrics=metrics,
+                    chart_path=chart_path,
+                    output_path=pdf_output,
+                    logo_path=logo_path,
+                    indicators=latest_indicators,
+                    anomalies=anomaly_list,
+                    forecast=forecast_list,
+                    forecast_chart_path=forecast_chart_path if forecast_frame is not None else None,
+                    title=pdf_title,
+                    storage=storage
+                )
+            )
+            logger.info("PDF gerado com sucesso.")
+
+        stages = []
+        if run_process:
+            stages = [Stage("dataset", save_dataset), Stage("index", save_index)]
+            if store_settings.get("excel_copy", True):
+                stages.append(Stage("processed", save_processed))
+            if sqlite_settings.get("enabled", False):
+                if local:
+                    stages.append(Stage("sqlite", save_sqlite))
+                else:
+                    logger.warning("SQLite ignorado: requer armazenamento em disco local.")
 
         # -------------------------------------------------------
-        # 7) Gerar Relatório Excel
+        # 6) Verificação de Dados Finais
         # -------------------------------------------------------
-        excel_output = os.path.join(reports_path, "relatorio_financeiro.xlsx")
-        generate_excel_report(
-            df=df_final, 
-            reports_path=reports_path,
-            currency_fmt=currency_format,
-            date_fmt=date_format
-        )
-        logger.info(f"Relatório Excel gerado: {excel_output}")
+        if df_final.empty:
+            logger.warning("DataFrame final vazio após consolidação e limpeza. Relatórios não serão gerados.")
+        else:
+            report_stages = {
+                "chart": Stage("chart", build_chart),
+                "excel": Stage("excel", build_excel),
+                "pdf": Stage("pdf", build_pdf, depends_on=("chart",)),
+            }
+            stages += [report_stages[name] for name in FORMATOS if name in selected_formats]
 
         # -------------------------------------------------------
-        # 8) Gerar PDF Avançado
+        # 7) Execução concorrente das etapas (falhas isoladas)
         # -------------------------------------------------------
-        pdf_output = os.path.join(reports_path, "relatorio_financeiro.pdf")
-        generate_pdf_report_advanced(
-            metrics=metrics,
-            chart_path=chart_path,
-            output_path=pdf_output,
-            logo_path=logo_path
-        )
+        results = run_stages(stages, max_workers=max_workers)
+
+        if cache is not None and cache.skipped:
+            logger.info(f"Artefatos não regenerados (cache): {', '.join(cache.skipped)}")
 
-        logger.info("PDF gerado com sucesso.")
-        logger.info("Processamento concluído com sucesso.")
+        failed = [name for name, result in results.items() if result.status != STATUS_OK]
+        status = "partial" if failed or ingestion["quarantined"] else ("empty" if df_final.empty else "ok")
+        if profiler is not None:
+            profiler.extra["cache_skipped"] = list(cache.skipped) if cache is not None else []
+
+        # Sinaliza o fim da execução (o serviço HTTP invalida seu cache ao detectar)
+        from src.service import write_run_marker
+        write_run_marker(processed_path, status, storage)
+
+        if failed:
+            logger.error(f"Processamento concluído com falhas nas etapas: {', '.join(failed)}")
+        else:
+            logger.info("Processamento concluído com sucesso.")
 
     except Exception as e:
         # 🛑 TRATAMENTO GRACEFUL: Catch-all para erros inesperados
         # Este bloco captura exceções que escaparam dos blocos internos (I/O, processamento Pandas, etc.)
         logger.critical(f"ERRO CRÍTICO INESPERADO: O pipeline falhou em uma etapa não tratada. Detalhes: {e}")
         # Retornamos explicitamente para evitar o re-raise implícito, mas o erro já foi logado.
+        status = "failed"
+
+    finally:
+        if ingestion is not None and tolerant:
+            _log_ingestion_summary(ingestion)
+            if profiler is not None:
+                profiler.extra["ingestion"] = {
+                    "loaded": ingestion["loaded"],
+                    "quarantined": [{k: e[k] for k in ("file", "error_type", "error", "sidecar")}
+                                    for e in ingestion["quarantined"]],
+                }
+
+        # Encerra a instrumentação e grava o relatório da execução (mesmo em caso de falha)
+        exit_stack.close()
+        if profiler is not None:
+            profiler.status = status
+            try:
+                profiler.write_report(run_reports_dir, storage)
+            except Exception as e:
+                logger.error(f"Falha ao gravar o relatório de execução: {e}")
+
+    return status
+
+
+def _log_ingestion_summary(ingestion: dict):
+    quarantined = ingestion["quarantined"]
+    log = logger.warning if quarantined else logger.info
+    log(
+        f"Resumo da ingestão: {len(ingestion['loaded'])} arquivo(s) carregado(s), "
+        f"{len(quarantined)} em quarentena."
+    )
+    for entry in quarantined:
+        logger.warning(f"  - {entry['file']}: {entry['error_type']}: {entry['error']} (detalhes: {entry['sidecar']})")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="financial-report",
+        description="Pipeline de automação de relatórios financeiros.",
+    )
+    parser.add_argument("--config", default="config.yaml", help="Caminho do arquivo de configuração YAML")
+    parser.add_argument(
+        "--only", choices=ETAPAS,
+        help="Executa apenas uma etapa: 'process' (dataset consolidado) ou 'reports' (relatórios)",
+    )
+    parser.add_argument(
+        "--formats", type=_parse_formats,
+        help=f"Relatórios a gerar, separados por vírgula ({','.join(FORMATOS)}). Padrão: todos",
+    )
+    parser.add_argument("--watch", action="store_true", help="Mantém o processo ativo e reprocessa ao detectar mudanças em paths.raw")
+    parser.add_argument("--interval", type=float, default=2.0, help="Intervalo de polling do modo watch (s)")
+    parser.add_argument("--debounce", type=float, default=5.0, help="Tempo sem mudanças antes de reprocessar (s)")
+    return parser.parse_args(argv)
+
+
+def _parse_formats(value: str):
+    formats = [item.strip() for item in value.split(",") if item.strip()]
+    invalid = [item for item in formats if item not in FORMATOS]
+    if invalid:
+        raise argparse.ArgumentTypeError(f"Formato(s) inválido(s): {', '.join(invalid)}. Use: {', '.join(FORMATOS)}")
+    return formats
+
+
+def watch(argv=None):
+    """
+    Modo watch (daemon): mantém um processo aquecido, com imports já feitos e
+    as planilhas já lidas em cache na memória, e reprocessa quando há mudanças
+    estáveis em `paths.raw` (ou no arquivo de configuração).
+
+    Apenas planilhas novas/alteradas são relidas; artefatos cujas entradas não
+    mudaram são reaproveitados pelo cache de artefatos.
+    """
+    args = parse_args(argv)
+
+    import yaml
+    from src.watcher import RawFolderWatcher, watch as watch_loop
+
+    try:
+        with open(args.config, "r", encoding="utf-8") as f:
+            raw_path = (yaml.safe_load(f) or {}).get("paths", {}).get("raw")
+    except (FileNotFoundError, yaml.YAMLError) as e:
+        logger.critical(f"ERRO CRÍTICO: Não foi possível ler '{args.config}' para o modo watch. Detalhe: {e}")
+        return
+    if not raw_path:
+        logger.critical("ERRO CRÍTICO: 'paths.raw' ausente no config.yaml; modo watch não iniciado.")
+        return
+
+    file_cache = {}
+    watcher = RawFolderWatcher(raw_path, debounce=args.debounce, extra_files=[args.config])
+
+    def on_change(changed):
+        run_pipeline(config_path=args.config, only=args.only, formats=args.formats, file_cache=file_cache)
+
+    try:
+        watch_loop(on_change, watcher, interval=args.interval)
+    except KeyboardInterrupt:
+        logger.info("Modo watch encerrado pelo usuário.")
+
+
+def _tenant_name(config_path: str) -> str:
+    """Nome do cliente: nome do arquivo de config ou, se for 'config.yaml', o da pasta."""
+    path = os.path.abspath(config_path)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.basename(os.path.dirname(path)) if stem == "config" else stem
+
+
+def _run_tenant(config_path: str, only: str = None, formats=None) -> dict:
+    """
+    Executa o pipeline de um cliente dentro de um worker do pool.
+
+    Isolamento: o worker muda para a pasta do config (caminhos relativos do
+    config passam a apontar para os dados do cliente) e redireciona o log
+    para `<paths.reports>/logs.txt` do próprio cliente. O diretório e o log
+    anteriores são restaurados ao final, pois o worker é reutilizado (em um
+    worker do pool, o log anterior é só o console: o processo filho nunca
+    abre o log compartilhado do processo pai).
+    """
+    tenant = _tenant_name(config_path)
+    config_path = os.path.abspath(config_path)
+    previous_cwd = os.getcwd()
+    start = time.perf_counter()
+    result = {"tenant": tenant, "config": config_path, "status": "failed", "error": None}
+    redirected, previous_log = False, None
+
+    try:
+        os.chdir(os.path.dirname(config_path))
+
+        import yaml
+        try:
+            with open(config_path, "r", encoding="utf-8") as f:
+                reports_path = (yaml.safe_load(f) or {}).get("paths", {}).get("reports")
+        except (OSError, yaml.YAMLError):
+            reports_path = None  # run_pipeline registra o erro de configuração no log do cliente
+        previous_log = set_log_file(os.path.join(reports_path or os.path.join("data", "reports"), "logs.txt"))
+        redirected = True
+
+        logger.info(f"[batch] Iniciando cliente '{tenant}' ({config_path})")
+        result["status"] = run_pipeline(config_path=config_path, only=only, formats=formats)
+    except Exception as e:
+        result["error"] = str(e)
+        logger.critical(f"[batch] Falha no cliente '{tenant}': {e}")
+    finally:
+        os.chdir(previous_cwd)
+        if redirected:
+            set_log_file(previous_log)
+        result["seconds"] = round(time.perf_counter() - start, 3)
+
+    return result
+
+
+def run_batch(config_paths, max_workers: int = None, only: str = None, formats=None) -> dict:
+    """
+    Executa o pipeline de vários clientes (um config.yaml por cliente) em um
+    único pool de processos com número de workers limitado.
+
+    Retorna um resumo consolidado com o status e o tempo de cada cliente.
+    """
+    max_workers = max(1, min(max_workers or os.cpu_count() or 1, len(config_paths)))
+    logger.info(f"[batch] {len(config_paths)} cliente(s) com {max_workers} worker(s).")
+
+    start = time.perf_counter()
+    tenants = []
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(_run_tenant, path, only, formats): path for path in config_paths}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                # Falha do próprio worker (ex.: processo encerrado abruptamente)
+                result = {"tenant": _tenant_name(path), "config": os.path.abspath(path),
+                          "status": "failed", "error": str(e), "seconds": None}
+            tenants.append(result)
+            logger.info(f"[batch] Cliente '{result['tenant']}': {result['status']} ({result['seconds']}s)")
+
+    tenants.sort(key=lambda r: r["tenant"])
+    failed = [r["tenant"] for r in tenants if r["status"] not in ("ok", "empty")]
+    summary = {
+        "finished_at": datetime.now().isoformat(),
+        "workers": max_workers,
+        "wall_s": round(time.perf_counter() - start, 3),
+        "total": len(tenants),
+        "failed": failed,
+        "tenants": tenants,
+    }
+
+    logger.info(
+        f"[batch] Concluído em {summary['wall_s']:.2f}s: "
+        f"{len(tenants) - len(failed)} ok, {len(failed)} com falha"
+        + (f" ({', '.join(failed)})" if failed else "")
+    )
+    return summary
+
+
+def batch(argv=None):
+    """
+    Modo batch (multi-cliente): `financial-report-batch clienteA/config.yaml clienteB/config.yaml ...`
+    Grava o resumo consolidado em JSON e retorna código 1 se algum cliente falhar.
+    """
+    parser = argparse.ArgumentParser(
+        prog="financial-report-batch",
+        description="Executa o pipeline de vários clientes em um pool de processos.",
+    )
+    parser.add_argument("configs", nargs="+", help="Arquivos config.yaml, um por cliente")
+    parser.add_argument("--workers", type=int, default=None, help="Máximo de clientes processados em paralelo")
+    parser.add_argument("--only", choices=ETAPAS)
+    parser.add_argument("--formats", type=_parse_formats)
+    parser.add_argument("--summary", default=None,
+                        help="Arquivo JSON do resumo (padrão: data/reports/run_reports/batch_<data>.json)")
+    args = parser.parse_args(argv)
+
+    summary = run_batch(args.configs, max_workers=args.workers, only=args.only, formats=args.formats)
+
+    summary_path = args.summary or os.path.join(
+        "data", "reports", "run_reports", f"batch_{datetime.now():%Y%m%d_%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(summary_path) or ".", exist_ok=True)
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+    logger.info(f"[batch] Resumo salvo em: {summary_path}")
+
+    return 1 if summary["failed"] else 0
+
+
+def serve(argv=None):
+    """
+    Serviço HTTP local de métricas (asyncio): `financial-report-serve --port 8765`.
+    Serve totais e séries diárias do dataset consolidado, com filtros de data.
+    """
+    parser = argparse.ArgumentParser(
+        prog="financial-report-serve",
+        description="Serviço HTTP local de métricas do dataset consolidado.",
+    )
+    parser.add_argument("--config", default="config.yaml")
+    parser.add_argument("--host", default=None, help="Padrão: service.host do config (127.0.0.1)")
+    parser.add_argument("--port", type=int, default=None, help="Padrão: service.port do config (8765)")
+    args = parser.parse_args(argv)
+
+    import asyncio
+    import yaml
+    from src.service import MetricsService
+
+    try:
+        with open(args.config, "r", encoding="utf-8") as f:
+            config = yaml.safe_load(f) or {}
+    except (FileNotFoundError, yaml.YAMLError) as e:
+        logger.critical(f"ERRO CRÍTICO: Não foi possível ler '{args.config}' para o serviço. Detalhe: {e}")
+        return
+
+    service_settings = config.get("service", {})
+    host = args.host or service_settings.get("host", "127.0.0.1")
+    port = args.port if args.port is not None else service_settings.get("port", 8765)
+
+    try:
+        asyncio.run(MetricsService.from_config(config).serve_forever(host, port))
+    except KeyboardInterrupt:
+        logger.info("Serviço de métricas encerrado pelo usuário.")
 
 
-def main():
+def main(argv=None):
+    args = parse_args(argv)
+    if args.watch:
+        watch(argv)
+        return
     try:
-        run_pipeline()
+        run_pipeline(config_path=args.config, only=args.only, formats=args.formats)
     except Exception:
         logger.error("A execução do pipeline foi interrompida. Consulte o log para ERROS CRÍTICOS (CRITICAL).")
 
@@ -18,6 +18,7 @@ setup(
         'openpyxl',
         'xlsxwriter',
         'pyyaml',
+        'pyarrow',
         'matplotlib',
         'reportlab',
     ],
@@ -26,6 +27,12 @@ setup(
         'console_scripts': [
             # CORRETO: Aponta para o módulo 'main' na raiz
             'financial-report = main:main', 
+            # Modo watch (processo aquecido observando paths.raw)
+            'financial-report-watch = main:watch',
+            # Modo batch (vários clientes, um config.yaml por cliente)
+            'financial-report-batch = main:batch',
+            # Serviço HTTP local de métricas
+            'financial-report-serve = main:serve',
         ],
     },
     classifiers=[
@@ -0,0 +1,192 @@
+from typing import Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from src.logger import get_logger
+from src.transformer import COL_DATA, COL_FATURAMENTO
+
+logger = get_logger()
+
+JANELA_PADRAO = 28
+LIMIAR_PADRAO = 3.5
+HORIZONTE_PADRAO = 90
+ATIVIDADE_MINIMA = 0.5
+MAX_LOG = 10
+SERIE_TOTAL = "total"
+
+COL_DIMENSAO = "dimensao"
+COL_SERIE = "serie"
+COL_METRICA = "coluna"
+COL_VALOR = "valor"
+COL_MEDIANA = "mediana"
+COL_Z = "z_robusto"
+COLS_ANOMALIAS = [COL_DATA, COL_DIMENSAO, COL_SERIE, COL_METRICA, COL_VALOR, COL_MEDIANA, COL_Z]
+
+# MAD → desvio-padrão sob normalidade (1/Φ⁻¹(3/4)) e o equivalente para o
+# desvio absoluto médio (√(π/2)), usado quando a MAD da janela é zero
+_ESCALA_MAD = 1.4826
+_ESCALA_DESVIO_MEDIO = 1.2533
+
+
+# -----------------------------------------------------------
+# 1) Matriz dias × séries
+# -----------------------------------------------------------
+def daily_matrix(df: pd.DataFrame, dimension: str, column: str,
+                 start: np.datetime64, days: int) -> Tuple[List, np.ndarray]:
+    """
+    Soma diária de `column` por valor de `dimension` em uma matriz
+    (dias × séries) sobre o calendário contínuo que começa em `start`
+    (dias sem movimento = 0). Retorna (rótulos das séries, matriz).
+    """
+    valid = df[dimension].notna().to_numpy() & df[column].notna().to_numpy()
+    codes, labels = pd.factorize(df[dimension][valid], sort=True)
+    rows = (df[COL_DATA][valid].to_numpy().astype("datetime64[D]") - start).astype(np.int64)
+
+    matrix = np.zeros((days, len(labels)))
+    np.add.at(matrix, (rows, codes), df[column][valid].to_numpy(dtype=float))
+    return list(labels), matrix
+
+
+# -----------------------------------------------------------
+# 2) z-score robusto móvel (todas as séries de uma vez)
+# -----------------------------------------------------------
+def rolling_robust_z(values: np.ndarray, window: int = JANELA_PADRAO,
+                     min_active: float = ATIVIDADE_MINIMA) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    z-score robusto de cada dia contra os `window` dias ANTERIORES da mesma
+    série, para todas as colunas da matriz (dias × séries) de uma vez:
+
+        z = (x − mediana) / (1,4826 · MAD)
+
+    Quando a MAD da janela é zero (séries quase constantes ou esparsas),
+    usa 1,2533 · desvio absoluto médio; janela constante → z = 0 se o dia
+    repete o valor, ±inf caso contrário. Os primeiros `window` dias não têm
+    histórico (NaN), assim como dias cuja janela tem menos de `min_active`
+    (fração) de dias com movimento: séries esparsas não têm referência.
+    Retorna (z, mediana), ambos com o formato de `values`.
+    """
+    values = np.asarray(values, dtype=float)
+    z = np.full(values.shape, np.nan)
+    median = np.full(values.shape, np.nan)
+    if values.shape[0] <= window:
+        return z, median
+
+    # Janelas séries × (dias − window) × window, copiadas já ordenadas (a
+    # transposição deixa cada janela contígua); o dia t usa [t − window, t)
+    lo, hi = (window - 1) // 2, window // 2
+    ordered = np.sort(sliding_window_view(np.ascontiguousarray(values.T[:, :-1]), window, axis=1), axis=-1)
+    med = (ordered[..., lo] + ordered[..., hi]) / 2
+
+    # Desvios absolutos no mesmo buffer, reordenados para a MAD
+    ordered -= med[..., None]
+    np.abs(ordered, out=ordered)
+    fallback = ordered.mean(axis=-1) * _ESCALA_DESVIO_MEDIO
+    ordered.sort(axis=-1)
+    scale = (ordered[..., lo] + ordered[..., hi]) / 2 * _ESCALA_MAD
+    scale = np.where(scale > 0, scale, fallback).T
+    med = med.T
+
+    current = values[window:]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = (current - med) / scale
+    scores[(scale == 0) & (current == med)] = 0.0
+
+    # Dias com movimento por janela, por somas acumuladas
+    active = np.vstack([np.zeros(values.shape[1]), np.cumsum(values != 0, axis=0)])
+    active = active[window:-1] - active[:-window - 1]
+    scores[active < min_active * window] = np.nan
+
+    z[window:] = scores
+    median[window:] = med
+    return z, median
+
+
+# -----------------------------------------------------------
+# 3) Etapa de detecção
+# -----------------------------------------------------------
+def detect_anomalies(df: pd.DataFrame, chart_data: pd.DataFrame, dimensions: Iterable[str] = (),
+                     columns: Iterable[str] = (COL_FATURAMENTO,), window: int = JANELA_PADRAO,
+                     threshold: float = LIMIAR_PADRAO, lookback: int = HORIZONTE_PADRAO,
+                     min_active: float = ATIVIDADE_MINIMA) -> pd.DataFrame:
+    """
+    Dias atípicos na série diária total (`prepare_chart_data`) e, para
+    cada dimensão configurada (filial, produto...), em cada uma das suas
+    séries. Todas as séries são empilhadas em uma única matriz e pontuadas
+    por `rolling_robust_z`; dias com |z| ≥ `threshold` são retornados, do
+    mais recente para o mais antigo (e maior |z| primeiro no mesmo dia).
+
+    Só os últimos `lookback` dias são pontuados (None: todo o histórico):
+    dias antigos já foram sinalizados em execuções anteriores.
+    """
+    columns = [c for c in columns if c in chart_data.columns]
+    if chart_data.empty or not columns:
+        return pd.DataFrame(columns=COLS_ANOMALIAS)
+
+    chart_days = chart_data[COL_DATA].to_numpy().astype("datetime64[D]")
+    start = chart_days.min()
+    days = int((chart_days.max() - start).astype(np.int64)) + 1
+    offsets = (chart_days - start).astype(np.int64)
+
+    blocks, meta = [], []
+    for column in columns:
+        total = np.zeros((days, 1))
+        np.add.at(total[:, 0], offsets, chart_data[column].to_numpy(dtype=float))
+        blocks.append(total)
+        meta += [(SERIE_TOTAL, SERIE_TOTAL, column)]
+        for dim in dimensions:
+            if dim not in df.columns:
+                logger.warning("Anomalias: coluna de dimensão ausente ignorada: %s", dim)
+                continue
+            labels, matrix = daily_matrix(df, dim, column, start, days)
+            blocks.append(matrix)
+            meta += [(dim, label, column) for label in labels]
+
+    # Horizonte pontuado + uma janela de histórico antes dele
+    first = max(0, days - lookback - window) if lookback else 0
+    start += np.timedelta64(first, "D")
+    values = np.hstack(blocks)[first:]
+    z, median = rolling_robust_z(values, window, min_active)
+
+    with np.errstate(invalid="ignore"):
+        day_idx, series_idx = np.nonzero(np.abs(z) >= threshold)
+    meta = np.array(meta, dtype=object).reshape(-1, 3)
+    result = pd.DataFrame({
+        COL_DATA: pd.to_datetime(start + day_idx.astype("timedelta64[D]")),
+        COL_DIMENSAO: meta[series_idx, 0],
+        COL_SERIE: meta[series_idx, 1],
+        COL_METRICA: meta[series_idx, 2],
+        COL_VALOR: values[day_idx, series_idx],
+        COL_MEDIANA: median[day_idx, series_idx],
+        COL_Z: z[day_idx, series_idx],
+    })
+    result = result.assign(_abs=result[COL_Z].abs()).sort_values(
+        [COL_DATA, "_abs"], ascending=False, kind="stable"
+    ).drop(columns="_abs").reset_index(drop=True)
+
+    _log_anomalies(result, values.shape[1], threshold)
+    return result
+
+
+def _log_anomalies(result: pd.DataFrame, n_series: int, threshold: float):
+    if result.empty:
+        logger.info("Anomalias: nenhum dia atípico em %d série(s) (|z| ≥ %.1f).", n_series, threshold)
+        return
+    logger.warning("Anomalias: %d dia(s) atípico(s) em %d série(s) (|z| ≥ %.1f). Mais recentes:",
+                   len(result), n_series, threshold)
+    for row in result.head(MAX_LOG).itertuples(index=False):
+        label = "total" if row[1] == SERIE_TOTAL else f"{row[1]}={row[2]}"
+        logger.warning("  %s %s %s=%.2f (mediana %.2f, z=%+.1f)",
+                       row[0].strftime("%Y-%m-%d"), label, row[3], row[4], row[5], row[6])
+
+
+def anomaly_records(result: pd.DataFrame, limit: int = MAX_LOG) -> list:
+    """As `limit` anomalias mais recentes como dicts simples (seção do PDF, chave de cache)."""
+    head = result.head(limit).copy()
+    if head.empty:
+        return []
+    head[COL_DATA] = head[COL_DATA].dt.strftime("%d/%m/%Y")
+    head[[COL_VALOR, COL_MEDIANA]] = head[[COL_VALOR, COL_MEDIANA]].round(2)
+    head[COL_Z] = head[COL_Z].round(1)
+    return head.to_dict(orient="records")
@@ -0,0 +1,139 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+from src.logger import get_logger
+
+logger = get_logger()
+
+# Incrementar quando a lógica dos geradores mudar de forma que invalide
+# artefatos gerados por versões anteriores.
+CACHE_VERSION = 2
+
+
+# -----------------------------------------------------------
+# 1) Hash de conteúdo das entradas de um gerador
+# -----------------------------------------------------------
+def hash_inputs(*parts) -> str:
+    """
+    Calcula um hash SHA-256 estável das entradas de um gerador.
+
+    Aceita DataFrames (hash vetorizado via pandas, incluindo colunas e dtypes),
+    bytes e qualquer estrutura serializável em JSON (dicts de métricas,
+    trechos do config.yaml, etc.).
+    """
+    h = hashlib.sha256(f"v{CACHE_VERSION}".encode())
+
+    for part in parts:
+        if isinstance(part, pd.DataFrame):
+            h.update(json.dumps([list(map(str, part.columns)), list(map(str, part.dtypes))]).encode())
+            h.update(pd.util.hash_pandas_object(part, index=False).to_numpy().tobytes())
+        elif isinstance(part, (bytes, bytearray)):
+            h.update(part)
+        else:
+            h.update(json.dumps(part, sort_keys=True, default=str).encode())
+        # Separador entre partes para evitar colisões por concatenação
+        h.update(b"\x00")
+
+    return h.hexdigest()
+
+
+# -----------------------------------------------------------
+# 2) Cache de artefatos em disco
+# -----------------------------------------------------------
+class ArtifactCache:
+    """
+    Cache de artefatos gerados (gráfico, Excel, PDF...) indexado pelo hash
+    das entradas de cada gerador.
+
+    Estrutura em disco:
+    - manifest.json: {nome: {key, blob, size, mtime_ns}}
+    - uma cópia de cada artefato (blob), usada para restaurar a saída
+      quando ela foi removida ou alterada.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = self.cache_dir / "manifest.json"
+        self.manifest = self._load_manifest()
+        self.skipped = []
+        # As etapas de saída podem rodar em threads concorrentes
+        self._lock = threading.Lock()
+
+    def _load_manifest(self) -> dict:
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_manifest(self):
+        # Escrita atômica: evita manifest corrompido se o processo for interrompido
+        tmp_path = self.manifest_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def restore(self, name: str, key: str, output_path: str) -> bool:
+        """
+        Retorna True se o artefato `name` com a chave `key` está disponível em
+        `output_path`: reutiliza a saída atual se ela não mudou desde a última
+        geração, ou copia a versão guardada no cache.
+        """
+        entry = self.manifest.get(name)
+        if not entry or entry.get("key") != key:
+            return False
+
+        output = Path(output_path)
+        if output.exists():
+            stat = output.stat()
+            if stat.st_size == entry.get("size") and stat.st_mtime_ns == entry.get("mtime_ns"):
+                return True
+
+        blob = self.cache_dir / entry["blob"]
+        if not blob.exists():
+            return False
+
+        output.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(blob, output)
+        self._record(name, key, output)
+        return True
+
+    def store(self, name: str, key: str, output_path: str):
+        """Guarda uma cópia do artefato recém-gerado e registra a chave."""
+        output = Path(output_path)
+        blob_name = f"{name}{output.suffix}"
+        shutil.copyfile(output, self.cache_dir / blob_name)
+        self._record(name, key, output, blob_name)
+
+    def _record(self, name: str, key: str, output: Path, blob_name: str = None):
+        stat = output.stat()
+        with self._lock:
+            self.manifest[name] = {
+                "key": key,
+                "blob": blob_name or self.manifest[name]["blob"],
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+            }
+            self._save_manifest()
+
+    def run(self, name: str, key: str, output_path: str, generate) -> bool:
+        """
+        Executa `generate()` apenas se o artefato não puder ser reutilizado.
+        Retorna True quando a geração foi ignorada (cache hit).
+        """
+        if self.restore(name, key, output_path):
+            with self._lock:
+                self.skipped.append(name)
+            logger.info(f"Artefato '{name}' reutilizado do cache (entradas inalteradas): {output_path}")
+            return True
+
+        generate()
+        self.store(name, key, output_path)
+        return False
@@ -0,0 +1,213 @@
+import hashlib
+import os
+import threading
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from src.logger import get_logger
+from src.storage import get_storage
+from src.transformer import COL_DATA, COLS_NUMERICAS
+
+logger = get_logger()
+
+MOEDA_BASE_PADRAO = "BRL"
+COL_MOEDA = "moeda"
+COL_TAXA = "taxa_cambio"
+
+# Colunas da tabela de cotações (uma linha por moeda e dia):
+# data, moeda, taxa (valor de 1 unidade da moeda na moeda base)
+COLS_COTACOES = ["data", "moeda", "taxa"]
+
+# Cotações já carregadas neste processo, por (caminho, mtime, tamanho)
+_memoria = {}
+_memoria_lock = threading.Lock()
+
+
+@dataclass
+class RateTable:
+    """
+    Cotações diárias em arrays ordenados por (moeda, dia), prontos para a
+    junção as-of vetorizada de `convert_currency`.
+    """
+    currencies: List[str]   # códigos das moedas (posição = código inteiro)
+    codes: np.ndarray       # int64, código da moeda de cada cotação
+    days: np.ndarray        # int64, dias desde 1970-01-01
+    rates: np.ndarray       # float64
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "RateTable":
+        missing = [c for c in COLS_COTACOES if c not in df.columns]
+        if missing:
+            raise ValueError(f"Tabela de cotações sem as colunas: {missing}")
+
+        df = df.dropna(subset=COLS_COTACOES)
+        codes, currencies = pd.factorize(df["moeda"].astype(str).str.strip().str.upper(), sort=True)
+        days = pd.to_datetime(df["data"]).to_numpy().astype("datetime64[D]").astype(np.int64)
+        rates = pd.to_numeric(df["taxa"]).to_numpy(dtype=float)
+
+        order = np.lexsort((days, codes))
+        return cls(list(currencies), codes[order].astype(np.int64), days[order], rates[order])
+
+    def _keys(self, codes: np.ndarray, days: np.ndarray) -> np.ndarray:
+        # Chave única ordenável: moeda nos bits altos, dia nos baixos
+        return (codes.astype(np.int64) << 32) | (days.astype(np.int64) + 2**31)
+
+    def lookup(self, currencies: np.ndarray, days: np.ndarray) -> np.ndarray:
+        """
+        Cotação mais recente em ou antes de cada dia, para cada moeda
+        (equivalente a merge_asof(by="moeda", direction="backward"), mas sem
+        ordenar as linhas de entrada: uma busca binária por linha sobre a
+        tabela ordenada). Sem cotação anterior ou moeda desconhecida → NaN.
+        """
+        index = {c: i for i, c in enumerate(self.currencies)}
+        codes = np.array([index.get(c, -1) for c in currencies], dtype=np.int64)
+        return self._lookup_codes(codes, np.asarray(days, dtype=np.int64))
+
+    def _lookup_codes(self, codes: np.ndarray, days: np.ndarray) -> np.ndarray:
+        out = np.full(len(codes), np.nan)
+        known = codes >= 0
+        if not known.any() or len(self.rates) == 0:
+            return out
+
+        table_keys = self._keys(self.codes, self.days)
+        keys = self._keys(codes[known], days[known])
+        pos = np.searchsorted(table_keys, keys, side="right") - 1
+
+        found = pos >= 0
+        found[found] = self.codes[pos[found]] == codes[known][found]
+        rates = np.full(len(keys), np.nan)
+        rates[found] = self.rates[pos[found]]
+        out[known] = rates
+        return out
+
+
+# -----------------------------------------------------------
+# 1) Carga da tabela de cotações (com cache entre execuções)
+# -----------------------------------------------------------
+def _read_rates_file(path: str, storage=None) -> pd.DataFrame:
+    with get_storage(storage).open(path, "rb") as f:
+        if path.endswith(".xlsx"):
+            return pd.read_excel(f)
+        if path.endswith(".parquet"):
+            return pd.read_parquet(f)
+        return pd.read_csv(f)
+
+
+def load_rates(path: str, cache_dir: str = None, storage=None) -> RateTable:
+    """
+    Carrega a tabela local de cotações diárias (.csv, .xlsx ou .parquet).
+
+    A tabela convertida é reaproveitada enquanto o arquivo de origem não
+    mudar (mtime e tamanho): em memória dentro do processo e, com
+    `cache_dir`, em um .npz entre execuções.
+
+    - Arquivo inexistente → FileNotFoundError
+    """
+    storage = get_storage(storage)
+    if not storage.exists(path):
+        raise FileNotFoundError(f"Tabela de cotações não encontrada: {path}")
+
+    size, mtime_ns = storage.stat(path)
+    stamp = (os.path.abspath(path), mtime_ns, size, id(storage))
+    with _memoria_lock:
+        if stamp in _memoria:
+            return _memoria[stamp]
+
+    cache_file = None
+    if cache_dir:
+        digest = hashlib.sha256(stamp[0].encode()).hexdigest()[:16]
+        cache_file = os.path.join(cache_dir, f"cotacoes_{digest}.npz")
+
+    table = _load_cached(cache_file, stamp) if cache_file else None
+    if table is None:
+        table = RateTable.from_frame(_read_rates_file(path, storage))
+        if cache_file:
+            _save_cached(cache_file, stamp, table)
+        logger.info("Cotações carregadas de %s: %d registros, moedas %s.",
+                    path, len(table.rates), ", ".join(table.currencies))
+    else:
+        logger.info("Cotações reaproveitadas do cache: %s", cache_file)
+
+    with _memoria_lock:
+        _memoria[stamp] = table
+    return table
+
+
+def _load_cached(cache_file: str, stamp: tuple):
+    if not os.path.exists(cache_file):
+        return None
+    with np.load(cache_file, allow_pickle=False) as data:
+        if (int(data["mtime_ns"]), int(data["size"])) != stamp[1:3]:
+            return None
+        return RateTable(data["currencies"].tolist(), data["codes"], data["days"], data["rates"])
+
+
+def _save_cached(cache_file: str, stamp: tuple, table: RateTable):
+    os.makedirs(os.path.dirname(cache_file) or ".", exist_ok=True)
+    tmp = cache_file + ".tmp.npz"
+    np.savez(
+        tmp, mtime_ns=np.int64(stamp[1]), size=np.int64(stamp[2]),
+        currencies=np.array(table.currencies, dtype=str), codes=table.codes, days=table.days, rates=table.rates,
+    )
+    os.replace(tmp, cache_file)
+
+
+# -----------------------------------------------------------
+# 2) Conversão vetorizada para a moeda base
+# -----------------------------------------------------------
+def convert_currency(df: pd.DataFrame, rates: RateTable, base: str = MOEDA_BASE_PADRAO,
+                     currency_col: str = COL_MOEDA) -> pd.DataFrame:
+    """
+    Converte as colunas monetárias para a moeda `base` usando, para cada
+    linha, a cotação mais recente em ou antes da sua data.
+
+    - Sem a coluna de moeda (ou vazia/em branco na linha) → valor já está na base;
+    - A junção é feita sobre colunas inteiras: os códigos de moeda são
+      fatorados uma vez (normalizando só os valores distintos) e as
+      cotações buscadas com searchsorted na tabela ordenada;
+    - A taxa aplicada fica registrada em `taxa_cambio`;
+    - Linha sem cotação disponível → ValueError (nada é convertido pela metade).
+    """
+    if currency_col not in df.columns:
+        return df
+
+    base = base.upper()
+    codes, uniques = pd.factorize(df[currency_col])
+    names = pd.Index(uniques).astype(str).str.strip().str.upper()
+
+    # Código de cada moeda distinta na tabela (-1: moeda desconhecida). A
+    # posição extra no fim atende as linhas sem moeda (código -1 do factorize);
+    # textos vazios ou só com espaços também contam como moeda base.
+    index = {c: i for i, c in enumerate(rates.currencies)}
+    table_codes = np.append([index.get(n, -1) for n in names], -1).astype(np.int64)
+    is_base = np.append((names == base) | (names == ""), True)
+
+    row_codes = table_codes[codes]
+    row_is_base = is_base[codes]
+
+    days = df[COL_DATA].to_numpy().astype("datetime64[D]").astype(np.int64)
+    taxa = rates._lookup_codes(row_codes, days)
+    taxa[row_is_base] = 1.0
+
+    missing = np.isnan(taxa)
+    if missing.any():
+        sem_cotacao = df.loc[missing, [COL_DATA, currency_col]].astype(str)
+        exemplos = sem_cotacao.drop_duplicates(currency_col).head(5).values.tolist()
+        raise ValueError(
+            f"{int(missing.sum())} linha(s) sem cotação em ou antes da data "
+            f"(moeda, data): {[(m, d) for d, m in exemplos]}"
+        )
+
+    df = df.copy()
+    for col in COLS_NUMERICAS:
+        if col in df.columns:
+            df[col] = df[col].to_numpy(dtype=float) * taxa
+    df[COL_TAXA] = taxa
+    df[currency_col] = base
+
+    logger.info("Conversão de moeda: %d de %d linhas convertidas para %s.",
+                int((~row_is_base).sum()), len(df), base)
+    return df
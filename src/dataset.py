@@ -0,0 +1,220 @@
+import json
+import os
+
+import pandas as pd
+
+from src.logger import get_logger
+from src.storage import get_storage
+from src.transformer import COL_DATA
+
+logger = get_logger()
+
+# Dataset colunar (Parquet) particionado por ano/mês:
+#   <raiz>/year=2024/month=03/part-0.parquet
+#   <raiz>/_stats.json  → {partição: {rows, hash, min, max}}
+DIRETORIO_DATASET = "dataset"
+ARQUIVO_ESTATISTICAS = "_stats.json"
+ARQUIVO_PARTICAO = "part-0.parquet"
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ImportError(
+            "O dataset particionado requer 'pyarrow'. Instale com: pip install pyarrow"
+        )
+
+
+def _partition_key(year: int, month: int) -> str:
+    return f"year={year:04d}/month={month:02d}"
+
+
+def _column_stats(df: pd.DataFrame) -> dict:
+    """Mínimo/máximo das colunas de data e numéricas de uma partição."""
+    stats = {}
+    for col in df.columns:
+        serie = df[col]
+        if pd.api.types.is_datetime64_any_dtype(serie) or pd.api.types.is_numeric_dtype(serie):
+            valid = serie.dropna()
+            if valid.empty:
+                continue
+            lo, hi = valid.min(), valid.max()
+            if isinstance(lo, pd.Timestamp):
+                lo, hi = lo.isoformat(), hi.isoformat()
+            else:
+                lo, hi = float(lo), float(hi)
+            stats[col] = {"min": lo, "max": hi}
+    return stats
+
+
+def load_dataset_stats(root: str, storage=None) -> dict:
+    """Lê as estatísticas por partição ({} se o dataset ainda não existe)."""
+    storage = get_storage(storage)
+    path = os.path.join(root, ARQUIVO_ESTATISTICAS)
+    if not storage.exists(path):
+        return {}
+    with storage.open(path, "r") as f:
+        return json.load(f)
+
+
+def _save_stats(root: str, stats: dict, storage):
+    with storage.atomic_write(os.path.join(root, ARQUIVO_ESTATISTICAS), "w") as f:
+        json.dump(stats, f, indent=2, sort_keys=True)
+
+
+# Tipos inferidos em colunas object que o Parquet grava sem conversão
+_TIPOS_HOMOGENEOS = {"empty", "string", "integer", "floating", "mixed-integer-float", "decimal",
+                     "boolean", "date", "datetime", "datetime64", "time", "bytes"}
+
+
+def _normalize_object_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Colunas object com tipos misturados (ex.: texto livre [1, "x"] vindo das
+    planilhas) viram texto: o pyarrow não grava colunas sem tipo único.
+    """
+    mixed = [col for col in df.columns
+             if df[col].dtype == object
+             and pd.api.types.infer_dtype(df[col], skipna=True) not in _TIPOS_HOMOGENEOS]
+    if not mixed:
+        return df
+    return df.assign(**{col: df[col].astype("string") for col in mixed})
+
+
+def _read_partition(path: str, storage, columns=None) -> pd.DataFrame:
+    with storage.open(path, "rb") as f:
+        return pd.read_parquet(f, columns=columns)
+
+
+# -----------------------------------------------------------
+# 1) Escrita
+# -----------------------------------------------------------
+def write_partitioned_dataset(df: pd.DataFrame, root: str, append: bool = False, storage=None) -> dict:
+    """
+    Grava o DataFrame processado como dataset Parquet particionado por
+    ano/mês da coluna 'data', com estatísticas min/max por partição.
+
+    - append=False: o dataset passa a refletir exatamente `df`; partições que
+      não aparecem mais são removidas.
+    - append=True: as linhas de `df` são acrescentadas às partições existentes
+      (somente as partições tocadas são relidas e regravadas).
+
+    Partições cujo conteúdo não mudou (mesmo hash) não são regravadas.
+    Colunas object com tipos misturados são gravadas como texto.
+    Retorna {"written": [...], "unchanged": [...], "removed": [...]}.
+    """
+    _require_pyarrow()
+    from src.cache import hash_inputs
+
+    storage = get_storage(storage)
+    storage.makedirs(root)
+    stats = load_dataset_stats(root, storage)
+    summary = {"written": [], "unchanged": [], "removed": []}
+
+    datas = df[COL_DATA]
+    groups = df.groupby([datas.dt.year, datas.dt.month], sort=True)
+
+    touched = set()
+    for (year, month), part in groups:
+        key = _partition_key(int(year), int(month))
+        touched.add(key)
+        part_dir = os.path.join(root, key)
+        part_file = os.path.join(part_dir, ARQUIVO_PARTICAO)
+
+        if append and key in stats and storage.exists(part_file):
+            part = pd.concat([_read_partition(part_file, storage), part], ignore_index=True)
+
+        # Depois do append: a partição inteira (antiga + nova) tem um único esquema
+        part = _normalize_object_columns(part.sort_values(COL_DATA, kind="stable").reset_index(drop=True))
+        digest = hash_inputs(part)
+        if stats.get(key, {}).get("hash") == digest and storage.exists(part_file):
+            summary["unchanged"].append(key)
+            continue
+
+        storage.makedirs(part_dir)
+        with storage.atomic_write(part_file) as f:
+            part.to_parquet(f, index=False)
+
+        stats[key] = {"rows": len(part), "hash": digest, "columns": _column_stats(part)}
+        summary["written"].append(key)
+
+    if not append:
+        for key in sorted(set(stats) - touched):
+            storage.rmtree(os.path.join(root, key))
+            del stats[key]
+            summary["removed"].append(key)
+
+    _save_stats(root, stats, storage)
+    logger.info(
+        f"Dataset particionado em {root}: {len(summary['written'])} partições gravadas, "
+        f"{len(summary['unchanged'])} inalteradas, {len(summary['removed'])} removidas."
+    )
+    return summary
+
+
+# -----------------------------------------------------------
+# 2) Leitura com poda de partições
+# -----------------------------------------------------------
+def select_partitions(stats: dict, start=None, end=None) -> list:
+    """
+    Partições cujo intervalo [min, max] de datas cruza o filtro [start, end].
+    As demais não precisam ser abertas.
+    """
+    start = pd.Timestamp(start) if start is not None else None
+    end = pd.Timestamp(end) if end is not None else None
+
+    selected = []
+    for key in sorted(stats):
+        datas = stats[key].get("columns", {}).get(COL_DATA)
+        if datas is not None:
+            if start is not None and pd.Timestamp(datas["max"]) < start:
+                continue
+            if end is not None and pd.Timestamp(datas["min"]) > end:
+                continue
+        selected.append(key)
+    return selected
+
+
+def read_partitioned_dataset(root: str, start=None, end=None, columns: list = None, storage=None) -> pd.DataFrame:
+    """
+    Lê o dataset particionado, abrindo apenas as partições que podem conter
+    datas em [start, end] (inclusivo) e, opcionalmente, apenas `columns`.
+
+    - Dataset inexistente → FileNotFoundError
+    """
+    _require_pyarrow()
+
+    storage = get_storage(storage)
+    stats = load_dataset_stats(root, storage)
+    if not stats:
+        logger.error(f"Dataset particionado não encontrado: {root}")
+        raise FileNotFoundError(f"Dataset não encontrado: {root}")
+
+    keys = select_partitions(stats, start, end)
+    logger.info(f"Dataset {root}: lendo {len(keys)} de {len(stats)} partições.")
+
+    read_cols = None
+    if columns is not None:
+        read_cols = list(dict.fromkeys([COL_DATA, *columns]))
+
+    parts = [
+        _read_partition(os.path.join(root, key, ARQUIVO_PARTICAO), storage, read_cols)
+        for key in keys
+    ]
+    if not parts:
+        df = _read_partition(
+            os.path.join(root, sorted(stats)[0], ARQUIVO_PARTICAO), storage, read_cols
+        ).iloc[0:0]
+    else:
+        df = pd.concat(parts, ignore_index=True)
+
+    mask = pd.Series(True, index=df.index)
+    if start is not None:
+        mask &= df[COL_DATA] >= pd.Timestamp(start)
+    if end is not None:
+        mask &= df[COL_DATA] <= pd.Timestamp(end)
+    df = df[mask].reset_index(drop=True)
+
+    if columns is not None:
+        df = df[columns]
+    return df
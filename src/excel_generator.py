@@ -1,6 +1,7 @@
 import pandas as pd
 import os
 from src.logger import get_logger
+from src.storage import open_output
 from src.transformer import COL_DATA, COL_FATURAMENTO, COL_CUSTOS, COL_LUCRO # Importando constantes
 
 logger = get_logger()
@@ -10,15 +11,29 @@ def generate_excel_report(
     df: pd.DataFrame, 
     reports_path: str,
     currency_fmt: str,  # Novo argumento para o formato de moeda
-    date_fmt: str       # Novo argumento para o formato de data
+    date_fmt: str,      # Novo argumento para o formato de data
+    indicators=None,    # PeriodIndicators opcional (médias móveis, MoM/YoY)
+    anomalies=None,     # DataFrame opcional de anomalies.detect_anomalies
+    output=None,        # Caminho ou arquivo binário (padrão: <reports_path>/relatorio_financeiro.xlsx)
+    storage=None        # Armazenamento do caminho de saída (padrão: disco local)
 ):
     """
     Gera um relatório Excel profissional contendo os dados processados e 
     aplica formatação de moeda e data usando o motor xlsxwriter, 
     baseado em formatos de configuração.
+
+    Com `indicators`, inclui as planilhas "Indicadores Diários" (médias
+    móveis de 7/30 dias) e "Indicadores Mensais" (crescimento MoM/YoY em %).
+    Com `anomalies`, inclui a planilha "Anomalias" (dias atípicos por série).
     """
-    output_file = os.path.join(reports_path, "relatorio_financeiro.xlsx")
-    
+    output_file = output if output is not None else os.path.join(reports_path, "relatorio_financeiro.xlsx")
+    with open_output(output_file, storage) as f:
+        _write_report(f, df, currency_fmt, date_fmt, indicators, anomalies)
+
+    logger.info(f"Relatório Excel profissional gerado com formatação em: {output_file}")
+
+
+def _write_report(output_file, df, currency_fmt, date_fmt, indicators, anomalies=None):
     # 1. Cria um objeto ExcelWriter usando o motor xlsxwriter
     # Usa o formato de data flexível (date_fmt)
     try:
@@ -63,7 +78,39 @@ def generate_excel_report(
     except KeyError:
         logger.warning(f"Coluna '{COL_DATA}' não encontrada no DataFrame para formatação.")
 
-    # 5. Salva o arquivo Excel
+    # 5. Indicadores (médias móveis e crescimento por período)
+    if indicators is not None:
+        percent_format = workbook.add_format({'num_format': '0.00"%"'})
+        sheets = {
+            'Indicadores Diários': indicators.daily_frame(),
+            'Indicadores Mensais': indicators.monthly_frame(),
+        }
+        for sheet_name, frame in sheets.items():
+            frame.to_excel(writer, sheet_name=sheet_name, index=False)
+            sheet = writer.sheets[sheet_name]
+            for col_index, col_name in enumerate(frame.columns):
+                if col_index == 0:
+                    sheet.set_column(col_index, col_index, 12, date_format)
+                elif col_name.endswith(("_mom", "_yoy")):
+                    sheet.set_column(col_index, col_index, 16, percent_format)
+                else:
+                    sheet.set_column(col_index, col_index, 16, currency_format)
+
+    # 5.1 Anomalias (valor e mediana móvel em moeda, z-score com uma casa)
+    if anomalies is not None:
+        from src.anomalies import COL_MEDIANA, COL_VALOR, COL_Z
+        anomalies.to_excel(writer, sheet_name='Anomalias', index=False)
+        sheet = writer.sheets['Anomalias']
+        z_format = workbook.add_format({'num_format': '+0.0;-0.0'})
+        for col_index, col_name in enumerate(anomalies.columns):
+            if col_name == COL_DATA:
+                sheet.set_column(col_index, col_index, 12, date_format)
+            elif col_name in (COL_VALOR, COL_MEDIANA):
+                sheet.set_column(col_index, col_index, 16, currency_format)
+            elif col_name == COL_Z:
+                sheet.set_column(col_index, col_index, 10, z_format)
+            else:
+                sheet.set_column(col_index, col_index, 14)
+
+    # 6. Salva o arquivo Excel
     writer.close()
-    
-    logger.info(f"Relatório Excel profissional gerado com formatação em: {output_file}")
\ No newline at end of file
@@ -0,0 +1,218 @@
+import math
+from dataclasses import dataclass
+from typing import Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.logger import get_logger
+from src.transformer import COL_DATA, COL_FATURAMENTO, COL_LUCRO
+
+logger = get_logger()
+
+HORIZONTE_PADRAO = 3
+HARMONICOS_PADRAO = 2
+MESES_SAZONALIDADE = 24
+COLS_PREVISAO = [COL_FATURAMENTO, COL_LUCRO]
+SERIE_TOTAL = "total"
+
+COL_MES = "mes"
+COL_DIMENSAO = "dimensao"
+COL_SERIE = "serie"
+COL_PREVISTO = "previsto"
+
+# Parâmetros do modelo: intercepto, tendência e pares seno/cosseno anuais
+_INTERCEPTO, _TENDENCIA = 0, 1
+
+
+# -----------------------------------------------------------
+# 1) Agregado mensal (meses × séries)
+# -----------------------------------------------------------
+def _month_codes(dates: pd.Series) -> np.ndarray:
+    return dates.to_numpy().astype("datetime64[M]").astype(np.int64)
+
+
+def _monthly_matrix(codes: np.ndarray, series: np.ndarray, values: np.ndarray,
+                    first: int, months: int, n_series: int) -> np.ndarray:
+    matrix = np.zeros((months, n_series))
+    np.add.at(matrix, (codes - first, series), values)
+    return matrix
+
+
+def monthly_rollup(df: pd.DataFrame, chart_data: pd.DataFrame, dimensions: Iterable[str] = (),
+                   columns: Iterable[str] = COLS_PREVISAO) -> Tuple[np.ndarray, List[tuple], dict]:
+    """
+    Soma mensal da série total (a partir do agregado diário do gráfico) e
+    de cada valor das dimensões configuradas, em calendário contínuo.
+
+    Retorna (meses datetime64[M], [(dimensão, série)], {coluna: matriz meses × séries}).
+    """
+    codes = _month_codes(chart_data[COL_DATA])
+    first = int(codes.min())
+    months = int(codes.max()) - first + 1
+
+    meta = [(SERIE_TOTAL, SERIE_TOTAL)]
+    blocks = {col: [_monthly_matrix(codes, np.zeros(len(codes), dtype=np.int64),
+                                    chart_data[col].to_numpy(dtype=float), first, months, 1)]
+              for col in columns}
+
+    for dim in dimensions:
+        if dim not in df.columns:
+            logger.warning("Previsão: coluna de dimensão ausente ignorada: %s", dim)
+            continue
+        valid = df[dim].notna().to_numpy()
+        series, labels = pd.factorize(df[dim][valid], sort=True)
+        dim_codes = _month_codes(df[COL_DATA][valid])
+        meta += [(dim, label) for label in labels]
+        for col in columns:
+            values = df[col][valid].fillna(0).to_numpy(dtype=float)
+            blocks[col].append(_monthly_matrix(dim_codes, series, values, first, months, len(labels)))
+
+    calendar = np.arange(first, first + months).astype("datetime64[M]")
+    return calendar, meta, {col: np.hstack(blocks[col]) for col in columns}
+
+
+# -----------------------------------------------------------
+# 2) Ajuste em lote: tendência + sazonalidade anual
+# -----------------------------------------------------------
+def design_matrix(t: np.ndarray, harmonics: int = HARMONICOS_PADRAO) -> np.ndarray:
+    """
+    Colunas [1, t, sen(2πkt/12), cos(2πkt/12) para k = 1..harmonics]:
+    tendência linear com sazonalidade anual em termos de Fourier.
+    """
+    t = np.asarray(t, dtype=float)
+    columns = [np.ones_like(t), t]
+    for k in range(1, harmonics + 1):
+        angle = 2 * math.pi * k * t / 12
+        columns += [np.sin(angle), np.cos(angle)]
+    return np.column_stack(columns)
+
+
+def fit_batched(X: np.ndarray, Y: np.ndarray, mask: np.ndarray, active: np.ndarray) -> np.ndarray:
+    """
+    Mínimos quadrados de todas as séries (colunas de Y) de uma vez, pelas
+    equações normais em lote: para cada série s,
+
+        (Xᵀ W_s X) β_s = Xᵀ W_s y_s,   W_s = diag(mask[:, s])
+
+    resolvidas juntas com np.linalg.solve sobre um array séries × p × p.
+    `active` (séries × p, booleano) desliga parâmetros de séries curtas:
+    a linha/coluna vira identidade e o coeficiente sai zero.
+    """
+    W = mask.astype(float)
+    n, p = X.shape
+    # Produtos externos das linhas de X (n × p²) contra os pesos: uma multiplicação de matrizes
+    A = (W.T @ (X[:, :, None] * X[:, None, :]).reshape(n, p * p)).reshape(-1, p, p)
+    b = (W * Y).T @ X
+
+    on = active.astype(float)
+    A = A * on[:, :, None] * on[:, None, :] + np.eye(p) * (1 - on)[:, None, :]
+    b = b * on
+    # Séries sem nenhum mês observado: sistema trivial (coeficientes zero)
+    A[:, 0, 0] += A[:, 0, 0] == 0
+    return np.linalg.solve(A, b[..., None])[..., 0]
+
+
+@dataclass
+class ForecastResult:
+    """Histórico mensal usado no ajuste e projeções (horizonte × séries) por coluna."""
+    months: np.ndarray          # meses do histórico (datetime64[M])
+    future: np.ndarray          # meses projetados (datetime64[M])
+    meta: List[tuple]           # (dimensão, série) de cada coluna das matrizes
+    history: dict               # {coluna: meses × séries}
+    predictions: dict           # {coluna: horizonte × séries}
+    forecastable: np.ndarray    # séries com ao menos um mês observado
+
+    def frame(self) -> pd.DataFrame:
+        """Projeções em formato longo: mes, dimensao, serie e uma coluna por métrica."""
+        keep = np.flatnonzero(self.forecastable)
+        horizon = len(self.future)
+        out = pd.DataFrame({
+            COL_MES: np.tile(pd.to_datetime(self.future), len(keep)),
+            COL_DIMENSAO: np.repeat([self.meta[s][0] for s in keep], horizon),
+            COL_SERIE: np.repeat([self.meta[s][1] for s in keep], horizon),
+        })
+        for col, pred in self.predictions.items():
+            out[col] = pred[:, keep].T.ravel()
+        return out
+
+    def chart_frame(self, series: int = 0) -> pd.DataFrame:
+        """Histórico + projeção de uma série (padrão: total) para o visualizer."""
+        months = np.concatenate([self.months, self.future])
+        out = pd.DataFrame({COL_MES: pd.to_datetime(months)})
+        for col in self.history:
+            out[col] = np.concatenate([self.history[col][:, series], self.predictions[col][:, series]])
+        out[COL_PREVISTO] = np.r_[np.zeros(len(self.months), bool), np.ones(len(self.future), bool)]
+        return out
+
+    def records(self, limit: int = 20) -> list:
+        """
+        Linhas da tabela do PDF: total primeiro e depois as séries com maior
+        valor (primeira coluna, ex.: faturamento) nos últimos 12 meses, com
+        a projeção de cada mês.
+        """
+        recent = next(iter(self.history.values()))[-12:].sum(axis=0)
+        order = [0] + [s for s in np.argsort(-recent, kind="stable") if s != 0]
+        rows = []
+        for s in [s for s in order if self.forecastable[s]][:limit]:
+            dim, label = self.meta[s]
+            rows.append({
+                COL_DIMENSAO: dim,
+                COL_SERIE: str(label),
+                "meses": [str(m) for m in self.future],
+                **{col: [round(float(v), 2) for v in pred[:, s]] for col, pred in self.predictions.items()},
+            })
+        return rows
+
+
+def forecast_series(df: pd.DataFrame, chart_data: pd.DataFrame, dimensions: Iterable[str] = (),
+                    columns: Iterable[str] = COLS_PREVISAO, horizon: int = HORIZONTE_PADRAO,
+                    harmonics: int = HARMONICOS_PADRAO,
+                    seasonal_min_months: int = MESES_SAZONALIDADE) -> ForecastResult:
+    """
+    Projeta os próximos `horizon` meses de cada série (total e por valor de
+    dimensão) e coluna (faturamento, lucro) com tendência linear +
+    sazonalidade anual, ajustando todas as séries em um único lote.
+
+    - O mês mais recente é excluído do ajuste quando está incompleto (a
+      projeção começa nele).
+    - Cada série é ajustada a partir do seu primeiro mês com movimento
+      (filiais abertas depois não são puxadas para zero).
+    - Séries com menos de `seasonal_min_months` meses usam só a tendência;
+      com menos de 3, só a média. Faturamento projetado não fica negativo.
+    """
+    columns = [c for c in columns if c in chart_data.columns]
+    months, meta, matrices = monthly_rollup(df, chart_data, dimensions, columns)
+
+    last_day = chart_data[COL_DATA].max()
+    if len(months) > 1 and last_day.normalize() < last_day.normalize() + pd.offsets.MonthEnd(0):
+        months = months[:-1]
+        matrices = {col: m[:-1] for col, m in matrices.items()}
+
+    n_months, n_series = len(months), len(meta)
+    t = np.arange(n_months)
+    X = design_matrix(t, harmonics)
+    X_future = design_matrix(np.arange(n_months, n_months + horizon), harmonics)
+    future = months[-1] + np.arange(1, horizon + 1) if n_months else np.array([], dtype="datetime64[M]")
+
+    # Todas as colunas (faturamento, lucro) empilhadas como séries de um único lote
+    Y = np.hstack([matrices[col] for col in columns])
+    started = np.cumsum(Y != 0, axis=0) > 0
+    observed = started.sum(axis=0)
+
+    active = np.zeros((Y.shape[1], X.shape[1]), dtype=bool)
+    active[:, _INTERCEPTO] = True
+    active[:, _TENDENCIA] = observed >= 3
+    active[:, 2:] = (observed >= seasonal_min_months)[:, None]
+
+    coef = fit_batched(X, Y, started, active)
+    predicted = X_future @ coef.T
+
+    predictions = {col: predicted[:, i * n_series:(i + 1) * n_series] for i, col in enumerate(columns)}
+    if COL_FATURAMENTO in predictions:
+        # Tendência de queda não projeta faturamento negativo (lucro pode ser)
+        np.maximum(predictions[COL_FATURAMENTO], 0.0, out=predictions[COL_FATURAMENTO])
+    forecastable = (observed.reshape(len(columns), n_series) > 0).any(axis=0)
+    logger.info("Previsão: %d série(s) × %d coluna(s) ajustadas em lote sobre %d mês(es); horizonte %d.",
+                n_series, len(columns), n_months, horizon)
+    return ForecastResult(months, future, meta, matrices, predictions, forecastable)
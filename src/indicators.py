@@ -0,0 +1,298 @@
+import numpy as np
+import pandas as pd
+
+from src.logger import get_logger
+from src.storage import get_storage
+from src.transformer import COL_DATA, COL_FATURAMENTO, COL_LUCRO
+
+logger = get_logger()
+
+ARQUIVO_INDICADORES = "indicadores_estado.npz"
+COLS_INDICADORES = [COL_FATURAMENTO, COL_LUCRO]
+JANELAS = (7, 30)
+COL_MES = "mes"
+
+
+class _Growable:
+    """Array com capacidade dobrada sob demanda: anexar k valores custa O(k) amortizado."""
+
+    def __init__(self, data=(), dtype=float):
+        data = np.asarray(data, dtype=dtype)
+        self._buf = np.empty(max(16, 2 * len(data)), dtype=dtype)
+        self._buf[:len(data)] = data
+        self.n = len(data)
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=self._buf.dtype)
+        needed = self.n + len(values)
+        if needed > len(self._buf):
+            buf = np.empty(max(needed, 2 * len(self._buf)), dtype=self._buf.dtype)
+            buf[:self.n] = self._buf[:self.n]
+            self._buf = buf
+        self._buf[self.n:needed] = values
+        self.n = needed
+
+    @property
+    def array(self) -> np.ndarray:
+        return self._buf[:self.n]
+
+
+def _month_index(days: np.ndarray) -> np.ndarray:
+    """Índice de mês (ano*12 + mês-1) a partir de datetime64[D]."""
+    return days.astype("datetime64[M]").astype(np.int64)
+
+
+def _growth(current: np.ndarray, previous: np.ndarray) -> np.ndarray:
+    """Crescimento percentual; NaN quando a base é zero ou inexistente."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = (current / previous - 1.0) * 100
+    out[~np.isfinite(out)] = np.nan
+    return out
+
+
+class PeriodIndicators:
+    """
+    Médias móveis (7 e 30 dias) e crescimento mês a mês (MoM) e ano a ano
+    (YoY) de faturamento e lucro, mantidos incrementalmente sobre o
+    agregado diário de `prepare_chart_data`.
+
+    - A série diária é mantida em calendário contínuo (dias sem movimento = 0),
+      com somas acumuladas: a média móvel de um dia é (C[t] - C[t-w]) / w.
+      Os primeiros w-1 dias não têm janela completa (NaN).
+    - Os totais mensais e as taxas MoM/YoY (em %) são mantidos por mês; o
+      mês corrente pode estar parcial.
+    - `append` de dias posteriores ao último custa O(novos dias): só as
+      novas posições das janelas e os meses tocados são calculados.
+    - `update` (uma execução do pipeline) ainda custa O(histórico): o
+      histórico recebido é comparado com o processado e o estado é
+      regravado inteiro; só o cálculo das janelas e meses é incremental.
+    """
+
+    def __init__(self):
+        self.start = None     # primeiro dia (datetime64[D])
+        self.daily = {col: _Growable() for col in COLS_INDICADORES}
+        self.cums = {col: _Growable([0.0]) for col in COLS_INDICADORES}
+        self.moving = {(col, w): _Growable() for col in COLS_INDICADORES for w in JANELAS}
+        self.first_month = None
+        self.monthly = {col: _Growable() for col in COLS_INDICADORES}
+        self.mom = {col: _Growable() for col in COLS_INDICADORES}
+        self.yoy = {col: _Growable() for col in COLS_INDICADORES}
+
+    # ------------------------------------------------------
+    # Construção e atualização
+    # ------------------------------------------------------
+    @classmethod
+    def from_daily(cls, chart_data: pd.DataFrame) -> "PeriodIndicators":
+        indicators = cls()
+        indicators.append(chart_data)
+        return indicators
+
+    @property
+    def days(self) -> int:
+        return self.daily[COL_FATURAMENTO].n
+
+    @property
+    def last_day(self):
+        return None if self.start is None else self.start + np.timedelta64(self.days - 1, "D")
+
+    def _calendar(self, chart_data: pd.DataFrame, start, n_days: int) -> dict:
+        """Espalha o agregado diário em um calendário contínuo a partir de `start`."""
+        days = chart_data[COL_DATA].to_numpy().astype("datetime64[D]")
+        pos = (days - start).astype(np.int64)
+        out = {}
+        for col in COLS_INDICADORES:
+            values = np.zeros(n_days)
+            np.add.at(values, pos, chart_data[col].to_numpy(dtype=float))
+            out[col] = values
+        return out
+
+    def append(self, chart_data: pd.DataFrame):
+        """
+        Anexa dias estritamente posteriores ao último dia já processado.
+        Custo O(novos dias). Dias antigos → ValueError (use `update`).
+        """
+        if chart_data.empty:
+            return
+        days = chart_data[COL_DATA].to_numpy().astype("datetime64[D]")
+        first_new, last_new = days.min(), days.max()
+
+        if self.start is None:
+            self.start = first_new
+            self.first_month = int(_month_index(np.array([first_new]))[0])
+            offset = self.start
+        else:
+            if first_new <= self.last_day:
+                raise ValueError("append aceita apenas dias posteriores ao último dia processado.")
+            offset = self.last_day + np.timedelta64(1, "D")
+
+        n_new = int((last_new - offset).astype(np.int64)) + 1
+        new_values = self._calendar(chart_data, offset, n_new)
+        old_n = self.days
+
+        # 1) Série diária, somas acumuladas e médias móveis das novas posições
+        for col in COLS_INDICADORES:
+            self.daily[col].extend(new_values[col])
+            base = self.cums[col].array[-1]
+            self.cums[col].extend(base + np.cumsum(new_values[col]))
+
+            cums = self.cums[col].array
+            positions = np.arange(old_n, old_n + n_new)
+            for w in JANELAS:
+                lo = positions + 1 - w
+                ma = np.full(n_new, np.nan)
+                ok = lo >= 0
+                ma[ok] = (cums[positions[ok] + 1] - cums[lo[ok]]) / w
+                self.moving[(col, w)].extend(ma)
+
+        # 2) Totais mensais (meses tocados) e crescimento MoM/YoY
+        new_days = offset + np.arange(n_new).astype("timedelta64[D]")
+        month_pos = _month_index(new_days) - self.first_month
+        n_months = int(month_pos[-1]) + 1
+        old_months = self.monthly[COL_FATURAMENTO].n
+        first_touched = int(month_pos[0])
+
+        for col in COLS_INDICADORES:
+            sums = np.bincount(month_pos - first_touched, weights=new_values[col])
+            monthly = self.monthly[col]
+            if n_months > old_months:
+                monthly.extend(np.zeros(n_months - old_months))
+            monthly.array[first_touched:n_months] += sums
+
+            totals = monthly.array
+            touched = np.arange(first_touched, n_months)
+            prev = np.where(touched >= 1, totals[np.maximum(touched - 1, 0)], np.nan)
+            prev_year = np.where(touched >= 12, totals[np.maximum(touched - 12, 0)], np.nan)
+
+            for store, base in ((self.mom[col], prev), (self.yoy[col], prev_year)):
+                growth = _growth(totals[touched], base)
+                keep = store.n - first_touched if store.n > first_touched else 0
+                store.array[first_touched:first_touched + keep] = growth[:keep]
+                store.extend(growth[keep:])
+
+    def update(self, chart_data: pd.DataFrame) -> str:
+        """
+        Atualiza com o agregado diário completo de uma nova execução.
+
+        O histórico recebido é comparado inteiro com o já processado
+        (O(histórico), vetorizado). Se não mudou, só os dias novos são
+        anexados (janelas e meses em O(novos dias)); caso contrário,
+        recalcula tudo. Retorna "full", "incremental" ou "unchanged".
+        """
+        if self.start is None:
+            self.append(chart_data)
+            return "full"
+
+        days = chart_data[COL_DATA].to_numpy().astype("datetime64[D]")
+        is_old = days <= self.last_day
+        old = chart_data[is_old]
+
+        same_history = len(old) > 0 and days[is_old].min() >= self.start
+        if same_history:
+            calendar = self._calendar(old, self.start, self.days)
+            same_history = all(np.array_equal(calendar[c], self.daily[c].array) for c in COLS_INDICADORES)
+
+        if not same_history:
+            logger.info("Indicadores: histórico diário alterado; recalculando do início.")
+            self.__init__()
+            self.append(chart_data)
+            return "full"
+
+        new = chart_data[~is_old]
+        if new.empty:
+            return "unchanged"
+        self.append(new)
+        logger.info("Indicadores: %d novo(s) dia(s) anexado(s) incrementalmente.", len(new))
+        return "incremental"
+
+    # ------------------------------------------------------
+    # Saídas para os geradores
+    # ------------------------------------------------------
+    def daily_frame(self) -> pd.DataFrame:
+        """Série diária com médias móveis (colunas <col>_mm7, <col>_mm30)."""
+        data = {COL_DATA: pd.to_datetime(self.start + np.arange(self.days).astype("timedelta64[D]"))
+                if self.start is not None else pd.to_datetime([])}
+        for col in COLS_INDICADORES:
+            data[col] = self.daily[col].array.copy()
+            for w in JANELAS:
+                data[f"{col}_mm{w}"] = self.moving[(col, w)].array.copy()
+        return pd.DataFrame(data)
+
+    def monthly_frame(self) -> pd.DataFrame:
+        """Totais mensais com crescimento em % (colunas <col>_mom, <col>_yoy)."""
+        n = self.monthly[COL_FATURAMENTO].n
+        months = (np.arange(n) + (self.first_month or 0)).astype("datetime64[M]")
+        data = {COL_MES: pd.to_datetime(months)}
+        for col in COLS_INDICADORES:
+            data[col] = self.monthly[col].array.copy()
+            data[f"{col}_mom"] = self.mom[col].array.copy()
+            data[f"{col}_yoy"] = self.yoy[col].array.copy()
+        return pd.DataFrame(data)
+
+    def latest(self) -> dict:
+        """Valores mais recentes (último dia/mês) para o resumo do PDF."""
+        if self.start is None:
+            return {}
+        last_month = np.datetime64(self.first_month + self.monthly[COL_FATURAMENTO].n - 1, "M")
+        out = {"data": str(self.last_day), "mes": str(last_month)}
+        for col in COLS_INDICADORES:
+            for w in JANELAS:
+                out[f"{col}_mm{w}"] = _round(self.moving[(col, w)].array[-1])
+            out[f"{col}_mom"] = _round(self.mom[col].array[-1])
+            out[f"{col}_yoy"] = _round(self.yoy[col].array[-1])
+        return out
+
+    # ------------------------------------------------------
+    # Persistência do estado (entre execuções)
+    # ------------------------------------------------------
+    def save(self, path: str, storage=None):
+        arrays = {"start": np.array([] if self.start is None else [self.start], dtype="datetime64[D]"),
+                  "first_month": np.array([-1 if self.first_month is None else self.first_month])}
+        for col in COLS_INDICADORES:
+            arrays[f"daily_{col}"] = self.daily[col].array
+            arrays[f"cums_{col}"] = self.cums[col].array
+            arrays[f"monthly_{col}"] = self.monthly[col].array
+            arrays[f"mom_{col}"] = self.mom[col].array
+            arrays[f"yoy_{col}"] = self.yoy[col].array
+            for w in JANELAS:
+                arrays[f"mm{w}_{col}"] = self.moving[(col, w)].array
+
+        with get_storage(storage).atomic_write(path) as f:
+            np.savez(f, **arrays)
+
+    @classmethod
+    def load(cls, path: str, storage=None) -> "PeriodIndicators":
+        indicators = cls()
+        with get_storage(storage).open(path, "rb") as f, np.load(f) as data:
+            if len(data["start"]) == 0:
+                return indicators
+            indicators.start = data["start"][0]
+            indicators.first_month = int(data["first_month"][0])
+            for col in COLS_INDICADORES:
+                indicators.daily[col] = _Growable(data[f"daily_{col}"])
+                indicators.cums[col] = _Growable(data[f"cums_{col}"])
+                indicators.monthly[col] = _Growable(data[f"monthly_{col}"])
+                indicators.mom[col] = _Growable(data[f"mom_{col}"])
+                indicators.yoy[col] = _Growable(data[f"yoy_{col}"])
+                for w in JANELAS:
+                    indicators.moving[(col, w)] = _Growable(data[f"mm{w}_{col}"])
+        return indicators
+
+
+def _round(value: float):
+    return None if np.isnan(value) else round(float(value), 2)
+
+
+def update_indicators(chart_data: pd.DataFrame, state_path: str, storage=None) -> PeriodIndicators:
+    """
+    Carrega o estado salvo em `state_path` (se existir), atualiza com o
+    agregado diário da execução e grava o novo estado (o arquivo inteiro;
+    nada é regravado quando o histórico não mudou).
+    """
+    storage = get_storage(storage)
+    indicators = PeriodIndicators.load(state_path, storage) if storage.exists(state_path) else PeriodIndicators()
+    mode = indicators.update(chart_data)
+    if mode != "unchanged":
+        indicators.save(state_path, storage)
+    logger.info(f"Indicadores atualizados ({mode}): {indicators.days} dias, "
+                f"{indicators.monthly[COL_FATURAMENTO].n} meses.")
+    return indicators
@@ -0,0 +1,232 @@
+import contextvars
+import cProfile
+import json
+import marshal
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from src.logger import get_logger, log_context
+from src.storage import get_storage
+
+logger = get_logger()
+
+# Profiler ativo e etapa corrente. ContextVars acompanham a execução mesmo
+# quando as etapas rodam em threads (o scheduler copia o contexto).
+_active_profiler = contextvars.ContextVar("active_profiler", default=None)
+_current_stage = contextvars.ContextVar("current_stage", default=None)
+
+MB = 1024 * 1024
+
+
+class StageRecord:
+    """Medições de uma etapa: tempo de parede, CPU, pico de memória e linhas."""
+
+    def __init__(self, name: str, parent: str = None, rows_in: int = None):
+        self.name = name
+        self.parent = parent
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.wall_s = 0.0
+        self.cpu_s = 0.0
+        self.peak_mem_mb = None
+        self.status = "ok"
+        self._peak_bytes = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "stage": self.name,
+            "parent": self.parent,
+            "status": self.status,
+            "wall_s": round(self.wall_s, 4),
+            "cpu_s": round(self.cpu_s, 4),
+            "peak_mem_mb": self.peak_mem_mb,
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+        }
+
+
+class RunProfiler:
+    """
+    Instrumentação de uma execução do pipeline.
+
+    Registra, para cada etapa aberta com `stage(...)`:
+    - wall_s: tempo de parede (perf_counter)
+    - cpu_s: tempo de CPU da thread que executou a etapa (thread_time)
+    - peak_mem_mb: pico de memória rastreada pelo tracemalloc enquanto a etapa
+      estava aberta (pico do processo; etapas concorrentes se sobrepõem)
+    - rows_in / rows_out: linhas de entrada e saída, quando informadas
+
+    Opcionalmente grava um dump do cProfile para uma única etapa
+    (`profile_stage`). Ao final, `write_report` gera um JSON por execução.
+    """
+
+    def __init__(self, trace_memory: bool = True, profile_stage: str = None):
+        self.run_id = f"{datetime.now():%Y%m%d_%H%M%S}_{uuid.uuid4().hex[:6]}"
+        self.trace_memory = trace_memory
+        self.profile_stage = profile_stage
+        self.records = []
+        self.status = "ok"
+        self.extra = {}
+        self.profile_output = None
+        self._profile = None
+        self._open = []
+        self._lock = threading.Lock()
+        self._started_tracing = False
+        self._token = None
+        self._log_context = None
+        self._started_at = None
+        self._finished_at = None
+        self._start = None
+        self._wall_s = 0.0
+
+    # ------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------
+    def __enter__(self):
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self._token = _active_profiler.set(self)
+        # Registros de log emitidos durante a execução levam o run_id
+        self._log_context = log_context(run_id=self.run_id)
+        self._log_context.__enter__()
+        self._started_at = datetime.now()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._wall_s = time.perf_counter() - self._start
+        self._finished_at = datetime.now()
+        if exc_type is not None:
+            self.status = "failed"
+        self._log_context.__exit__(None, None, None)
+        _active_profiler.reset(self._token)
+        if self._started_tracing:
+            tracemalloc.stop()
+        return False
+
+    # ------------------------------------------------------
+    # Memória: o pico do tracemalloc é global, então a cada reset o pico
+    # atual é repassado para todas as etapas abertas no momento.
+    # ------------------------------------------------------
+    def _absorb_peak_and_reset(self):
+        if not tracemalloc.is_tracing():
+            return
+        _, peak = tracemalloc.get_traced_memory()
+        for record in self._open:
+            record._peak_bytes = max(record._peak_bytes, peak)
+        tracemalloc.reset_peak()
+
+    @contextmanager
+    def stage(self, name: str, rows_in: int = None):
+        parent = _current_stage.get()
+        record = StageRecord(name, parent.name if parent else None, rows_in)
+
+        with self._lock:
+            self._absorb_peak_and_reset()
+            self._open.append(record)
+
+        profile = None
+        if self.profile_stage == name and self._profile is None:
+            profile = self._profile = cProfile.Profile()
+            profile.enable()
+
+        token = _current_stage.set(record)
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield record
+        except BaseException:
+            record.status = "failed"
+            raise
+        finally:
+            record.wall_s = time.perf_counter() - wall_start
+            record.cpu_s = time.thread_time() - cpu_start
+            _current_stage.reset(token)
+
+            if profile is not None:
+                profile.disable()
+
+            with self._lock:
+                self._absorb_peak_and_reset()
+                self._open.remove(record)
+                if tracemalloc.is_tracing():
+                    record.peak_mem_mb = round(record._peak_bytes / MB, 3)
+                self.records.append(record)
+
+    # ------------------------------------------------------
+    # Relatório
+    # ------------------------------------------------------
+    def to_dict(self) -> dict:
+        return {
+            "run_id": self.run_id,
+            "status": self.status,
+            "started_at": self._started_at.isoformat() if self._started_at else None,
+            "finished_at": self._finished_at.isoformat() if self._finished_at else None,
+            "wall_s": round(self._wall_s, 4),
+            "stages": [record.to_dict() for record in self.records],
+            "profile_output": self.profile_output,
+            **self.extra,
+        }
+
+    def write_report(self, reports_dir: str, storage=None) -> str:
+        """
+        Grava o relatório da execução em `<reports_dir>/run_<run_id>.json`
+        (e o dump do cProfile, se habilitado). Retorna o caminho do JSON.
+        """
+        storage = get_storage(storage)
+        out_dir = Path(reports_dir)
+        storage.makedirs(str(out_dir))
+
+        if self._profile is not None:
+            # Mesmo conteúdo de Profile.dump_stats, gravado via storage
+            prof_path = out_dir / f"run_{self.run_id}_{self.profile_stage}.prof"
+            self._profile.create_stats()
+            storage.write_bytes(str(prof_path), marshal.dumps(self._profile.stats))
+            self.profile_output = str(prof_path)
+
+        report_path = out_dir / f"run_{self.run_id}.json"
+        with storage.atomic_write(str(report_path), "w") as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+
+        logger.info(f"Relatório de execução salvo em: {report_path}")
+        return str(report_path)
+
+
+class _NullRecord:
+    """Registro descartável usado quando não há profiler ativo."""
+    rows_in = None
+    rows_out = None
+    name = None
+
+
+@contextmanager
+def stage(name: str, rows_in: int = None):
+    """
+    Abre uma etapa instrumentada no profiler ativo. Sem profiler ativo,
+    não mede nada (custo desprezível), o que permite instrumentar funções
+    de biblioteca como as do transformer. Em ambos os casos, os registros
+    de log emitidos dentro da etapa levam o campo `stage`.
+
+    Uso:
+        with stage("clean_and_convert", rows_in=len(df)) as s:
+            ...
+            s.rows_out = len(df_clean)
+    """
+    profiler = _active_profiler.get()
+    with log_context(stage=name):
+        if profiler is None:
+            yield _NullRecord()
+            return
+        with profiler.stage(name, rows_in) as record:
+            yield record
+
+
+def current_profiler():
+    """Retorna o RunProfiler ativo no contexto atual (ou None)."""
+    return _active_profiler.get()
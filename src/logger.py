@@ -1,17 +1,230 @@
+import atexit
+import contextvars
+import json
 import logging
+import logging.handlers
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from datetime import datetime
 from pathlib import Path
 
-def get_logger(name="financial"):
-    log_path = Path("data/reports/logs.txt")
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
+LOG_PATH_PADRAO = "data/reports/logs.txt"
+
+# Configuração padrão (sobrescrita pela seção `logging` do config.yaml)
+CONFIG_PADRAO = {
+    "path": LOG_PATH_PADRAO,  # None: sem arquivo (apenas console)
+    "level": "INFO",
+    "format": "text",        # "text" ou "json" (uma linha JSON por registro)
+    "rotation": "size",      # "size" (tamanho) ou "time" (intervalo)
+    "max_bytes": 5 * 1024 * 1024,
+    "when": "midnight",
+    "backup_count": 5,
+    "console": True,
+}
+
+# Campos estruturados do contexto atual (run_id, stage...). ContextVar
+# acompanha threads do scheduler (contexto copiado) e tarefas asyncio.
+_log_fields = contextvars.ContextVar("log_fields", default={})
+
+_state_lock = threading.RLock()
+_state = {"settings": None, "listener": None, "queue_handler": None}
+
+
+# -----------------------------------------------------------
+# 1) Contexto estruturado e mensagens preguiçosas
+# -----------------------------------------------------------
+@contextmanager
+def log_context(**fields):
+    """
+    Anexa campos (ex.: run_id, stage) a todos os registros emitidos dentro
+    do bloco, inclusive em threads que herdam o contexto.
+    """
+    token = _log_fields.set({**_log_fields.get(), **fields})
+    try:
+        yield
+    finally:
+        _log_fields.reset(token)
+
+
+class lazy:
+    """
+    Adia a construção de uma mensagem cara até ela ser de fato emitida.
+
+    Uso em laços (custo zero quando DEBUG está desabilitado):
+        logger.debug("Linhas descartadas: %s", lazy(lambda: df[mask].index.tolist()))
+    """
+    __slots__ = ("func", "args", "kwargs")
+
+    def __init__(self, func, *args, **kwargs):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+
+    def __str__(self):
+        return str(self.func(*self.args, **self.kwargs))
+
+
+class _ContextFilter(logging.Filter):
+    # Executa na thread que emite o registro (antes da fila), capturando o contexto
+    def filter(self, record):
+        fields = _log_fields.get()
+        record.run_id = fields.get("run_id")
+        record.stage = fields.get("stage")
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Formata cada registro como uma linha JSON com run_id e stage."""
+
+    def format(self, record):
+        payload = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "run_id": getattr(record, "run_id", None),
+            "stage": getattr(record, "stage", None),
+        }
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        elif getattr(record, "exc_text", None):
+            payload["exc"] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False)
+
+
+# -----------------------------------------------------------
+# 2) Configuração: QueueHandler → QueueListener (thread dedicada)
+# -----------------------------------------------------------
+def _build_file_handler(settings: dict) -> logging.Handler:
+    log_path = Path(settings["path"])
     log_path.parent.mkdir(parents=True, exist_ok=True)
 
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s [%(levelname)s] %(message)s",
-        handlers=[
-            logging.FileHandler(log_path, encoding="utf-8"),
-            logging.StreamHandler()
-        ]
-    )
+    if settings["rotation"] == "time":
+        handler = logging.handlers.TimedRotatingFileHandler(
+            log_path, when=settings["when"], backupCount=settings["backup_count"], encoding="utf-8"
+        )
+    elif settings["rotation"] == "size":
+        handler = logging.handlers.RotatingFileHandler(
+            log_path, maxBytes=settings["max_bytes"], backupCount=settings["backup_count"], encoding="utf-8"
+        )
+    else:
+        raise ValueError(f"Rotação de log inválida: {settings['rotation']!r}. Use 'size' ou 'time'.")
+
+    handler.setFormatter(JsonFormatter() if settings["format"] == "json" else logging.Formatter(LOG_FORMAT))
+    return handler
+
+
+def _stop_listener():
+    listener = _state["listener"]
+    if listener is not None:
+        listener.stop()  # drena a fila antes de parar
+        for handler in listener.handlers:
+            handler.close()
+    _state["listener"] = None
+
+
+def configure_logging(**settings) -> dict:
+    """
+    (Re)configura o log do processo. Chamadas repetidas com a mesma
+    configuração não fazem nada.
+
+    - O root logger recebe apenas um QueueHandler: emitir um log custa uma
+      inserção na fila; a escrita em disco/console ocorre na thread do
+      QueueListener.
+    - Arquivo com rotação por tamanho (max_bytes) ou tempo (when).
+    - format="json": uma linha JSON por registro com run_id e stage.
+    """
+    unknown = set(settings) - set(CONFIG_PADRAO)
+    if unknown:
+        raise ValueError(f"Opções de log desconhecidas: {sorted(unknown)}")
+    settings = {**CONFIG_PADRAO, **settings}
+
+    with _state_lock:
+        if settings == _state["settings"]:
+            return settings
+
+        root = logging.getLogger()
+        _stop_listener()
+        if _state["queue_handler"] is not None:
+            root.removeHandler(_state["queue_handler"])
+
+        handlers = [_build_file_handler(settings)] if settings["path"] else []
+        if settings["console"]:
+            console = logging.StreamHandler()
+            console.setFormatter(logging.Formatter(LOG_FORMAT))
+            handlers.append(console)
+
+        log_queue = queue.SimpleQueue()
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        queue_handler.addFilter(_ContextFilter())
+        listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        listener.start()
+
+        root.addHandler(queue_handler)
+        root.setLevel(logging.getLevelName(str(settings["level"]).upper()))
+
+        _state.update(settings=settings, listener=listener, queue_handler=queue_handler)
+        return settings
+
+
+def flush_logs():
+    """Aguarda a escrita de todos os registros já enfileirados."""
+    with _state_lock:
+        listener = _state["listener"]
+        if listener is not None:
+            listener.stop()
+            listener.start()
+
+
+def _restart_after_fork():
+    # Processos filhos (fork) não herdam a thread do listener: recria o par
+    # fila/listener, mas SEM o arquivo do pai. Vários processos rotacionando
+    # o mesmo arquivo perdem ou embaralham registros; até escolher o próprio
+    # arquivo (set_log_file), o filho registra apenas no console.
+    global _state_lock
+    _state_lock = threading.RLock()  # o lock herdado pode estar preso por outra thread do pai
+    settings = _state["settings"]
+    if settings is None:
+        return
+    if _state["queue_handler"] is not None:
+        logging.getLogger().removeHandler(_state["queue_handler"])
+    # Os handlers herdados pertencem ao listener do pai: apenas descartados
+    _state.update(settings=None, listener=None, queue_handler=None)
+    configure_logging(**{**settings, "path": None})
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_after_fork)
+
+atexit.register(_stop_listener)
+
+
+# -----------------------------------------------------------
+# 3) API usada pelos módulos
+# -----------------------------------------------------------
+def get_logger(name="financial"):
+    """
+    Retorna o logger nomeado. Na primeira chamada, configura o log padrão
+    se nenhum handler estiver instalado no root (mesma regra do basicConfig).
+    """
+    with _state_lock:
+        if _state["settings"] is None and not logging.getLogger().handlers:
+            configure_logging()
 
     return logging.getLogger(name)
+
+
+def set_log_file(log_path: str = None) -> str:
+    """
+    Redireciona o arquivo de log do processo para `log_path` (None: apenas
+    console), mantendo as demais opções (ex.: um log por cliente no modo
+    batch). Os registros pendentes do arquivo anterior são gravados antes
+    da troca. Retorna o caminho anterior, para restaurá-lo depois.
+    """
+    with _state_lock:
+        current = _state["settings"] or CONFIG_PADRAO
+        configure_logging(**{**current, "path": str(log_path) if log_path else None})
+        return current["path"]
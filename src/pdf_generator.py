@@ -1,5 +1,7 @@
+import io
 import os
 from datetime import datetime
+from functools import lru_cache
 
 # Removida a dependência do plotly aqui, pois o gráfico vem como imagem
 from reportlab.platypus import (
@@ -9,69 +11,69 @@ from reportlab.platypus import (
     Image,
     Table,
     TableStyle,
+    Flowable,
 )
 from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.utils import ImageReader
 from reportlab.lib import colors
 from reportlab.lib.units import cm
 
 from src.logger import get_logger
+from src.storage import LocalStorage, get_storage, open_output
 
 logger = get_logger()
 
+TITULO_PADRAO = "Relatório Financeiro Consolidado"
 
-def generate_pdf_report_advanced(
-    metrics: dict,
-    output_path: str,
-    chart_path: str = None,
-    logo_path: str = None
-):
+
+class _PreloadedImage(Flowable):
     """
-    Gera um PDF profissional contendo:
-    - Cabeçalho com logo (opcional)
-    - Tabela de métricas
-    - Imagem do gráfico (gerado previamente pelo visualizer)
-    - Rodapé com data
+    Flowable que desenha uma imagem já decodificada (ImageReader).
+    Evita reabrir e decodificar o arquivo do logo a cada PDF gerado.
     """
-    logger.info("Iniciando geração do PDF avançado...")
 
-    # Garante que o diretório de saída existe
-    output_dir = os.path.dirname(output_path)
-    if output_dir:
-        os.makedirs(output_dir, exist_ok=True)
+    def __init__(self, reader: ImageReader, width: float, height: float):
+        super().__init__()
+        self.reader = reader
+        self.width = width
+        self.height = height
+        self.hAlign = "CENTER"
 
-    # Documento PDF
-    doc = SimpleDocTemplate(output_path, pagesize=A4)
-    story = []
-    styles = getSampleStyleSheet()
+    def draw(self):
+        self.canv.drawImage(self.reader, 0, 0, self.width, self.height, mask="auto")
 
-    # ------------------------------------------------------
-    # 1) Cabeçalho com logo ou título
-    # ------------------------------------------------------
-    if logo_path and os.path.exists(logo_path):
-        story.append(Image(logo_path, width=120, height=60))
-    else:
-        title_style = styles["Title"]
-        title_style.alignment = 1  # Center
-        story.append(Paragraph("<b>Relatório Financeiro Consolidado</b>", title_style))
 
-    story.append(Spacer(1, 20))
+class PdfReportTemplate:
+    """
+    Template de relatório PDF preparado uma única vez e reutilizável.
 
-    # ------------------------------------------------------
-    # 2) Tabela de métricas
-    # ------------------------------------------------------
-    data = [
-        ["Métrica", "Valor"],
-        ["Faturamento Total", f"R$ {metrics['faturamento_total']:.2f}"],
-        ["Custos Totais", f"R$ {metrics['custos_totais']:.2f}"],
-        ["Lucro Total", f"R$ {metrics['lucro_total']:.2f}"],
-        ["Lucro Percentual", f"{metrics['lucro_percentual']}%"],
-    ]
-
-    # Estilização da Tabela
-    table = Table(data, colWidths=[7 * cm, 7 * cm])
-    table.setStyle(
-        TableStyle(
+    Mantém em memória os estilos de parágrafo (cópias derivadas, sem alterar
+    os estilos globais do ReportLab), o TableStyle da tabela de métricas e o
+    logo já decodificado. Pode renderizar quantos PDFs forem necessários,
+    para arquivo ou para buffer em memória, sem reinicializar nada.
+
+    O logo e os gráficos passados como caminho são lidos via `storage`
+    (padrão: disco local).
+    """
+
+    def __init__(self, logo_path: str = None, title: str = TITULO_PADRAO, pagesize=A4, storage=None):
+        self.title = title
+        self.pagesize = pagesize
+        self.storage = get_storage(storage)
+
+        # Estilos derivados (parent=...) em vez de alterar "Title"/"Normal" in-place
+        base = getSampleStyleSheet()
+        self.title_style = ParagraphStyle("RelatorioTitulo", parent=base["Title"], alignment=TA_CENTER)
+        self.heading_style = ParagraphStyle("RelatorioSecao", parent=base["Heading2"])
+        self.body_style = ParagraphStyle("RelatorioCorpo", parent=base["Normal"])
+        self.footer_style = ParagraphStyle(
+            "RelatorioRodape", parent=base["Normal"], fontSize=8, textColor=colors.gray
+        )
+
+        # Estilização da Tabela (construída uma única vez)
+        self.table_style = TableStyle(
             [
                 ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#004c99")),
                 ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
@@ -84,44 +86,254 @@ def generate_pdf_report_advanced(
                 ("TOPPADDING", (0, 0), (-1, -1), 10),
             ]
         )
-    )
 
-    story.append(table)
-    story.append(Spacer(1, 25))
+        self.logo = self._load_logo(logo_path, self.storage)
+
+    @staticmethod
+    def _load_logo(logo_path: str, storage):
+        """Decodifica o logo uma única vez. Retorna None se indisponível."""
+        if not logo_path or not storage.exists(logo_path):
+            return None
+        try:
+            return ImageReader(io.BytesIO(storage.read_bytes(logo_path)))
+        except Exception as e:
+            logger.warning(f"Logo inválido, usando título no cabeçalho: {logo_path}. Erro: {e}")
+            return None
 
     # ------------------------------------------------------
-    # 3) Gráfico (Inserção da Imagem)
+    # Montagem do conteúdo
     # ------------------------------------------------------
-    story.append(Paragraph("<b>Desempenho Financeiro (Gráfico)</b>", styles["Heading2"]))
-    story.append(Spacer(1, 10))
+    def _chart_flowable(self, chart):
+        """
+        Aceita o gráfico como caminho (lido via `storage`), bytes (PNG) ou
+        objeto file-like. Retorna None se o gráfico não estiver disponível.
+        """
+        if chart is None:
+            return None
+        if isinstance(chart, (bytes, bytearray)):
+            return Image(io.BytesIO(chart), width=16 * cm, height=9 * cm)
+        if hasattr(chart, "read"):
+            return Image(chart, width=16 * cm, height=9 * cm)
+        if self.storage.exists(chart):
+            # Ajusta tamanho da imagem proporcionalmente
+            return Image(io.BytesIO(self.storage.read_bytes(chart)), width=16 * cm, height=9 * cm)
+        return None
+
+    def build_story(self, metrics: dict, chart=None, indicators: dict = None,
+                    anomalies: list = None, forecast: list = None, forecast_chart=None) -> list:
+        """
+        Monta a lista de flowables do relatório:
+        - Cabeçalho com logo (opcional)
+        - Tabela de métricas
+        - Tabela de indicadores (opcional, `PeriodIndicators.latest()`)
+        - Tabela de anomalias (opcional, `anomalies.anomaly_records()`)
+        - Imagem do gráfico
+        - Projeção mensal (opcional, `ForecastResult.records()` + gráfico)
+        - Rodapé com data
+        """
+        story = []
+
+        # 1) Cabeçalho com logo ou título
+        if self.logo is not None:
+            story.append(_PreloadedImage(self.logo, width=120, height=60))
+        else:
+            story.append(Paragraph(f"<b>{self.title}</b>", self.title_style))
+
+        story.append(Spacer(1, 20))
+
+        # 2) Tabela de métricas
+        data = [
+            ["Métrica", "Valor"],
+            ["Faturamento Total", f"R$ {metrics['faturamento_total']:.2f}"],
+            ["Custos Totais", f"R$ {metrics['custos_totais']:.2f}"],
+            ["Lucro Total", f"R$ {metrics['lucro_total']:.2f}"],
+            ["Lucro Percentual", f"{metrics['lucro_percentual']}%"],
+        ]
+
+        table = Table(data, colWidths=[7 * cm, 7 * cm])
+        table.setStyle(self.table_style)
+
+        story.append(table)
+        story.append(Spacer(1, 25))
+
+        # 2.1) Indicadores de período (médias móveis e crescimento)
+        if indicators:
+            story.append(Paragraph("<b>Indicadores de Período</b>", self.heading_style))
+            story.append(Spacer(1, 10))
+            story.append(self._indicators_table(indicators))
+            story.append(Spacer(1, 25))
+
+        # 2.2) Dias atípicos (mais recentes primeiro)
+        if anomalies:
+            story.append(Paragraph("<b>Anomalias Detectadas</b>", self.heading_style))
+            story.append(Spacer(1, 10))
+            story.append(self._anomalies_table(anomalies))
+            story.append(Spacer(1, 25))
+
+        # 3) Gráfico (Inserção da Imagem)
+        story.append(Paragraph("<b>Desempenho Financeiro (Gráfico)</b>", self.heading_style))
+        story.append(Spacer(1, 10))
+
+        img = self._chart_flowable(chart)
+        if img is not None:
+            story.append(img)
+        else:
+            logger.warning(f"Gráfico não encontrado no caminho: {chart}")
+            story.append(Paragraph("<i>Gráfico indisponível no momento.</i>", self.body_style))
+
+        story.append(Spacer(1, 20))
 
-    if chart_path and os.path.exists(chart_path):
-        # Ajusta tamanho da imagem proporcionalmente
-        img = Image(chart_path, width=16 * cm, height=9 * cm)
-        story.append(img)
-    else:
-        logger.warning(f"Gráfico não encontrado no caminho: {chart_path}")
-        story.append(Paragraph("<i>Gráfico indisponível no momento.</i>", styles["Normal"]))
+        # 3.1) Projeção dos próximos meses por série (total e filiais)
+        if forecast:
+            horizon = len(forecast[0]["meses"])
+            story.append(Paragraph(f"<b>Projeção (próximos {horizon} meses)</b>", self.heading_style))
+            story.append(Spacer(1, 10))
+            img = self._chart_flowable(forecast_chart)
+            if img is not None:
+                story.append(img)
+                story.append(Spacer(1, 10))
+            story.append(self._forecast_table(forecast))
+            story.append(Spacer(1, 20))
 
-    story.append(Spacer(1, 20))
+        # 4) Rodapé com data e hora
+        data_atual = datetime.now().strftime("%d/%m/%Y %H:%M")
+        story.append(Spacer(1, 30))
+        story.append(Paragraph(f"Relatório gerado automaticamente em {data_atual}", self.footer_style))
+
+        return story
+
+    def _indicators_table(self, indicators: dict) -> Table:
+        def moeda(value):
+            return "—" if value is None else f"R$ {value:.2f}"
+
+        def pct(value):
+            return "—" if value is None else f"{value:+.2f}%"
+
+        data = [["Indicador", "Faturamento", "Lucro"]]
+        data.append([f"Média móvel 7 dias ({indicators['data']})",
+                     moeda(indicators["faturamento_mm7"]), moeda(indicators["lucro_mm7"])])
+        data.append([f"Média móvel 30 dias ({indicators['data']})",
+                     moeda(indicators["faturamento_mm30"]), moeda(indicators["lucro_mm30"])])
+        data.append([f"Crescimento mês a mês ({indicators['mes']})",
+                     pct(indicators["faturamento_mom"]), pct(indicators["lucro_mom"])])
+        data.append([f"Crescimento ano a ano ({indicators['mes']})",
+                     pct(indicators["faturamento_yoy"]), pct(indicators["lucro_yoy"])])
+
+        table = Table(data, colWidths=[8 * cm, 4 * cm, 4 * cm])
+        table.setStyle(self.table_style)
+        return table
+
+    def _anomalies_table(self, anomalies: list) -> Table:
+        data = [["Data", "Série", "Coluna", "Valor", "Mediana", "z"]]
+        for item in anomalies:
+            serie = "Total" if item["dimensao"] == "total" else f"{item['dimensao']}: {item['serie']}"
+            data.append([item["data"], serie, item["coluna"], f"R$ {item['valor']:.2f}",
+                         f"R$ {item['mediana']:.2f}", f"{item['z_robusto']:+.1f}"])
+
+        table = Table(data, colWidths=[2.4 * cm, 4.2 * cm, 2.4 * cm, 3 * cm, 3 * cm, 1.5 * cm])
+        table.setStyle(self.table_style)
+        return table
+
+    def _forecast_table(self, forecast: list) -> Table:
+        meses = [f"{m[5:7]}/{m[:4]}" for m in forecast[0]["meses"]]
+        data = [["Série", "Métrica", *meses]]
+        for item in forecast:
+            serie = "Total" if item["dimensao"] == "total" else f"{item['dimensao']}: {item['serie']}"
+            for col, label in (("faturamento", "Faturamento"), ("lucro", "Lucro")):
+                if col in item:
+                    data.append([serie, label, *[f"R$ {v:.2f}" for v in item[col]]])
+
+        width = 10 * cm / max(len(meses), 1)
+        table = Table(data, colWidths=[4 * cm, 2.8 * cm, *[width] * len(meses)])
+        table.setStyle(self.table_style)
+        return table
 
     # ------------------------------------------------------
-    # 4) Rodapé com data e hora
+    # Renderização
     # ------------------------------------------------------
-    data_atual = datetime.now().strftime("%d/%m/%Y %H:%M")
-    footer_style = styles["Normal"]
-    footer_style.fontSize = 8
-    footer_style.textColor = colors.gray
-    
-    story.append(Spacer(1, 30))
-    story.append(Paragraph(f"Relatório gerado automaticamente em {data_atual}", footer_style))
+    def render(self, metrics: dict, output, chart=None, indicators: dict = None,
+               anomalies: list = None, forecast: list = None, forecast_chart=None):
+        """
+        Renderiza o PDF em `output`, que pode ser um caminho ou um objeto
+        file-like (ex.: io.BytesIO).
+        """
+        if not hasattr(output, "write"):
+            # Garante que o diretório de saída existe
+            output_dir = os.path.dirname(str(output))
+            if output_dir:
+                os.makedirs(output_dir, exist_ok=True)
+            output = str(output)
+
+        doc = SimpleDocTemplate(output, pagesize=self.pagesize)
+        doc.build(self.build_story(metrics, chart, indicators, anomalies, forecast, forecast_chart))
+
+    def render_to_bytes(self, metrics: dict, chart=None, indicators: dict = None,
+                        anomalies: list = None, forecast: list = None, forecast_chart=None) -> bytes:
+        """Renderiza o PDF inteiramente em memória e retorna os bytes."""
+        buffer = io.BytesIO()
+        self.render(metrics, buffer, chart, indicators, anomalies, forecast, forecast_chart)
+        return buffer.getvalue()
+
+
+@lru_cache(maxsize=8)
+def _cached_template(storage, logo_path: str, logo_stat: tuple, title: str) -> PdfReportTemplate:
+    # (tamanho, mtime) do logo fazem parte da chave: se o logo mudar, o template é refeito.
+    return PdfReportTemplate(logo_path=logo_path, title=title, storage=storage)
+
+
+def get_report_template(logo_path: str = None, title: str = TITULO_PADRAO, storage=None) -> PdfReportTemplate:
+    """
+    Retorna um PdfReportTemplate compartilhado para o logo (lido via
+    `storage`) e título informados, preparado apenas na primeira chamada.
+    """
+    storage = get_storage(storage)
+    if logo_path and isinstance(storage, LocalStorage):
+        # Caminho absoluto na chave: caminhos relativos iguais de clientes
+        # diferentes (modo batch muda o diretório atual) não colidem
+        logo_path = os.path.abspath(logo_path)
+    logo_stat = storage.stat(logo_path) if logo_path and storage.exists(logo_path) else None
+    return _cached_template(storage, logo_path, logo_stat, title)
+
+
+def generate_pdf_report_advanced(
+    metrics: dict,
+    output_path: str,
+    chart_path: str = None,
+    logo_path: str = None,
+    indicators: dict = None,
+    anomalies: list = None,
+    forecast: list = None,
+    forecast_chart_path: str = None,
+    title: str = TITULO_PADRAO,
+    storage=None
+):
+    """
+    Gera um PDF profissional contendo:
+    - Cabeçalho com logo (opcional) ou `title`
+    - Tabela de métricas
+    - Imagem do gráfico (gerado previamente pelo visualizer)
+    - Projeção mensal (opcional): tabela `forecast` e gráfico `forecast_chart_path`
+    - Rodapé com data
+
+    `output_path`, `chart_path` e `logo_path` podem ser caminhos (via
+    `storage`, padrão: disco local); saída e gráfico também podem ser
+    arquivos binários já abertos, e o gráfico, bytes.
+
+    Usa um PdfReportTemplate em cache, de forma que chamadas repetidas
+    não reconstroem estilos nem recarregam o logo.
+    """
+    logger.info("Iniciando geração do PDF avançado...")
+
+    template = get_report_template(logo_path, title, storage)
 
     # ------------------------------------------------------
     # Finalização do PDF
     # ------------------------------------------------------
     try:
-        doc.build(story)
+        with open_output(output_path, storage) as f:
+            template.render(metrics, f, chart=chart_path, indicators=indicators, anomalies=anomalies,
+                            forecast=forecast, forecast_chart=forecast_chart_path)
         logger.info(f"PDF gerado com sucesso em: {output_path}")
     except Exception as e:
         logger.error(f"Erro ao gerar PDF: {e}")
-        raise
\ No newline at end of file
+        raise
@@ -0,0 +1,208 @@
+import os
+from dataclasses import dataclass, field
+from typing import List
+
+import pandas as pd
+
+from src.logger import get_logger
+from src.reader import is_excel_file
+from src.storage import get_storage
+
+logger = get_logger()
+
+MB = 1024 * 1024
+
+ESTRATEGIA_MEMORIA = "in_memory"
+ESTRATEGIA_LOTES = "batched"
+
+# Linhas lidas por arquivo para estimar o tamanho decodificado
+AMOSTRA_PADRAO = 200
+
+# Pico de memória por byte decodificado durante concat/limpeza (cópias
+# intermediárias de clean_and_convert, conversões para string etc.)
+FATOR_PICO_PADRAO = 3.0
+
+# Sem dimensão na planilha: bytes do XML da planilha lidos para medir o
+# tamanho médio de uma linha <row> e extrapolar pelo tamanho descompactado
+BYTES_AMOSTRA_XML = 256 * 1024
+
+
+@dataclass
+class FileEstimate:
+    name: str
+    file_bytes: int
+    rows: int
+    decoded_bytes: int
+
+    @property
+    def decoded_mb(self) -> float:
+        return self.decoded_bytes / MB
+
+
+@dataclass
+class ExecutionPlan:
+    """
+    Plano de execução escolhido antes da leitura dos arquivos brutos.
+
+    - strategy: "in_memory" (tudo de uma vez, como antes) ou "batched"
+      (lê e limpa um lote de arquivos por vez, liberando os brutos).
+    - batches: nomes dos arquivos agrupados por lote.
+    - workers: máximo de etapas de saída em paralelo dentro do orçamento.
+    """
+    strategy: str
+    budget_mb: float
+    estimated_mb: float
+    peak_mb: float
+    workers: int
+    batches: List[List[str]] = field(default_factory=list)
+    files: List[FileEstimate] = field(default_factory=list)
+
+    def describe(self) -> str:
+        return (
+            f"estratégia={self.strategy}, arquivos={len(self.files)}, "
+            f"estimado={self.estimated_mb:.1f} MB, pico≈{self.peak_mb:.1f} MB, "
+            f"orçamento={self.budget_mb:.0f} MB, lotes={len(self.batches)}, workers={self.workers}"
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "strategy": self.strategy,
+            "budget_mb": self.budget_mb,
+            "estimated_mb": round(self.estimated_mb, 3),
+            "peak_mb": round(self.peak_mb, 3),
+            "workers": self.workers,
+            "batches": self.batches,
+        }
+
+
+# -----------------------------------------------------------
+# 1) Estimativa por arquivo (tamanho + amostra de linhas)
+# -----------------------------------------------------------
+def estimate_file(full_path: str, sample_rows: int = AMOSTRA_PADRAO, storage=None) -> FileEstimate:
+    """
+    Estima o tamanho decodificado (DataFrame em memória) de um .xlsx sem
+    lê-lo por inteiro: o openpyxl em modo read_only lê só a dimensão da
+    planilha e as primeiras `sample_rows` linhas, cujo custo por linha
+    (memory_usage deep) é extrapolado para o total.
+    """
+    from openpyxl import load_workbook
+
+    storage = get_storage(storage)
+    file_bytes = storage.stat(full_path)[0]
+    name = os.path.basename(full_path)
+
+    with storage.open(full_path, "rb") as f:
+        wb = load_workbook(f, read_only=True, data_only=True)
+        try:
+            sheet = wb.active
+            total_rows = sheet.max_row
+            rows = list(sheet.iter_rows(max_row=sample_rows + 1, values_only=True))
+            if not total_rows:
+                total_rows = _count_rows_from_xml(f, getattr(sheet, "_worksheet_path", None))
+        finally:
+            wb.close()
+
+    if len(rows) < 2:
+        return FileEstimate(name, file_bytes, 0, 0)
+
+    sample = pd.DataFrame(rows[1:], columns=rows[0])
+    bytes_per_row = sample.memory_usage(index=False, deep=True).sum() / len(sample)
+
+    n_rows = max((total_rows or 0) - 1, len(sample))
+    return FileEstimate(name, file_bytes, n_rows, int(bytes_per_row * n_rows))
+
+
+def _count_rows_from_xml(source, sheet_path: str = None) -> int:
+    """
+    Estima o número de linhas de uma planilha sem dimensão declarada (ex.:
+    gravada em modo write_only): mede o tamanho médio de um <row> no início
+    do XML e divide o tamanho descompactado da planilha por ele.
+    """
+    import zipfile
+
+    with zipfile.ZipFile(source) as zf:
+        if sheet_path not in zf.namelist():
+            sheets = [i for i in zf.infolist() if i.filename.startswith("xl/worksheets/")]
+            if not sheets:
+                return 0
+            sheet_path = max(sheets, key=lambda i: i.file_size).filename
+
+        total_bytes = zf.getinfo(sheet_path).file_size
+        with zf.open(sheet_path) as f:
+            head = f.read(BYTES_AMOSTRA_XML)
+
+    first, last = head.find(b"<row"), head.rfind(b"<row")
+    counted = head.count(b"<row") - 1
+    if counted < 1:
+        return head.count(b"<row")
+    return int(round((total_bytes - first) * counted / (last - first)))
+
+
+# -----------------------------------------------------------
+# 2) Escolha da estratégia, lotes e workers
+# -----------------------------------------------------------
+def plan_execution(raw_path: str, budget_mb: float, max_workers: int = 4,
+                   sample_rows: int = AMOSTRA_PADRAO, peak_factor: float = FATOR_PICO_PADRAO,
+                   storage=None) -> ExecutionPlan:
+    """
+    Compara a estimativa de memória dos arquivos de `raw_path` com o
+    orçamento (`memory_budget.limit_mb` no config.yaml) e escolhe:
+
+    - in_memory: pico estimado (decodificado × peak_factor) cabe no orçamento;
+    - batched: arquivos agrupados (first-fit, maiores primeiro) em lotes
+      cujo pico cabe no orçamento. Um arquivo maior que o orçamento fica
+      sozinho em seu lote (e é registrado um aviso).
+
+    workers: etapas de saída paralelas cabíveis no orçamento restante, pois
+    cada gerador pode criar cópias do DataFrame consolidado.
+
+    - Diretório inexistente → FileNotFoundError
+    """
+    storage = get_storage(storage)
+    if not storage.isdir(raw_path):
+        raise FileNotFoundError(f"Pasta não encontrada: {raw_path}")
+
+    names = sorted(f for f in storage.listdir(raw_path) if is_excel_file(f))
+    estimates = []
+    for n in names:
+        full_path = os.path.join(raw_path, n)
+        try:
+            estimates.append(estimate_file(full_path, sample_rows, storage))
+        except Exception as e:
+            # Arquivo ilegível: a leitura decide (erro no modo estrito, quarentena no tolerante)
+            logger.warning("Não foi possível estimar %s (%s); considerado sem custo.", n, e)
+            estimates.append(FileEstimate(n, storage.stat(full_path)[0], 0, 0))
+
+    estimated_mb = sum(e.decoded_mb for e in estimates)
+    peak_mb = estimated_mb * peak_factor
+
+    if peak_mb <= budget_mb:
+        strategy = ESTRATEGIA_MEMORIA
+        batches = [names] if names else []
+    else:
+        strategy = ESTRATEGIA_LOTES
+        batches, loads = [], []
+        for est in sorted(estimates, key=lambda e: e.decoded_bytes, reverse=True):
+            cost = est.decoded_mb * peak_factor
+            if cost > budget_mb:
+                logger.warning(
+                    "Arquivo %s excede sozinho o orçamento de memória (≈%.1f MB de pico).", est.name, cost
+                )
+            for i, load in enumerate(loads):
+                if load + cost <= budget_mb:
+                    batches[i].append(est.name)
+                    loads[i] += cost
+                    break
+            else:
+                batches.append([est.name])
+                loads.append(cost)
+
+    # O DataFrame consolidado (sem as cópias brutas) permanece durante as
+    # etapas de saída; cada etapa paralela pode duplicá-lo.
+    remaining = budget_mb - estimated_mb
+    per_worker = max(estimated_mb, 1e-9)
+    workers = int(max(1, min(max_workers, remaining // per_worker if remaining > 0 else 1)))
+
+    plan = ExecutionPlan(strategy, budget_mb, estimated_mb, peak_mb, workers, batches, estimates)
+    logger.info("Plano de execução: %s", plan.describe())
+    return plan
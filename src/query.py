@@ -0,0 +1,167 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.logger import get_logger
+from src.storage import get_storage
+from src.transformer import COL_DATA, COL_FATURAMENTO, COL_CUSTOS, COL_LUCRO
+
+logger = get_logger()
+
+ARQUIVO_INDICE = "consolidado_indice.npz"
+COLS_INDICE = [COL_FATURAMENTO, COL_CUSTOS, COL_LUCRO]
+
+
+class ConsolidatedIndex:
+    """
+    Índice de consultas por período sobre o dataset consolidado.
+
+    Guarda, por dia (ordenado por data):
+    - as somas diárias de faturamento, custos e lucro (séries do gráfico);
+    - somas de prefixo dessas colunas e da contagem de linhas.
+
+    Uma consulta por período faz duas buscas binárias (searchsorted) sobre as
+    datas e uma subtração de prefixos: O(log n) + O(1), sem varrer linhas.
+
+    Quando todos os valores são múltiplos exatos de centavos (caso dos dados
+    monetários), os prefixos são inteiros em centavos e os totais coincidem
+    exatamente com `calculate_metrics` após o arredondamento em 2 casas.
+    """
+
+    def __init__(self, days: np.ndarray, daily: dict, prefix: dict, row_prefix: np.ndarray, exact_cents: bool):
+        self.days = days
+        self.daily = daily
+        self.prefix = prefix
+        self.row_prefix = row_prefix
+        self.exact_cents = exact_cents
+
+    # ------------------------------------------------------
+    # Construção
+    # ------------------------------------------------------
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "ConsolidatedIndex":
+        df = df[[c for c in [COL_DATA, *COLS_INDICE] if c in df.columns]]
+        if COL_LUCRO not in df.columns:
+            df = df.assign(**{COL_LUCRO: df[COL_FATURAMENTO] - df[COL_CUSTOS]})
+
+        # Células vazias (ex.: custos em branco) somam zero, como o .sum() do pandas
+        values = {col: df[col].fillna(0).to_numpy(dtype=float) for col in COLS_INDICE}
+
+        # Centavos exatos? (tolerância bem abaixo de meio centavo)
+        exact_cents = all(
+            np.all(np.abs(v * 100 - np.rint(v * 100)) < 1e-6) for v in values.values()
+        )
+
+        # Agrupamento por dia vetorizado: datas únicas ordenadas + soma por grupo
+        days, inverse = np.unique(df[COL_DATA].to_numpy(), return_inverse=True)
+        counts = np.bincount(inverse, minlength=len(days))
+
+        daily, prefix = {}, {}
+        for col, v in values.items():
+            if exact_cents:
+                # Somas de inteiros em float64 são exatas até 2**53 centavos
+                cents = np.bincount(inverse, weights=np.rint(v * 100), minlength=len(days)).astype(np.int64)
+                daily[col] = cents / 100
+                prefix[col] = np.concatenate([[0], np.cumsum(cents)])
+            else:
+                sums = np.bincount(inverse, weights=v, minlength=len(days))
+                daily[col] = sums
+                prefix[col] = np.concatenate([[0.0], np.cumsum(sums)])
+
+        row_prefix = np.concatenate([[0], np.cumsum(counts)])
+        return cls(days, daily, prefix, row_prefix, exact_cents)
+
+    # ------------------------------------------------------
+    # Persistência
+    # ------------------------------------------------------
+    def save(self, path: str, storage=None):
+        """Grava o índice em formato .npz (carregamento rápido, sem openpyxl)."""
+        arrays = {"days": self.days, "row_prefix": self.row_prefix,
+                  "exact_cents": np.array(self.exact_cents)}
+        for col in COLS_INDICE:
+            arrays[f"daily_{col}"] = self.daily[col]
+            arrays[f"prefix_{col}"] = self.prefix[col]
+
+        with get_storage(storage).atomic_write(path) as f:
+            np.savez(f, **arrays)
+
+    @classmethod
+    def load(cls, path: str, storage=None) -> "ConsolidatedIndex":
+        with get_storage(storage).open(path, "rb") as f, np.load(f) as data:
+            daily = {col: data[f"daily_{col}"] for col in COLS_INDICE}
+            prefix = {col: data[f"prefix_{col}"] for col in COLS_INDICE}
+            return cls(data["days"], daily, prefix, data["row_prefix"], bool(data["exact_cents"]))
+
+    # ------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------
+    def _bounds(self, start=None, end=None):
+        lo = 0 if start is None else int(np.searchsorted(self.days, np.datetime64(pd.Timestamp(start)), side="left"))
+        hi = len(self.days) if end is None else int(np.searchsorted(self.days, np.datetime64(pd.Timestamp(end)), side="right"))
+        return lo, max(lo, hi)
+
+    def _range_sum(self, col: str, lo: int, hi: int) -> float:
+        total = self.prefix[col][hi] - self.prefix[col][lo]
+        return int(total) / 100 if self.exact_cents else float(total)
+
+    def totals(self, start=None, end=None) -> dict:
+        """
+        Totais do período [start, end] (datas inclusivas) no mesmo formato
+        de `calculate_metrics`, mais a contagem de linhas ("rows").
+        """
+        lo, hi = self._bounds(start, end)
+        faturamento_total = self._range_sum(COL_FATURAMENTO, lo, hi)
+        custos_totais = self._range_sum(COL_CUSTOS, lo, hi)
+        lucro_total = faturamento_total - custos_totais
+        if self.exact_cents:
+            lucro_total = int(self.prefix[COL_FATURAMENTO][hi] - self.prefix[COL_FATURAMENTO][lo]
+                              - self.prefix[COL_CUSTOS][hi] + self.prefix[COL_CUSTOS][lo]) / 100
+
+        lucro_percentual = (
+            (lucro_total / faturamento_total) * 100 if faturamento_total > 0 else 0
+        )
+
+        return {
+            "faturamento_total": round(float(faturamento_total), 2),
+            "custos_totais": round(float(custos_totais), 2),
+            "lucro_total": round(float(lucro_total), 2),
+            "lucro_percentual": round(float(lucro_percentual), 2),
+            "rows": int(self.row_prefix[hi] - self.row_prefix[lo]),
+        }
+
+    def series(self, start=None, end=None) -> pd.DataFrame:
+        """
+        Série diária do período (mesmo formato de `prepare_chart_data`),
+        obtida por fatiamento dos arrays diários, sem varrer linhas.
+        """
+        lo, hi = self._bounds(start, end)
+        return pd.DataFrame({
+            COL_DATA: self.days[lo:hi],
+            **{col: self.daily[col][lo:hi] for col in COLS_INDICE},
+        })
+
+
+def index_path(processed_path: str) -> str:
+    return os.path.join(processed_path, ARQUIVO_INDICE)
+
+
+def open_index(processed_path: str) -> ConsolidatedIndex:
+    """
+    Abre o índice persistido pelo pipeline em `processed_path`. Se ele não
+    existir, constrói a partir do dataset particionado ou, na falta dele,
+    de dados_processados.xlsx (mais lento).
+    """
+    path = index_path(processed_path)
+    if os.path.exists(path):
+        return ConsolidatedIndex.load(path)
+
+    from src.dataset import DIRETORIO_DATASET, load_dataset_stats, read_partitioned_dataset
+    dataset_dir = os.path.join(processed_path, DIRETORIO_DATASET)
+    if load_dataset_stats(dataset_dir):
+        logger.warning(f"Índice não encontrado em {path}; construindo a partir do dataset particionado.")
+        return ConsolidatedIndex.from_frame(read_partitioned_dataset(dataset_dir, columns=COLS_INDICE))
+
+    logger.warning(f"Índice não encontrado em {path}; construindo a partir do Excel consolidado.")
+    df = pd.read_excel(os.path.join(processed_path, "dados_processados.xlsx"), parse_dates=[COL_DATA])
+    return ConsolidatedIndex.from_frame(df)
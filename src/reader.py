@@ -1,13 +1,92 @@
+import json
 import os
+import traceback
+from datetime import datetime
+
 import pandas as pd
 from openpyxl import load_workbook
 from src.logger import get_logger
+from src.storage import get_storage, is_file_like, open_input
 from src.transformer import normalize_columns # Dependência externa
 
 logger = get_logger()
 
 
-def load_excel_files(folder_path: str) -> dict:
+def read_excel_file(source, storage=None) -> pd.DataFrame:
+    """
+    Lê um único arquivo .xlsx (primeira planilha) e normaliza as colunas.
+
+    `source` é um caminho (lido via `storage`, padrão: disco local) ou um
+    arquivo binário já aberto (ex.: BytesIO).
+
+    - Arquivo excel vazio → ValueError
+    """
+    file = getattr(source, "name", "<buffer>") if is_file_like(source) else os.path.basename(source)
+
+    # Usando openpyxl, que é mais robusto para ler a estrutura de arquivos vazios
+    with open_input(source, storage) as f:
+        wb = load_workbook(f, data_only=True)
+        sheet = wb.active
+        rows = list(sheet.values)
+
+    # --- CORREÇÃO DE LÓGICA DE NEGÓCIO ---
+    # O teste unitário exige que um arquivo vazio lance ValueError.
+    if not rows or len(rows) < 2:
+        logger.warning(f"Arquivo vazio ou sem dados: {file}. Lançando ValueError.")
+
+        # 🚨 CORREÇÃO: Lança a exceção esperada pelo teste unitário.
+        raise ValueError(f"O arquivo Excel '{file}' está vazio ou sem dados (cabeçalho e pelo menos 1 linha de dados).")
+
+    # --- FIM DA CORREÇÃO ---
+
+    header = rows[0]
+    data = rows[1:]
+    df = pd.DataFrame(data, columns=header)
+
+    # normalização de colunas
+    return normalize_columns(df)
+
+
+def quarantine_file(full_path: str, quarantine_dir: str, error: BaseException, storage=None) -> dict:
+    """
+    Move um arquivo com falha para a quarentena e grava ao lado um sidecar
+    `<arquivo>.error.json` com o tipo, a mensagem e o traceback do erro.
+
+    O nome recebe um prefixo de data/hora para não sobrescrever envios
+    anteriores do mesmo arquivo. Retorna o registro da quarentena.
+    """
+    storage = get_storage(storage)
+    storage.makedirs(quarantine_dir)
+    file = os.path.basename(full_path)
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    target = os.path.join(quarantine_dir, f"{stamp}_{file}")
+    storage.move(full_path, target)
+
+    entry = {
+        "file": file,
+        "quarantined_as": target,
+        "error_type": type(error).__name__,
+        "error": str(error),
+        "traceback": "".join(traceback.format_exception(type(error), error, error.__traceback__)),
+        "quarantined_at": datetime.now().isoformat(),
+    }
+    sidecar = target + ".error.json"
+    with storage.open(sidecar, "w") as f:
+        json.dump(entry, f, indent=2, ensure_ascii=False)
+    entry["sidecar"] = sidecar
+
+    logger.warning(f"Arquivo movido para a quarentena: {file} → {target} ({entry['error_type']}: {error})")
+    return entry
+
+
+def is_excel_file(name: str) -> bool:
+    """Planilha a carregar: .xlsx, exceto arquivos de trava do Excel (~$arquivo.xlsx)."""
+    return name.endswith(".xlsx") and not name.startswith("~$")
+
+
+def load_excel_files(folder_path: str, file_cache: dict = None, only=None,
+                     strict: bool = True, quarantine_dir: str = None, summary: dict = None,
+                     storage=None) -> dict:
     """
     Carrega todos os arquivos .xlsx de uma pasta.
     Retorna um dicionário: {nome_arquivo: DataFrame}
@@ -16,62 +95,96 @@ def load_excel_files(folder_path: str) -> dict:
     - Diretório inexistente → FileNotFoundError
     - Arquivo excel vazio → Lança ValueError (CORREÇÃO para atender ao teste)
     - Qualquer outro erro → Exception
+    (no modo estrito, o padrão; ver `strict` abaixo)
+
+    file_cache (opcional): dicionário mantido pelo chamador entre execuções
+    ({nome: ((tamanho, mtime_ns), DataFrame)}). Arquivos cuja assinatura não
+    mudou são reutilizados sem nova leitura; entradas de arquivos removidos
+    são descartadas. Os DataFrames reutilizados são compartilhados e devem
+    ser tratados como somente leitura.
+
+    only (opcional): nomes de arquivos a carregar (ex.: um lote do plano de
+    execução); os demais arquivos da pasta são ignorados.
+
+    strict=False (modo tolerante): arquivos vazios ou corrompidos são
+    movidos para `quarantine_dir` (com sidecar de erro) e os demais seguem
+    sendo carregados. `summary` (dict opcional do chamador) recebe as
+    listas "loaded" e "quarantined".
+
+    storage (opcional): armazenamento da pasta (padrão: disco local; ver
+    src.storage.MemoryStorage para execuções sem disco).
     """
-    if not os.path.exists(folder_path):
+    storage = get_storage(storage)
+    if not strict and not quarantine_dir:
+        raise ValueError("O modo tolerante requer 'quarantine_dir'.")
+    if summary is not None:
+        summary.setdefault("loaded", [])
+        summary.setdefault("quarantined", [])
+
+    if not storage.isdir(folder_path):
         logger.error(f"Diretório não encontrado: {folder_path}")
         raise FileNotFoundError(f"Pasta não encontrada: {folder_path}")
 
-    files = [f for f in os.listdir(folder_path) if f.endswith(".xlsx")]
+    files = [f for f in storage.listdir(folder_path) if is_excel_file(f)]
 
     if not files:
         logger.warning("Nenhum arquivo Excel encontrado no diretório.")
 
+    selected = files if only is None else [f for f in files if f in set(only)]
     result = {}
+    quarantined = set()
 
-    for file in files:
+    for file in selected:
         full_path = os.path.join(folder_path, file)
 
+        signature = None
+        if file_cache is not None:
+            signature = storage.stat(full_path)
+            cached = file_cache.get(file)
+            if cached is not None and cached[0] == signature:
+                result[file] = cached[1]
+                if summary is not None:
+                    summary["loaded"].append(file)
+                logger.info("Reutilizado do cache em memória: %s (%d linhas)", file, len(cached[1]))
+                continue
+
         try:
-            # Usando openpyxl, que é mais robusto para ler a estrutura de arquivos vazios
-            wb = load_workbook(full_path, data_only=True)
-            sheet = wb.active
-            rows = list(sheet.values)
-
-            # --- CORREÇÃO DE LÓGICA DE NEGÓCIO ---
-            # O teste unitário exige que um arquivo vazio lance ValueError.
-            if not rows or len(rows) < 2:
-                logger.warning(f"Arquivo vazio ou sem dados: {file}. Lançando ValueError.")
-                
-                # 🚨 CORREÇÃO: Lança a exceção esperada pelo teste unitário.
-                raise ValueError(f"O arquivo Excel '{file}' está vazio ou sem dados (cabeçalho e pelo menos 1 linha de dados).")
-            
-            # --- FIM DA CORREÇÃO ---
-            
-            else:
-                header = rows[0]
-                data = rows[1:]
-                df = pd.DataFrame(data, columns=header)
-
-                # normalização de colunas
-                df = normalize_columns(df)
+            df = read_excel_file(full_path, storage)
 
             result[file] = df
-            logger.info(f"Carregado: {file} ({len(df)} linhas)")
-
-        except ValueError as ve:
-            # Captura o ValueError lançado acima e continua o loop para o próximo arquivo.
-            # (O teste unitário vai capturar este raise, mas no pipeline real, 
-            # você pode querer apenas logar e ignorar o arquivo, dependendo da regra de negócio.)
-            logger.error(f"Erro de Validação (Arquivo Vazio) ao carregar {file}: {ve}")
-            raise # Re-lança o ValueError para que o teste o capture
-            
+            if file_cache is not None:
+                file_cache[file] = (signature, df)
+            if summary is not None:
+                summary["loaded"].append(file)
+            logger.info("Carregado: %s (%d linhas)", file, len(df))
+
         except Exception as e:
-            logger.error(f"Erro inesperado ao carregar {file}: {e}")
-            raise
+            if strict:
+                _log_load_error(file, e)
+                raise
+            # Modo tolerante: isola o arquivo e segue com os demais
+            entry = quarantine_file(full_path, quarantine_dir, e, storage)
+            quarantined.add(file)
+            if summary is not None:
+                summary["quarantined"].append(entry)
+
+    # Remove do cache arquivos que não existem mais na pasta
+    if file_cache is not None:
+        for stale in set(file_cache) - (set(files) - quarantined):
+            del file_cache[stale]
 
     return result
 
 
+def _log_load_error(file: str, e: Exception):
+    if isinstance(e, ValueError):
+        # Modo estrito (padrão): o erro é re-lançado para o chamador/testes;
+        # use strict=False para isolar o arquivo na quarentena.
+        logger.error(f"Erro de Validação (Arquivo Vazio) ao carregar {file}: {e}")
+    else:
+        logger.error(f"Erro inesperado ao carregar {file}: {e}")
+
+
 def validate_columns(df: pd.DataFrame, required_cols: list):
     """
     Verifica se o DataFrame contém todas as colunas necessárias.
@@ -0,0 +1,240 @@
+import os
+from dataclasses import dataclass, field
+from typing import Callable, List
+
+import numpy as np
+import pandas as pd
+
+from src.logger import get_logger
+from src.storage import get_storage
+from src.transformer import COL_DATA
+
+logger = get_logger()
+
+ACAO_RELATORIO = "report"   # mantém as linhas e só registra as violações
+ACAO_DESCARTE = "drop"      # remove as linhas que violam alguma regra
+ARQUIVO_RELATORIO = "validacao_erros.csv"
+COL_LINHA = "linha"
+COL_REGRAS = "regras"
+
+
+# -----------------------------------------------------------
+# 1) Verificações disponíveis (cada uma devolve a máscara de VIOLAÇÃO)
+# -----------------------------------------------------------
+# Valores ausentes não violam as verificações de faixa: use "not_null"
+# para exigir presença.
+def _check_min(df, rule, now):
+    return (df[rule.column] < rule.params["value"]).to_numpy()
+
+
+def _check_max(df, rule, now):
+    return (df[rule.column] > rule.params["value"]).to_numpy()
+
+
+def _check_not_null(df, rule, now):
+    return df[rule.column].isna().to_numpy()
+
+
+def _check_not_future(df, rule, now):
+    # Qualquer instante a partir do dia seguinte a `now` está no futuro
+    tomorrow = pd.Timestamp(now).normalize() + pd.Timedelta(days=1)
+    return (df[rule.column] >= tomorrow).to_numpy()
+
+
+def _check_allowed(df, rule, now):
+    serie = df[rule.column]
+    return (serie.notna() & ~serie.isin(rule.params["values"])).to_numpy()
+
+
+def _check_max_by(df, rule, now):
+    # Teto por grupo (ex.: faturamento por filial): mapeia o limite de cada
+    # linha de uma vez; grupos sem limite usam `default` (ou ficam livres)
+    limits = df[rule.params["by"]].map(rule.params.get("limits") or {})
+    default = rule.params.get("default")
+    if default is not None:
+        limits = limits.fillna(default)
+    return (df[rule.column] > limits).to_numpy()
+
+
+def _check_matches(df, rule, now):
+    # Coluna de origem igual a uma expressão sobre outras colunas, com tolerância
+    expected = df.eval(rule.params["expr"])
+    diff = (df[rule.column] - expected).abs()
+    return (diff > rule.params.get("tolerance", 0.01)).to_numpy()
+
+
+VERIFICACOES = {
+    "min": _check_min,
+    "max": _check_max,
+    "not_null": _check_not_null,
+    "not_future": _check_not_future,
+    "allowed": _check_allowed,
+    "max_by": _check_max_by,
+    "matches": _check_matches,
+}
+
+# Parâmetros obrigatórios de cada verificação (além de `column`)
+PARAMETROS = {
+    "min": ["value"],
+    "max": ["value"],
+    "allowed": ["values"],
+    "max_by": ["by"],
+    "matches": ["expr"],
+}
+
+
+@dataclass
+class Rule:
+    """Regra de negócio declarada em `validation.rules` no config.yaml."""
+    name: str
+    check: str
+    column: str
+    params: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_config(cls, entry: dict) -> "Rule":
+        entry = dict(entry)
+        check = entry.pop("check", None)
+        if check not in VERIFICACOES:
+            raise ValueError(f"Verificação inválida na regra {entry.get('name')!r}: {check!r}. "
+                             f"Use uma de {sorted(VERIFICACOES)}.")
+        column = entry.pop("column", None)
+        if not column:
+            raise ValueError(f"Regra {entry.get('name')!r} sem 'column'.")
+        name = entry.pop("name", f"{column}_{check}")
+        missing = [p for p in PARAMETROS.get(check, []) if p not in entry]
+        if missing:
+            raise ValueError(f"Regra {name!r} ({check}) sem os parâmetros: {missing}")
+        return cls(name, check, column, entry)
+
+    def columns(self) -> List[str]:
+        """Colunas que a regra precisa encontrar no DataFrame."""
+        cols = [self.column]
+        if self.check == "max_by":
+            cols.append(self.params["by"])
+        return cols
+
+
+@dataclass
+class ValidationResult:
+    """
+    Resultado da avaliação: matriz booleana linhas × regras (True = violação)
+    e as regras ignoradas por falta de colunas.
+    """
+    rules: List[Rule]
+    violations: np.ndarray
+    skipped: List[str] = field(default_factory=list)
+
+    @property
+    def invalid_rows(self) -> np.ndarray:
+        return self.violations.any(axis=1)
+
+    def counts(self) -> dict:
+        return {rule.name: int(n) for rule, n in zip(self.rules, self.violations.sum(axis=0))}
+
+
+# -----------------------------------------------------------
+# 2) Conjunto de regras compilado
+# -----------------------------------------------------------
+class RuleSet:
+    """
+    Regras compiladas em funções vetorizadas: cada regra produz uma máscara
+    booleana sobre colunas inteiras e todas são empilhadas em uma matriz
+    linhas × regras em uma única passada pelo DataFrame consolidado.
+    """
+
+    def __init__(self, rules: List[Rule]):
+        names = [r.name for r in rules]
+        duplicated = sorted({n for n in names if names.count(n) > 1})
+        if duplicated:
+            raise ValueError(f"Nomes de regra repetidos: {duplicated}")
+        self.rules = rules
+        self._compiled: List[Callable] = [VERIFICACOES[r.check] for r in rules]
+
+    @classmethod
+    def from_config(cls, entries: list) -> "RuleSet":
+        return cls([Rule.from_config(e) for e in entries or []])
+
+    def evaluate(self, df: pd.DataFrame, now=None) -> ValidationResult:
+        now = now if now is not None else pd.Timestamp.now()
+        active, masks, skipped = [], [], []
+        for rule, check in zip(self.rules, self._compiled):
+            missing = [c for c in rule.columns() if c not in df.columns]
+            if missing:
+                skipped.append(rule.name)
+                logger.warning("Regra %s ignorada: colunas ausentes %s.", rule.name, missing)
+                continue
+            active.append(rule)
+            masks.append(check(df, rule, now))
+
+        violations = np.column_stack(masks) if masks else np.zeros((len(df), 0), dtype=bool)
+        return ValidationResult(active, violations, skipped)
+
+
+# -----------------------------------------------------------
+# 3) Relatório compacto de violações
+# -----------------------------------------------------------
+def violations_report(df: pd.DataFrame, result: ValidationResult) -> pd.DataFrame:
+    """
+    Uma linha por registro inválido: posição no DataFrame consolidado,
+    nomes das regras violadas (separados por ';') e as colunas usadas pelas
+    regras — não uma linha por verificação.
+    """
+    rows = np.flatnonzero(result.invalid_rows)
+    columns = list(dict.fromkeys(c for rule in result.rules for c in rule.columns()))
+    if COL_DATA in df.columns and COL_DATA not in columns:
+        columns.insert(0, COL_DATA)
+
+    # Monta os nomes regra a regra (poucas regras, muitas linhas)
+    names = pd.Series("", index=rows, dtype=object)
+    sub = result.violations[rows]
+    for j, rule in enumerate(result.rules):
+        hit = sub[:, j]
+        names[hit] = names[hit] + np.where(names[hit] == "", "", ";") + rule.name
+
+    report = df.iloc[rows][columns].reset_index(drop=True)
+    report.insert(0, COL_REGRAS, names.to_numpy())
+    report.insert(0, COL_LINHA, rows)
+    return report
+
+
+def apply_rules(df: pd.DataFrame, ruleset: RuleSet, action: str = ACAO_RELATORIO,
+                report_path: str = None, storage=None, summary: dict = None) -> pd.DataFrame:
+    """
+    Avalia as regras sobre o DataFrame consolidado, grava o relatório
+    compacto (CSV) em `report_path` e devolve o DataFrame:
+
+    - action="report": inalterado (violações apenas registradas);
+    - action="drop": sem as linhas que violam alguma regra.
+
+    `summary` (dict opcional do chamador) recebe as contagens por regra.
+    """
+    if action not in (ACAO_RELATORIO, ACAO_DESCARTE):
+        raise ValueError(f"Ação de validação inválida: {action!r}. Use 'report' ou 'drop'.")
+
+    result = ruleset.evaluate(df)
+    invalid = result.invalid_rows
+    n_invalid = int(invalid.sum())
+    counts = result.counts()
+
+    if report_path:
+        with get_storage(storage).atomic_write(report_path, "w") as f:
+            violations_report(df, result).to_csv(f, index=False)
+
+    if summary is not None:
+        summary.update(rows=len(df), invalid=n_invalid, action=action, rules=counts, skipped=result.skipped)
+
+    if n_invalid:
+        detail = ", ".join(f"{name}={n}" for name, n in counts.items() if n)
+        logger.warning("Validação: %d de %d linhas violam regras (%s). Relatório: %s",
+                       n_invalid, len(df), detail, report_path or "-")
+    else:
+        logger.info("Validação: nenhuma violação em %d linhas (%d regras).", len(df), len(result.rules))
+
+    if action == ACAO_DESCARTE and n_invalid:
+        return df[~invalid].reset_index(drop=True)
+    return df
+
+
+def default_report_path(reports_path: str) -> str:
+    return os.path.join(reports_path, ARQUIVO_RELATORIO)
@@ -0,0 +1,135 @@
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.instrumentation import stage as instrumented_stage
+from src.logger import get_logger
+
+logger = get_logger()
+
+STATUS_OK = "ok"
+STATUS_FAILED = "failed"
+STATUS_SKIPPED = "skipped"
+
+
+@dataclass
+class Stage:
+    """Etapa do pipeline: um nome, a função a executar e as etapas das quais depende."""
+    name: str
+    func: Callable[[], Any]
+    depends_on: Tuple[str, ...] = ()
+
+
+@dataclass
+class StageResult:
+    """Resultado de uma etapa: status, duração (s), valor retornado ou erro."""
+    name: str
+    status: str
+    seconds: float = 0.0
+    value: Any = None
+    error: Optional[BaseException] = field(default=None, repr=False)
+
+
+def _validate_graph(stages: List[Stage]):
+    """Verifica nomes duplicados, dependências inexistentes e ciclos."""
+    names = [stage.name for stage in stages]
+    if len(names) != len(set(names)):
+        raise ValueError(f"Etapas com nomes duplicados: {names}")
+
+    by_name = {stage.name: stage for stage in stages}
+    for stage in stages:
+        missing = [dep for dep in stage.depends_on if dep not in by_name]
+        if missing:
+            raise ValueError(f"Etapa '{stage.name}' depende de etapas inexistentes: {missing}")
+
+    # Detecção de ciclos (DFS com marcação de visita)
+    visiting, done = set(), set()
+
+    def visit(name):
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"Dependência circular envolvendo a etapa '{name}'")
+        visiting.add(name)
+        for dep in by_name[name].depends_on:
+            visit(dep)
+        visiting.discard(name)
+        done.add(name)
+
+    for name in names:
+        visit(name)
+
+
+def _timed_call(name: str, func: Callable[[], Any]):
+    start = time.perf_counter()
+    with instrumented_stage(name):
+        value = func()
+    return value, time.perf_counter() - start
+
+
+def run_stages(stages: List[Stage], max_workers: int = None) -> Dict[str, StageResult]:
+    """
+    Executa as etapas respeitando o grafo de dependências, rodando em paralelo
+    (threads) todas as etapas cujas dependências já terminaram com sucesso.
+
+    Falhas são isoladas: uma etapa que falha não interrompe as demais; apenas
+    as etapas que dependem dela são marcadas como ignoradas (skipped).
+    Registra no log o tempo de cada etapa e o tempo total.
+    """
+    _validate_graph(stages)
+
+    results: Dict[str, StageResult] = {}
+    pending = {stage.name: stage for stage in stages}
+    running = {}
+    start_total = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending or running:
+            # 1. Propaga falhas: etapas com dependência que falhou/foi ignorada
+            for name, stage in list(pending.items()):
+                blocked = [
+                    dep for dep in stage.depends_on
+                    if dep in results and results[dep].status != STATUS_OK
+                ]
+                if blocked:
+                    results[name] = StageResult(name, STATUS_SKIPPED)
+                    logger.warning(f"Etapa '{name}' ignorada: dependência sem sucesso ({', '.join(blocked)}).")
+                    del pending[name]
+
+            # 2. Submete as etapas prontas (todas as dependências concluídas com sucesso)
+            for name, stage in list(pending.items()):
+                if all(dep in results for dep in stage.depends_on):
+                    # Copia o contexto para que a instrumentação ativa acompanhe a thread
+                    ctx = contextvars.copy_context()
+                    future = executor.submit(ctx.run, _timed_call, name, stage.func)
+                    running[future] = (name, time.perf_counter())
+                    del pending[name]
+
+            if not running:
+                continue
+
+            # 3. Aguarda a próxima etapa terminar
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name, submitted_at = running.pop(future)
+                try:
+                    value, seconds = future.result()
+                    results[name] = StageResult(name, STATUS_OK, seconds, value)
+                    logger.info("Etapa '%s' concluída em %.2fs", name, seconds)
+                except Exception as e:
+                    seconds = time.perf_counter() - submitted_at
+                    results[name] = StageResult(name, STATUS_FAILED, seconds, error=e)
+                    logger.error(f"Etapa '{name}' falhou após {seconds:.2f}s: {e}")
+
+    total = time.perf_counter() - start_total
+    counts = {status: sum(r.status == status for r in results.values())
+              for status in (STATUS_OK, STATUS_FAILED, STATUS_SKIPPED)}
+    logger.info(
+        f"Etapas concluídas em {total:.2f}s "
+        f"(ok: {counts[STATUS_OK]}, falhas: {counts[STATUS_FAILED]}, ignoradas: {counts[STATUS_SKIPPED]})"
+    )
+
+    # Preserva a ordem de declaração das etapas no resultado
+    return {stage.name: results[stage.name] for stage in stages}
@@ -0,0 +1,218 @@
+import asyncio
+import json
+import os
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Optional, Union
+from urllib.parse import urlsplit, parse_qs
+
+import pandas as pd
+
+from src.logger import get_logger
+from src.query import ConsolidatedIndex, open_index
+from src.storage import get_storage
+from src.transformer import COL_DATA
+
+logger = get_logger()
+
+# Arquivo de marcação gravado pelo pipeline ao final de cada execução
+MARCADOR_EXECUCAO = "_last_run.json"
+
+# Respostas mantidas no cache (as menos usadas recentemente saem primeiro)
+CACHE_RESPOSTAS_PADRAO = 256
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+def write_run_marker(processed_path: str, status: str, storage=None):
+    """
+    Grava o marcador de fim de execução lido pelo serviço HTTP para
+    invalidar seu cache. A escrita é atômica (arquivo temporário + replace).
+    """
+    marker = os.path.join(processed_path, MARCADOR_EXECUCAO)
+    with get_storage(storage).atomic_write(marker, "w") as f:
+        json.dump({"finished_at": datetime.now().isoformat(), "status": status}, f)
+
+
+def _parse_date(value: Optional[str], name: str):
+    if not value:
+        return None
+    try:
+        return pd.Timestamp(value)
+    except ValueError:
+        raise ValueError(f"Parâmetro '{name}' inválido: {value!r}. Use AAAA-MM-DD.")
+
+
+class MetricsService:
+    """
+    Serviço HTTP local (asyncio) de métricas e séries do dataset consolidado.
+
+    - Os dados consolidados são carregados uma única vez (via `loader`, que
+      retorna um DataFrame ou um ConsolidatedIndex) e recarregados apenas
+      quando o marcador de execução do pipeline muda.
+    - As consultas usam o índice por data (somas de prefixo): cada recorte
+      custa duas buscas binárias, independentemente do número de linhas.
+    - As respostas ficam em um cache LRU em memória por (rota, início, fim),
+      limitado a `cache_size` entradas e invalidado junto com o recarregamento.
+    - Cálculos com pandas rodam em um executor, sem bloquear o event loop.
+
+    Rotas (GET):
+      /health
+      /metrics?start=AAAA-MM-DD&end=AAAA-MM-DD   → totais no formato de calculate_metrics
+      /series?start=AAAA-MM-DD&end=AAAA-MM-DD    → série diária de prepare_chart_data
+    """
+
+    def __init__(self, loader: Callable[[], Union[pd.DataFrame, ConsolidatedIndex]], marker_path: str = None,
+                 cache_size: int = CACHE_RESPOSTAS_PADRAO):
+        self.loader = loader
+        self.marker_path = marker_path
+        self.cache_size = cache_size
+        self.index: Optional[ConsolidatedIndex] = None
+        self.loaded_at = None
+        self._marker_mtime = None
+        self._cache = OrderedDict()
+        self._reload_lock = asyncio.Lock()
+
+    @classmethod
+    def from_config(cls, config: dict) -> "MetricsService":
+        processed_path = config.get("paths", {}).get("processed", "data/processed")
+        cache_size = (config.get("service") or {}).get("cache_size", CACHE_RESPOSTAS_PADRAO)
+
+        def loader():
+            return open_index(processed_path)
+
+        return cls(loader, marker_path=os.path.join(processed_path, MARCADOR_EXECUCAO), cache_size=cache_size)
+
+    # ------------------------------------------------------
+    # Carga e invalidação
+    # ------------------------------------------------------
+    def _current_marker(self):
+        if not self.marker_path:
+            return None
+        try:
+            return os.stat(self.marker_path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    async def ensure_loaded(self):
+        """Carrega os dados na primeira chamada e após cada nova execução do pipeline."""
+        marker = self._current_marker()
+        if self.index is not None and marker == self._marker_mtime:
+            return
+
+        async with self._reload_lock:
+            marker = self._current_marker()
+            if self.index is not None and marker == self._marker_mtime:
+                return
+            loop = asyncio.get_running_loop()
+            self.index = await loop.run_in_executor(None, self._load_index)
+            self._marker_mtime = marker
+            self._cache.clear()
+            self.loaded_at = datetime.now().isoformat()
+            logger.info(f"Serviço: dados consolidados carregados ({self.rows} linhas); cache invalidado.")
+
+    def _load_index(self) -> ConsolidatedIndex:
+        data = self.loader()
+        return data if isinstance(data, ConsolidatedIndex) else ConsolidatedIndex.from_frame(data)
+
+    @property
+    def rows(self) -> int:
+        return int(self.index.row_prefix[-1]) if self.index is not None else 0
+
+    # ------------------------------------------------------
+    # Cálculos (executados fora do event loop)
+    # ------------------------------------------------------
+    def _compute(self, route: str, start, end) -> dict:
+        if route == "/metrics":
+            return {"start": _iso(start), "end": _iso(end), **self.index.totals(start, end)}
+
+        chart = self.index.series(start, end)
+        series = chart.assign(**{COL_DATA: chart[COL_DATA].dt.strftime("%Y-%m-%d")})
+        return {"start": _iso(start), "end": _iso(end), "points": series.to_dict(orient="records")}
+
+    async def handle(self, method: str, target: str):
+        """Processa uma requisição e retorna (status, payload)."""
+        if method != "GET":
+            return 405, {"error": "Apenas GET é suportado."}
+
+        url = urlsplit(target)
+        if url.path not in ("/health", "/metrics", "/series"):
+            return 404, {"error": f"Rota não encontrada: {url.path}"}
+
+        await self.ensure_loaded()
+
+        if url.path == "/health":
+            return 200, {"status": "ok", "rows": self.rows, "loaded_at": self.loaded_at}
+
+        params = parse_qs(url.query)
+        try:
+            start = _parse_date(params.get("start", [None])[0], "start")
+            end = _parse_date(params.get("end", [None])[0], "end")
+        except ValueError as e:
+            return 400, {"error": str(e)}
+
+        key = (url.path, start, end)
+        task = self._cache.get(key)
+        if task is None:
+            # Requisições simultâneas iguais compartilham o mesmo cálculo
+            loop = asyncio.get_running_loop()
+            task = asyncio.ensure_future(loop.run_in_executor(None, self._compute, url.path, start, end))
+            self._cache[key] = task
+            while len(self._cache) > self.cache_size:
+                # Tarefas removidas continuam válidas para quem já as aguarda
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(key)
+        try:
+            return 200, await task
+        except Exception:
+            self._cache.pop(key, None)
+            raise
+
+    # ------------------------------------------------------
+    # Protocolo HTTP/1.1 mínimo
+    # ------------------------------------------------------
+    async def _on_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = (await reader.readline()).decode("latin-1").strip()
+            # Descarta os cabeçalhos até a linha em branco
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+
+            parts = request_line.split()
+            if len(parts) < 2:
+                status, payload = 400, {"error": "Requisição inválida."}
+            else:
+                try:
+                    status, payload = await self.handle(parts[0], parts[1])
+                except Exception as e:
+                    logger.error(f"Serviço: erro ao processar '{request_line}': {e}")
+                    status, payload = 500, {"error": "Erro interno."}
+
+            body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+            writer.write(
+                f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+                "Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n".encode("latin-1") + body
+            )
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765) -> asyncio.AbstractServer:
+        """Inicia o servidor (port=0 escolhe uma porta livre) e retorna o objeto do asyncio."""
+        server = await asyncio.start_server(self._on_connection, host, port)
+        address = server.sockets[0].getsockname()
+        logger.info(f"Serviço de métricas ouvindo em http://{address[0]}:{address[1]}")
+        return server
+
+    async def serve_forever(self, host: str = "127.0.0.1", port: int = 8765):
+        await self.ensure_loaded()
+        server = await self.start(host, port)
+        async with server:
+            await server.serve_forever()
+
+
+def _iso(value):
+    return value.strftime("%Y-%m-%d") if value is not None else None
@@ -0,0 +1,120 @@
+import atexit
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+import pandas as pd
+
+from src.logger import get_logger
+
+logger = get_logger()
+
+# Arquivos publicados e ainda não liberados (removidos na saída do processo)
+_published = set()
+_published_lock = threading.Lock()
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+    except ImportError:
+        raise ImportError(
+            "O compartilhamento de DataFrames entre processos requer 'pyarrow'. "
+            "Instale com: pip install pyarrow"
+        )
+    return pyarrow
+
+
+def _default_dir() -> str:
+    # /dev/shm é memória (tmpfs) no Linux; fora dele, usa o temporário do sistema
+    shm = "/dev/shm"
+    if os.path.isdir(shm) and os.access(shm, os.W_OK):
+        return shm
+    return tempfile.gettempdir()
+
+
+@dataclass(frozen=True)
+class SharedFrameHandle:
+    """
+    Referência leve (picklável) a um DataFrame publicado em arquivo Arrow IPC.
+    É isso que viaja para os workers, em vez do DataFrame serializado.
+    """
+    path: str
+    rows: int
+
+    def attach(self) -> pd.DataFrame:
+        return attach_frame(self)
+
+
+def publish_frame(df: pd.DataFrame, directory: str = None) -> SharedFrameHandle:
+    """
+    Grava o DataFrame uma única vez em formato Arrow IPC (sem compressão),
+    pronto para ser mapeado em memória pelos workers.
+    """
+    pa = _require_pyarrow()
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    fd, path = tempfile.mkstemp(prefix="frame_", suffix=".arrow", dir=directory or _default_dir())
+    os.close(fd)
+
+    try:
+        with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    except BaseException:
+        os.remove(path)
+        raise
+
+    with _published_lock:
+        _published.add(path)
+    logger.info(f"DataFrame compartilhado publicado em {path} ({len(df)} linhas, {os.path.getsize(path)} bytes)")
+    return SharedFrameHandle(path=path, rows=len(df))
+
+
+def attach_frame(handle) -> pd.DataFrame:
+    """
+    Abre um DataFrame publicado via memory map, sem desserializar: as colunas
+    numéricas e de data sem nulos apontam diretamente para as páginas do
+    arquivo (compartilhadas entre processos pelo sistema operacional).
+
+    O resultado deve ser tratado como somente leitura.
+    """
+    pa = _require_pyarrow()
+    path = handle.path if isinstance(handle, SharedFrameHandle) else handle
+
+    source = pa.memory_map(path, "r")
+    table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas(split_blocks=True, self_destruct=False)
+
+
+def release_frame(handle):
+    """Remove o arquivo publicado (workers já anexados continuam válidos no POSIX)."""
+    path = handle.path if isinstance(handle, SharedFrameHandle) else handle
+    with _published_lock:
+        _published.discard(path)
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+@contextmanager
+def shared_frame(df: pd.DataFrame, directory: str = None):
+    """
+    Publica `df` durante o bloco e remove o arquivo ao sair, inclusive
+    quando o bloco termina com exceção.
+    """
+    handle = publish_frame(df, directory)
+    try:
+        yield handle
+    finally:
+        release_frame(handle)
+
+
+@atexit.register
+def _release_all():
+    # Rede de segurança: publicações que escaparam de shared_frame/release_frame
+    for path in list(_published):
+        release_frame(path)
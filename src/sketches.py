@@ -0,0 +1,278 @@
+import json
+import math
+from typing import Iterable, List
+
+import numpy as np
+import pandas as pd
+
+from src.logger import get_logger
+from src.storage import get_storage
+from src.transformer import COL_FATURAMENTO
+
+logger = get_logger()
+
+ARQUIVO_SKETCHES = "metricas_aproximadas.json"
+COMPRESSAO_PADRAO = 200
+CAPACIDADE_PADRAO = 1000
+QUANTIS = {"ticket_mediano": 0.5, "ticket_p95": 0.95}
+COL_ERRO = "erro_max"
+COL_GARANTIDO = "garantido"
+
+
+# -----------------------------------------------------------
+# 1) t-digest: quantis aproximados e mescláveis
+# -----------------------------------------------------------
+class TDigest:
+    """
+    t-digest (variante "merging", escala k1) para quantis de uma coluna
+    numérica sem manter os valores em memória.
+
+    Os valores viram centroides (média, peso) cuja largura em posição (rank)
+    é limitada pela função de escala k(q) = δ/(2π)·asin(2q − 1): cada
+    centroide cobre no máximo uma unidade de k, ou seja, uma fração
+    Δq ≤ 2π·√(q(1−q))/δ dos dados — estreita nas caudas, larga na mediana.
+    Com δ = compressão, o digest guarda ~δ/2 centroides.
+
+    Limite documentado (verificado nos testes contra pandas): a estimativa
+    do quantil q está entre os quantis exatos de posição q ± `rank_error(q)`,
+    com rank_error(q) = 2π·√(q(1−q))/δ + 1/n.
+
+    - update(valores): um lote (bloco/arquivo) é ordenado e agrupado de forma
+      vetorizada; o resultado é mesclado ao digest.
+    - merge(outro): concatena os centroides e recomprime (custo O(δ)).
+    """
+
+    def __init__(self, compression: float = COMPRESSAO_PADRAO):
+        self.compression = float(compression)
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = math.inf
+        self.max = -math.inf
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum())
+
+    def _k(self, q):
+        return self.compression / (2 * math.pi) * np.arcsin(2 * np.asarray(q) - 1)
+
+    def update(self, values) -> "TDigest":
+        values = np.asarray(values, dtype=float)
+        values = np.sort(values[~np.isnan(values)])
+        n = len(values)
+        if not n:
+            return self
+
+        # Cada valor vai para o "degrau" de k da sua posição no lote: o
+        # agrupamento é um corte por mudança de degrau + somas por segmento
+        steps = np.floor(self._k((np.arange(n) + 0.5) / n))
+        starts = np.flatnonzero(np.r_[True, steps[1:] != steps[:-1]])
+        weights = np.diff(np.r_[starts, n]).astype(float)
+        means = np.add.reduceat(values, starts) / weights
+
+        batch = TDigest(self.compression)
+        batch.means, batch.weights = means, weights
+        batch.min, batch.max = values[0], values[-1]
+        return self.merge(batch)
+
+    def merge(self, other: "TDigest") -> "TDigest":
+        if not len(other.weights):
+            return self
+        means = np.concatenate([self.means, other.means])
+        weights = np.concatenate([self.weights, other.weights])
+        self.means, self.weights = self._compress(means, weights)
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray):
+        # Guloso sobre poucas centenas de centroides: absorve o próximo
+        # enquanto o centroide acumulado couber em uma unidade de k
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        bounds = self._k(np.minimum(np.cumsum(weights) / total, 1.0))
+        k_start = self._k(0.0)
+
+        out_means, out_weights = [], []
+        acc_sum, acc_w = means[0] * weights[0], weights[0]
+        for i in range(1, len(means)):
+            if bounds[i] - k_start <= 1.0:
+                acc_sum += means[i] * weights[i]
+                acc_w += weights[i]
+            else:
+                out_means.append(acc_sum / acc_w)
+                out_weights.append(acc_w)
+                k_start = bounds[i - 1]
+                acc_sum, acc_w = means[i] * weights[i], weights[i]
+        out_means.append(acc_sum / acc_w)
+        out_weights.append(acc_w)
+        return np.array(out_means), np.array(out_weights)
+
+    def quantile(self, q):
+        """Quantil(is) q ∈ [0, 1] por interpolação entre os centros dos centroides."""
+        if not len(self.weights):
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else math.nan
+        total = self.weights.sum()
+        centers = np.cumsum(self.weights) - self.weights / 2
+        x = np.r_[0.0, centers, total]
+        y = np.r_[self.min, self.means, self.max]
+        result = np.interp(np.asarray(q, dtype=float) * total, x, y)
+        return float(result) if np.ndim(result) == 0 else result
+
+    def rank_error(self, q):
+        """Erro máximo documentado, em fração de posição, do quantil q."""
+        q = np.asarray(q, dtype=float)
+        n = max(self.count, 1.0)
+        return 2 * math.pi * np.sqrt(q * (1 - q)) / self.compression + 1 / n
+
+
+# -----------------------------------------------------------
+# 2) Space-Saving: top-N por peso (ex.: faturamento)
+# -----------------------------------------------------------
+class SpaceSaving:
+    """
+    Contadores Space-Saving ponderados e mescláveis para os maiores itens
+    (produtos, filiais) por soma de pesos não negativos, com no máximo
+    `capacity` chaves monitoradas.
+
+    Cada chave monitorada guarda (valor, erro) com
+    valor − erro ≤ valor real ≤ valor; chaves fora do resumo têm valor real
+    ≤ `floor`. Limite documentado: erro ≤ floor ≤ W / capacity (W = soma
+    dos pesos), preservado por `merge`; toda chave com valor real acima de
+    W / capacity está no resumo.
+
+    - update(chaves, pesos): o lote é somado exatamente por chave (groupby) e
+      reduzido às `capacity` maiores; as descartadas definem o floor do lote.
+    - merge(outro): chaves ausentes de um lado recebem o floor desse lado
+      (limite superior do que ele pode ter visto) e ficam as `capacity` maiores.
+    """
+
+    def __init__(self, capacity: int = CAPACIDADE_PADRAO):
+        self.capacity = int(capacity)
+        self.counts = pd.Series(dtype=float)
+        self.errors = pd.Series(dtype=float)
+        self.floor = 0.0
+        self.total = 0.0
+
+    def update(self, keys, weights) -> "SpaceSaving":
+        weights = pd.Series(np.asarray(weights, dtype=float))
+        keys = pd.Series(np.asarray(keys, dtype=object))
+        sums = weights.groupby(keys, dropna=True, sort=False).sum()
+        if sums.empty:
+            return self
+
+        batch = SpaceSaving(self.capacity)
+        batch.total = float(sums.sum())
+        batch.counts, batch.errors, batch.floor = self._truncate(sums, pd.Series(0.0, index=sums.index), 0.0)
+        return self.merge(batch)
+
+    def merge(self, other: "SpaceSaving") -> "SpaceSaving":
+        index = self.counts.index.union(other.counts.index)
+        counts = (self.counts.reindex(index, fill_value=self.floor)
+                  + other.counts.reindex(index, fill_value=other.floor))
+        errors = (self.errors.reindex(index, fill_value=self.floor)
+                  + other.errors.reindex(index, fill_value=other.floor))
+        self.counts, self.errors, self.floor = self._truncate(counts, errors, self.floor + other.floor)
+        self.total += other.total
+        return self
+
+    def _truncate(self, counts: pd.Series, errors: pd.Series, floor: float):
+        if len(counts) <= self.capacity:
+            return counts, errors, floor
+        order = np.argsort(-counts.to_numpy(), kind="stable")
+        kept, dropped = order[:self.capacity], order[self.capacity:]
+        floor = max(floor, float(counts.iloc[dropped].max()))
+        return counts.iloc[kept], errors.iloc[kept], floor
+
+    def top(self, n: int, name: str = "chave") -> pd.DataFrame:
+        """
+        As n maiores chaves com o valor estimado, o erro máximo e se a
+        chave está garantidamente entre as n maiores (valor − erro ≥ valor
+        estimado da (n+1)-ésima ou do floor).
+        """
+        ordered = self.counts.sort_values(ascending=False, kind="stable")
+        head = ordered.iloc[:n]
+        threshold = max(float(ordered.iloc[n]) if len(ordered) > n else 0.0, self.floor)
+        errors = self.errors.reindex(head.index)
+        return pd.DataFrame({
+            name: head.index,
+            COL_FATURAMENTO: head.to_numpy(),
+            COL_ERRO: errors.to_numpy(),
+            COL_GARANTIDO: (head - errors).to_numpy() >= threshold,
+        })
+
+
+# -----------------------------------------------------------
+# 3) Conjunto usado na etapa de métricas
+# -----------------------------------------------------------
+class MetricSketches:
+    """
+    Saídas aproximadas da etapa de métricas: mediana e p95 do ticket
+    (faturamento por linha) e top-N das dimensões por faturamento.
+
+    Alimentado em blocos de `chunk_rows` linhas (ou por arquivo/lote via
+    `update`) e mesclável entre execuções parciais com `merge`.
+    """
+
+    def __init__(self, dimensions: Iterable[str] = (), top_n: int = 10,
+                 compression: float = COMPRESSAO_PADRAO, capacity: int = CAPACIDADE_PADRAO,
+                 chunk_rows: int = 1_000_000):
+        self.dimensions: List[str] = list(dimensions)
+        self.top_n = top_n
+        self.chunk_rows = chunk_rows
+        self.ticket = TDigest(compression)
+        self.top = {dim: SpaceSaving(capacity) for dim in self.dimensions}
+        self.skipped: List[str] = []
+
+    def update(self, df: pd.DataFrame) -> "MetricSketches":
+        if COL_FATURAMENTO not in df.columns:
+            return self
+        revenue = df[COL_FATURAMENTO].to_numpy(dtype=float, na_value=np.nan)
+        self.ticket.update(revenue)
+        for dim, counter in self.top.items():
+            if dim not in df.columns:
+                if dim not in self.skipped:
+                    self.skipped.append(dim)
+                    logger.warning("Top-N ignorado: coluna de dimensão ausente: %s", dim)
+                continue
+            valid = ~np.isnan(revenue)
+            counter.update(df[dim].to_numpy()[valid], revenue[valid])
+        return self
+
+    def feed(self, df: pd.DataFrame) -> "MetricSketches":
+        """Alimenta os sketches bloco a bloco (memória limitada por `chunk_rows`)."""
+        for start in range(0, len(df), self.chunk_rows):
+            self.update(df.iloc[start:start + self.chunk_rows])
+        return self
+
+    def merge(self, other: "MetricSketches") -> "MetricSketches":
+        self.ticket.merge(other.ticket)
+        for dim, counter in other.top.items():
+            self.top.setdefault(dim, SpaceSaving(counter.capacity)).merge(counter)
+        return self
+
+    def summary(self) -> dict:
+        """Quantis do ticket (com o erro de posição) e top-N por dimensão."""
+        result = {"linhas": int(self.ticket.count)}
+        for key, q in QUANTIS.items():
+            value = self.ticket.quantile(q)
+            result[key] = None if math.isnan(value) else round(value, 2)
+            result[f"{key}_erro_rank"] = round(float(self.ticket.rank_error(q)), 6)
+        result["top"] = {
+            dim: self.top[dim].top(self.top_n, dim).round(2).to_dict(orient="records")
+            for dim in self.dimensions if dim not in self.skipped
+        }
+        return result
+
+
+def write_sketch_report(sketches: MetricSketches, path: str, storage=None) -> dict:
+    """Grava o resumo dos sketches em JSON (escrita atômica) e o devolve."""
+    summary = sketches.summary()
+    with get_storage(storage).atomic_write(path, "w") as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False, default=str)
+    logger.info(
+        "Ticket mediano: %s | p95: %s (%d linhas). Resumo aproximado: %s",
+        summary["ticket_mediano"], summary["ticket_p95"], summary["linhas"], path,
+    )
+    return summary
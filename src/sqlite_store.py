@@ -0,0 +1,144 @@
+import os
+import sqlite3
+from contextlib import closing
+from typing import Iterable, Optional
+
+import pandas as pd
+
+from src.logger import get_logger
+from src.transformer import COL_DATA, COL_FATURAMENTO, COL_CUSTOS, COL_LUCRO, metrics_from_totals
+
+logger = get_logger()
+
+TABELA_CONSOLIDADA = "consolidado"
+FORMATO_DATA_SQL = "%Y-%m-%d %H:%M:%S"
+TAMANHO_LOTE = 50_000
+
+
+def _quote(identifier: str) -> str:
+    """Cita um identificador SQL (nomes de colunas vêm das planilhas)."""
+    return '"' + str(identifier).replace('"', '""') + '"'
+
+
+def _sql_type(serie: pd.Series) -> str:
+    if pd.api.types.is_bool_dtype(serie) or pd.api.types.is_integer_dtype(serie):
+        return "INTEGER"
+    if pd.api.types.is_numeric_dtype(serie):
+        return "REAL"
+    return "TEXT"
+
+
+class SQLiteStore:
+    """
+    Armazenamento opcional dos dados consolidados em um arquivo SQLite local.
+
+    - Escrita em lotes dentro de uma única transação (executemany);
+    - Índices em 'data' e nas colunas de dimensão configuradas
+      (columns.dimensions no config.yaml), criados após a carga;
+    - `calculate_metrics` e `prepare_chart_data` executados como agregações
+      SQL: só os totais/pontos diários saem do banco, então a memória não
+      cresce com o histórico armazenado.
+
+    As datas são gravadas como texto 'AAAA-MM-DD HH:MM:SS' (ordenável).
+    """
+
+    def __init__(self, path: str, dimensions: Iterable[str] = ()):
+        self.path = path
+        self.dimensions = list(dimensions)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    # ------------------------------------------------------
+    # Escrita
+    # ------------------------------------------------------
+    def write(self, df: pd.DataFrame, replace: bool = True, batch_size: int = TAMANHO_LOTE):
+        """
+        Grava as linhas processadas. Com replace=True a tabela passa a
+        refletir exatamente `df`; caso contrário as linhas são acrescentadas.
+        """
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        columns = list(df.columns)
+        col_defs = ", ".join(f"{_quote(c)} {'TEXT' if c == COL_DATA else _sql_type(df[c])}" for c in columns)
+        insert = (
+            f"INSERT INTO {TABELA_CONSOLIDADA} ({', '.join(map(_quote, columns))}) "
+            f"VALUES ({', '.join('?' for _ in columns)})"
+        )
+
+        with closing(self._connect()) as conn:
+            with conn:  # transação única: commit no fim, rollback em erro
+                if replace:
+                    conn.execute(f"DROP TABLE IF EXISTS {TABELA_CONSOLIDADA}")
+                conn.execute(f"CREATE TABLE IF NOT EXISTS {TABELA_CONSOLIDADA} ({col_defs})")
+
+                for offset in range(0, len(df), batch_size):
+                    batch = df.iloc[offset:offset + batch_size]
+                    if COL_DATA in batch.columns:
+                        batch = batch.assign(**{COL_DATA: batch[COL_DATA].dt.strftime(FORMATO_DATA_SQL)})
+                    # NaN/NaT → NULL (ignorados por SUM/TOTAL, como no pandas)
+                    batch = batch.astype(object).where(batch.notna(), None)
+                    conn.executemany(insert, batch.itertuples(index=False, name=None))
+
+                for col in [COL_DATA, *self.dimensions]:
+                    if col in columns:
+                        conn.execute(
+                            f"CREATE INDEX IF NOT EXISTS {_quote('idx_' + col)} "
+                            f"ON {TABELA_CONSOLIDADA} ({_quote(col)})"
+                        )
+
+        logger.info(f"SQLite: {len(df)} linhas gravadas em {self.path}")
+
+    # ------------------------------------------------------
+    # Agregações em SQL
+    # ------------------------------------------------------
+    def _where(self, start=None, end=None, filters: Optional[dict] = None):
+        clauses, params = [f"{_quote(COL_DATA)} IS NOT NULL"], []
+        if start is not None:
+            clauses.append(f"{_quote(COL_DATA)} >= ?")
+            params.append(pd.Timestamp(start).strftime(FORMATO_DATA_SQL))
+        if end is not None:
+            clauses.append(f"{_quote(COL_DATA)} <= ?")
+            params.append(pd.Timestamp(end).strftime(FORMATO_DATA_SQL))
+        for col, value in (filters or {}).items():
+            clauses.append(f"{_quote(col)} = ?")
+            params.append(value)
+        return " AND ".join(clauses), params
+
+    def calculate_metrics(self, start=None, end=None, filters: Optional[dict] = None) -> dict:
+        """Equivalente SQL de transformer.calculate_metrics (mesmo formato e arredondamento)."""
+        where, params = self._where(start, end, filters)
+        sql = (
+            f"SELECT TOTAL({_quote(COL_FATURAMENTO)}), TOTAL({_quote(COL_CUSTOS)}) "
+            f"FROM {TABELA_CONSOLIDADA} WHERE {where}"
+        )
+        with closing(self._connect()) as conn:
+            faturamento_total, custos_totais = conn.execute(sql, params).fetchone()
+
+        metrics = metrics_from_totals(faturamento_total, custos_totais)
+        logger.info(f"Métricas calculadas (SQLite): {metrics}")
+        return metrics
+
+    def prepare_chart_data(self, start=None, end=None, filters: Optional[dict] = None) -> pd.DataFrame:
+        """Equivalente SQL de transformer.prepare_chart_data (soma diária ordenada por data)."""
+        where, params = self._where(start, end, filters)
+        cols = [COL_FATURAMENTO, COL_CUSTOS, COL_LUCRO]
+        sql = (
+            f"SELECT {_quote(COL_DATA)}, {', '.join(f'TOTAL({_quote(c)})' for c in cols)} "
+            f"FROM {TABELA_CONSOLIDADA} WHERE {where} "
+            f"GROUP BY {_quote(COL_DATA)} ORDER BY {_quote(COL_DATA)}"
+        )
+        with closing(self._connect()) as conn:
+            rows = conn.execute(sql, params).fetchall()
+
+        df_chart = pd.DataFrame(rows, columns=[COL_DATA, *cols])
+        df_chart[COL_DATA] = pd.to_datetime(df_chart[COL_DATA], format=FORMATO_DATA_SQL)
+        df_chart[cols] = df_chart[cols].astype(float)
+
+        logger.info(f"{len(df_chart)} pontos de dados gerados para o gráfico (SQLite).")
+        return df_chart
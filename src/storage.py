@@ -0,0 +1,296 @@
+import io
+import os
+import posixpath
+import shutil
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import List, Tuple
+
+
+class Storage(ABC):
+    """
+    Interface de armazenamento usada pelo pipeline (leitura das planilhas,
+    relatórios, dataset, índice, estado dos indicadores...).
+
+    Os caminhos são strings no mesmo formato usado no config.yaml
+    ("data/raw", "data/reports/relatorio.pdf"). Implementações:
+
+    - LocalStorage: sistema de arquivos (comportamento padrão);
+    - MemoryStorage: tudo em memória, para execuções embutidas e testes
+      sem nenhuma escrita em disco.
+    """
+
+    @abstractmethod
+    def open(self, path: str, mode: str = "rb"):
+        """Abre um arquivo em modo "rb", "wb", "r" ou "w" (texto em UTF-8)."""
+
+    @abstractmethod
+    def exists(self, path: str) -> bool: ...
+
+    @abstractmethod
+    def isdir(self, path: str) -> bool: ...
+
+    @abstractmethod
+    def listdir(self, path: str) -> List[str]:
+        """Nomes (não caminhos) das entradas do diretório. Inexistente → FileNotFoundError."""
+
+    @abstractmethod
+    def makedirs(self, path: str): ...
+
+    @abstractmethod
+    def stat(self, path: str) -> Tuple[int, int]:
+        """(tamanho em bytes, mtime em ns)."""
+
+    @abstractmethod
+    def replace(self, src: str, dst: str):
+        """Renomeia `src` para `dst`, sobrescrevendo-o (atômico no disco local)."""
+
+    @abstractmethod
+    def remove(self, path: str): ...
+
+    @abstractmethod
+    def rmtree(self, path: str):
+        """Remove um diretório e todo o seu conteúdo (inexistente: nada a fazer)."""
+
+    def move(self, src: str, dst: str):
+        """Move um arquivo, criando o diretório de destino se necessário."""
+        self.replace(src, dst)
+
+    def read_bytes(self, path: str) -> bytes:
+        with self.open(path, "rb") as f:
+            return f.read()
+
+    def write_bytes(self, path: str, data: bytes):
+        with self.atomic_write(path) as f:
+            f.write(data)
+
+    @contextmanager
+    def atomic_write(self, path: str, mode: str = "wb"):
+        """
+        Escreve em `<path>.tmp` e só então substitui `path`: leitores nunca
+        veem um arquivo pela metade. Cria o diretório pai se necessário.
+        """
+        parent = posixpath.dirname(path.replace(os.sep, "/"))
+        if parent:
+            self.makedirs(parent)
+        tmp = path + ".tmp"
+        try:
+            with self.open(tmp, mode) as f:
+                yield f
+        except BaseException:
+            if self.exists(tmp):
+                self.remove(tmp)
+            raise
+        self.replace(tmp, path)
+
+
+# -----------------------------------------------------------
+# 1) Disco local
+# -----------------------------------------------------------
+class LocalStorage(Storage):
+    """Sistema de arquivos local (caminhos relativos ao diretório atual)."""
+
+    def open(self, path, mode="rb"):
+        if "b" in mode:
+            return open(path, mode)
+        return open(path, mode, encoding="utf-8")
+
+    def exists(self, path):
+        return os.path.exists(path)
+
+    def isdir(self, path):
+        return os.path.isdir(path)
+
+    def listdir(self, path):
+        return os.listdir(path)
+
+    def makedirs(self, path):
+        os.makedirs(path, exist_ok=True)
+
+    def stat(self, path):
+        info = os.stat(path)
+        return info.st_size, info.st_mtime_ns
+
+    def replace(self, src, dst):
+        os.replace(src, dst)
+
+    def move(self, src, dst):
+        parent = os.path.dirname(dst)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        shutil.move(src, dst)
+
+    def remove(self, path):
+        os.remove(path)
+
+    def rmtree(self, path):
+        shutil.rmtree(path, ignore_errors=True)
+
+
+# -----------------------------------------------------------
+# 2) Memória
+# -----------------------------------------------------------
+class _MemoryFile(io.BytesIO):
+    # Buffer de escrita: o conteúdo só é publicado no armazenamento ao fechar
+    def __init__(self, storage: "MemoryStorage", path: str):
+        super().__init__()
+        self._storage = storage
+        self._path = path
+
+    def close(self):
+        if not self.closed:
+            self._storage._commit(self._path, self.getvalue())
+        super().close()
+
+
+class MemoryStorage(Storage):
+    """
+    Armazenamento em memória (dicionário caminho → bytes), seguro para as
+    etapas de saída que rodam em threads. Diretórios são implícitos (prefixos
+    de arquivos) ou criados com makedirs.
+    """
+
+    def __init__(self, files: dict = None):
+        self._files = {}
+        self._mtimes = {}
+        self._dirs = {""}
+        self._lock = threading.RLock()
+        for path, data in (files or {}).items():
+            self.write_bytes(path, data.encode("utf-8") if isinstance(data, str) else data)
+
+    @staticmethod
+    def _norm(path) -> str:
+        path = posixpath.normpath(os.fspath(path).replace(os.sep, "/"))
+        return "" if path == "." else path.lstrip("/")
+
+    def _commit(self, path: str, data: bytes):
+        with self._lock:
+            parent = posixpath.dirname(path)
+            if not self.isdir(parent):
+                raise FileNotFoundError(f"Diretório não encontrado: {parent}")
+            self._files[path] = data
+            self._mtimes[path] = time.time_ns()
+
+    @property
+    def files(self) -> dict:
+        """Cópia de {caminho: bytes} de todos os arquivos armazenados."""
+        with self._lock:
+            return dict(self._files)
+
+    def open(self, path, mode="rb"):
+        path = self._norm(path)
+        if mode in ("rb", "r"):
+            with self._lock:
+                if path not in self._files:
+                    raise FileNotFoundError(f"Arquivo não encontrado: {path}")
+                buffer = io.BytesIO(self._files[path])
+        elif mode in ("wb", "w"):
+            buffer = _MemoryFile(self, path)
+        else:
+            raise ValueError(f"Modo não suportado pelo MemoryStorage: {mode!r}")
+        return buffer if "b" in mode else io.TextIOWrapper(buffer, encoding="utf-8")
+
+    def exists(self, path):
+        path = self._norm(path)
+        return path in self._files or self.isdir(path)
+
+    def isdir(self, path):
+        path = self._norm(path)
+        with self._lock:
+            if path in self._dirs:
+                return True
+            prefix = path + "/"
+            return any(name.startswith(prefix) for name in self._files)
+
+    def listdir(self, path):
+        path = self._norm(path)
+        if not self.isdir(path):
+            raise FileNotFoundError(f"Diretório não encontrado: {path}")
+        prefix = path + "/" if path else ""
+        with self._lock:
+            entries = {
+                name[len(prefix):].split("/", 1)[0]
+                for name in [*self._files, *self._dirs]
+                if name.startswith(prefix) and name != path
+            }
+        return sorted(entries)
+
+    def makedirs(self, path):
+        path = self._norm(path)
+        with self._lock:
+            while path and path not in self._dirs:
+                self._dirs.add(path)
+                path = posixpath.dirname(path)
+
+    def stat(self, path):
+        path = self._norm(path)
+        with self._lock:
+            if path not in self._files:
+                raise FileNotFoundError(f"Arquivo não encontrado: {path}")
+            return len(self._files[path]), self._mtimes[path]
+
+    def replace(self, src, dst):
+        src, dst = self._norm(src), self._norm(dst)
+        with self._lock:
+            if src not in self._files:
+                raise FileNotFoundError(f"Arquivo não encontrado: {src}")
+            self.makedirs(posixpath.dirname(dst))
+            self._files[dst] = self._files.pop(src)
+            self._mtimes[dst] = self._mtimes.pop(src)
+
+    def remove(self, path):
+        path = self._norm(path)
+        with self._lock:
+            if path not in self._files:
+                raise FileNotFoundError(f"Arquivo não encontrado: {path}")
+            del self._files[path]
+            del self._mtimes[path]
+
+    def rmtree(self, path):
+        path = self._norm(path)
+        prefix = path + "/"
+        with self._lock:
+            for name in [n for n in self._files if n.startswith(prefix)]:
+                del self._files[name]
+                del self._mtimes[name]
+            self._dirs = {d for d in self._dirs if d != path and not d.startswith(prefix)}
+
+
+# -----------------------------------------------------------
+# 3) Utilitários para funções que aceitam caminho ou arquivo
+# -----------------------------------------------------------
+LOCAL = LocalStorage()
+
+
+def get_storage(storage: Storage = None) -> Storage:
+    """Armazenamento informado ou o disco local (padrão)."""
+    return storage if storage is not None else LOCAL
+
+
+def is_file_like(target) -> bool:
+    return hasattr(target, "read") or hasattr(target, "write")
+
+
+@contextmanager
+def open_input(source, storage: Storage = None):
+    """Aceita um caminho (lido via `storage`) ou um arquivo binário já aberto."""
+    if is_file_like(source):
+        yield source
+    else:
+        with get_storage(storage).open(source, "rb") as f:
+            yield f
+
+
+@contextmanager
+def open_output(target, storage: Storage = None):
+    """
+    Aceita um caminho (gravado de forma atômica via `storage`) ou um arquivo
+    binário já aberto (ex.: BytesIO), que não é fechado.
+    """
+    if is_file_like(target):
+        yield target
+    else:
+        with get_storage(storage).atomic_write(os.fspath(target)) as f:
+            yield f
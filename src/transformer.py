@@ -1,5 +1,6 @@
 import pandas as pd
 from typing import List
+from src.instrumentation import stage
 from src.logger import get_logger
 
 # Configuração de Logs
@@ -33,6 +34,29 @@ def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
     )
     return df
 
+# -----------------------------------------------------------
+# 2.0) Conversão de datas em formatos mistos
+# -----------------------------------------------------------
+def _parse_dates(serie: pd.Series) -> pd.Series:
+    """
+    Converte datas em formatos mistos, valor a valor, sem depender de qual
+    formato aparece primeiro na coluna (o que tornava o resultado dependente
+    da ordem e do agrupamento dos arquivos):
+
+    1. Ano primeiro (ISO: 2024-01-31, 2024/01/31, com ou sem hora) e objetos datetime;
+    2. O restante com dia primeiro (DD/MM/AAAA).
+    """
+    datas = pd.to_datetime(serie, errors="coerce", format="ISO8601")
+
+    pendentes = datas.isna() & serie.notna()
+    if pendentes.any():
+        datas[pendentes] = pd.to_datetime(
+            serie[pendentes], errors="coerce", dayfirst=True, format="mixed"
+        )
+
+    return datas.astype("datetime64[ns]")
+
+
 # -----------------------------------------------------------
 # 2.1) Lógica de Limpeza e Conversão de Tipos
 # -----------------------------------------------------------
@@ -62,13 +86,7 @@ def clean_and_convert(df: pd.DataFrame) -> pd.DataFrame:
             
     # Conversão para datas
     if COL_DATA in df_clean.columns:
-        # Reintroduzindo dayfirst=True para tratar corretamente o formato DD/MM/YYYY
-        # e resolver o descarte da linha no teste de consolidação.
-        df_clean[COL_DATA] = pd.to_datetime(
-            df_clean[COL_DATA], 
-            errors="coerce",
-            dayfirst=True 
-        )
+        df_clean[COL_DATA] = _parse_dates(df_clean[COL_DATA])
 
     # Remove linhas que não contenham valores válidos nas colunas-chave
     # (data ou faturamento) - crucial para a integridade dos dados financeiros.
@@ -96,10 +114,14 @@ def consolidate(dfs: List[pd.DataFrame]) -> pd.DataFrame:
     dfs_normalized = [normalize_columns(df) for df in dfs]
 
     # 2. Concatenação Inicial (combina todos os inputs)
-    df = pd.concat(dfs_normalized, ignore_index=True)
+    with stage("concat", rows_in=sum(len(df) for df in dfs_normalized)) as s:
+        df = pd.concat(dfs_normalized, ignore_index=True)
+        s.rows_out = len(df)
 
     # 3. Limpeza e Conversão de Tipos (Lógica de Negócio)
-    df_final = clean_and_convert(df) 
+    with stage("clean_and_convert", rows_in=len(df)) as s:
+        df_final = clean_and_convert(df)
+        s.rows_out = len(df_final)
     
     logger.info(f"Consolidação concluída: {len(df_final)} linhas finais.")
     return df_final
@@ -132,6 +154,18 @@ def calculate_metrics(df: pd.DataFrame) -> dict:
     # Garante que as somas sejam feitas apenas se as colunas existirem
     faturamento_total = df[COL_FATURAMENTO].sum() if COL_FATURAMENTO in df.columns else 0
     custos_totais = df[COL_CUSTOS].sum() if COL_CUSTOS in df.columns else 0
+
+    metrics = metrics_from_totals(faturamento_total, custos_totais)
+
+    logger.info(f"Métricas calculadas: {metrics}")
+    return metrics
+
+
+def metrics_from_totals(faturamento_total: float, custos_totais: float) -> dict:
+    """
+    Monta o dicionário de métricas a partir dos totais já somados
+    (compartilhado entre o caminho pandas e as agregações em SQL).
+    """
     lucro_total = faturamento_total - custos_totais
 
     lucro_percentual = (
@@ -145,8 +179,6 @@ def calculate_metrics(df: pd.DataFrame) -> dict:
         "lucro_total": round(float(lucro_total), 2),
         "lucro_percentual": round(float(lucro_percentual), 2),
     }
-
-    logger.info(f"Métricas calculadas: {metrics}")
     return metrics
 
 
@@ -180,25 +212,68 @@ def prepare_chart_data(df: pd.DataFrame) -> pd.DataFrame:
 # -----------------------------------------------------------
 # 5) Função completa de processamento (Pipeline)
 # -----------------------------------------------------------
-def process_pipeline(dfs: List[pd.DataFrame]):
+def process_pipeline(dfs: List[pd.DataFrame], convert=None, validate=None, sketches=None):
     """
     Executa todo o processamento de ponta a ponta:
     1. Consolida os DataFrames (incluindo normalização e limpeza)
+    1.5 Converte os valores para a moeda base (opcional, `convert`)
+    1.6 Aplica as regras de negócio (opcional, `validate`)
     2. Calcula o lucro por linha
-    3. Calcula métricas agregadas
+    3. Calcula métricas agregadas (e alimenta `sketches`, se informado)
     4. Prepara dados para gráfico
 
     Retorna:
       df_final, metrics, chart_data
     """
     # 1. Consolidação e Limpeza
-    df_final = consolidate(dfs)
-    
+    with stage("consolidate", rows_in=sum(len(df) for df in dfs)) as s:
+        df_final = consolidate(dfs)
+        s.rows_out = len(df_final)
+
+    return process_consolidated(df_final, convert, validate, sketches)
+
+
+def process_consolidated(df_final: pd.DataFrame, convert=None, validate=None, sketches=None):
+    """
+    Etapas 1.5-4 do pipeline sobre um DataFrame já consolidado e limpo
+    (ex.: lotes consolidados separadamente e concatenados).
+
+    - convert: função DataFrame → DataFrame aplicada antes do lucro, ex.:
+      functools.partial(currency.convert_currency, rates=load_rates(...)).
+    - validate: função DataFrame → DataFrame com as regras de negócio, ex.:
+      functools.partial(rules.apply_rules, ruleset=RuleSet.from_config(...)).
+      Roda antes do lucro para comparar a coluna 'lucro' de origem.
+    - sketches: sketches.MetricSketches alimentado em blocos na etapa de
+      métricas (quantis do ticket e top-N aproximados, mescláveis).
+
+    Retorna:
+      df_final, metrics, chart_data
+    """
+    # 1.5 Conversão de moeda (valores de filiais em USD, EUR...)
+    if convert is not None:
+        with stage("convert_currency", rows_in=len(df_final)) as s:
+            df_final = convert(df_final)
+            s.rows_out = len(df_final)
+
+    # 1.6 Regras de negócio (máscaras vetorizadas em uma passada)
+    if validate is not None:
+        with stage("validate_rules", rows_in=len(df_final)) as s:
+            df_final = validate(df_final)
+            s.rows_out = len(df_final)
+
     # 2. Lógica de Negócio por Linha
-    df_processed = calculate_profit(df_final)
+    with stage("calculate_profit", rows_in=len(df_final)) as s:
+        df_processed = calculate_profit(df_final)
+        s.rows_out = len(df_processed)
 
     # 3. Agregações e Cálculos
-    metrics = calculate_metrics(df_processed)
-    chart_data = prepare_chart_data(df_processed)
+    with stage("calculate_metrics", rows_in=len(df_processed)):
+        metrics = calculate_metrics(df_processed)
+        if sketches is not None:
+            sketches.feed(df_processed)
+
+    with stage("prepare_chart_data", rows_in=len(df_processed)) as s:
+        chart_data = prepare_chart_data(df_processed)
+        s.rows_out = len(chart_data)
 
     return df_processed, metrics, chart_data
\ No newline at end of file
@@ -1,39 +1,247 @@
-import matplotlib.pyplot as plt
+import io
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from contextlib import ExitStack
 from pathlib import Path
+
+import numpy as np
+
+# API orientada a objetos do Matplotlib com o canvas Agg explícito:
+# não depende do backend escolhido na importação nem do estado global do pyplot,
+# o que permite renderizar gráficos em paralelo (threads ou processos).
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
 from src.logger import get_logger
+from src.storage import get_storage, is_file_like
 
 # Instancia o logger para manter o padrão dos logs
 logger = get_logger()
 
-def generate_plot(df, output_path: str):
+FORMATOS_SUPORTADOS = ("png", "svg")
+
+# Limite padrão de pontos desenhados por série e limite para exibir marcadores
+MAX_PONTOS_PADRAO = 1000
+LIMITE_MARCADORES = 100
+
+
+# -----------------------------------------------------------
+# Redução de pontos (downsampling) preservando picos e vales
+# -----------------------------------------------------------
+def downsample_chart_data(df, max_points: int = MAX_PONTOS_PADRAO,
+                          columns=("faturamento", "custos")):
     """
-    Gera um gráfico de linha usando Matplotlib (faturamento x custos)
-    e salva como imagem PNG.
+    Reduz o número de linhas do DataFrame do gráfico para no máximo `max_points`
+    usando min/max bucketing:
+
+    - As linhas (ordenadas por data) são divididas em buckets contíguos.
+    - Em cada bucket são mantidas as linhas do mínimo e do máximo de cada coluna
+      em `columns`, além da primeira e da última linha da série.
+
+    Assim picos e vales de faturamento e custos são sempre preservados.
+    Todo o cálculo é vetorizado com NumPy (reduceat), sem laço por linha.
+    """
+    n = len(df)
+    if not max_points or n <= max_points:
+        return df
+
+    if not df["data"].is_monotonic_increasing:
+        df = df.sort_values("data")
+
+    # Cada bucket contribui com até 2 pontos (mín. e máx.) por coluna
+    pontos_por_bucket = 2 * len(columns)
+    n_buckets = max(1, (max_points - 2) // pontos_por_bucket)
+
+    bucket = (np.arange(n) * n_buckets) // n
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+
+    keep = [np.array([0, n - 1])]
+    for col in columns:
+        y = df[col].to_numpy(dtype=float)
+        for reduce_fn in (np.minimum, np.maximum):
+            extremos = reduce_fn.reduceat(y, starts)
+            # Primeira posição de cada bucket cujo valor é o extremo do bucket
+            hits = np.flatnonzero(y == extremos[bucket])
+            _, first = np.unique(bucket[hits], return_index=True)
+            keep.append(hits[first])
+
+    idx = np.unique(np.concatenate(keep))
+    return df.iloc[idx]
+
+
+
+class ChartRenderer:
+    """
+    Renderizador headless de gráficos (faturamento x custos).
+
+    Cada renderização cria sua própria `Figure` ligada a um `FigureCanvasAgg`,
+    sem tocar no estado global do pyplot. O objeto só guarda configurações
+    simples, portanto pode ser compartilhado entre threads ou enviado para
+    processos de um pool.
+    """
+
+    def __init__(self, figsize=(10, 5), dpi: int = 100, title: str = "Faturamento x Custos",
+                 max_points: int = MAX_PONTOS_PADRAO):
+        self.figsize = figsize
+        self.dpi = dpi
+        self.title = title
+        self.max_points = max_points
+
+    def build_figure(self, df) -> Figure:
+        """Monta a Figure do gráfico de linha a partir do DataFrame do gráfico."""
+        fig = Figure(figsize=self.figsize, dpi=self.dpi)
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot(1, 1, 1)
+
+        # Séries longas são reduzidas antes de desenhar (picos e vales preservados)
+        df = downsample_chart_data(df, self.max_points)
+        marker = "o" if len(df) <= LIMITE_MARCADORES else None
+
+        # Plota as linhas
+        ax.plot(df["data"], df["faturamento"], marker=marker, label="Faturamento")
+        ax.plot(df["data"], df["custos"], marker=marker, label="Custos")
+
+        # Ajustes visuais
+        ax.set_title(self.title)
+        ax.set_xlabel("Data")
+        ax.set_ylabel("Valores (R$)")
+        ax.grid(True, linestyle="--", alpha=0.4)
+        ax.legend()
+
+        # Rotacionar datas
+        ax.tick_params(axis="x", labelrotation=45)
+
+        fig.tight_layout()
+        return fig
+
+    def render(self, df, fmt: str = "png") -> bytes:
+        """Renderiza o gráfico em memória e retorna os bytes (PNG ou SVG)."""
+        if fmt not in FORMATOS_SUPORTADOS:
+            raise ValueError(f"Formato de gráfico não suportado: {fmt}. Use um de {FORMATOS_SUPORTADOS}.")
+
+        fig = self.build_figure(df)
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format=fmt)
+        return buffer.getvalue()
+
+    def save(self, df, output_path, fmt: str = None, storage=None):
+        """
+        Renderiza o gráfico e grava no caminho informado (via `storage`,
+        padrão: disco local) ou em um arquivo binário já aberto.
+        O formato é inferido pela extensão quando não informado.
+        """
+        if is_file_like(output_path):
+            output_path.write(self.render(df, fmt=fmt or "png"))
+            return output_path
+
+        out = Path(output_path)
+        fmt = fmt or (out.suffix.lstrip(".").lower() or "png")
+        get_storage(storage).write_bytes(str(out), self.render(df, fmt=fmt))
+        return out
+
+
+class ForecastChartRenderer(ChartRenderer):
+    """
+    Gráfico mensal de histórico + projeção (forecast.ForecastResult.chart_frame):
+    linhas cheias no histórico e tracejadas nos meses projetados.
     """
-    out = Path(output_path)
-    out.parent.mkdir(parents=True, exist_ok=True)
 
-    # Criar figura
-    plt.figure(figsize=(10, 5))
+    def __init__(self, figsize=(10, 5), dpi: int = 100, title: str = "Projeção Mensal",
+                 columns=("faturamento", "lucro")):
+        super().__init__(figsize=figsize, dpi=dpi, title=title)
+        self.columns = columns
+
+    def build_figure(self, df) -> Figure:
+        fig = Figure(figsize=self.figsize, dpi=self.dpi)
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot(1, 1, 1)
+
+        history = df[~df["previsto"]]
+        # A projeção parte do último mês observado para a linha ficar contínua
+        future = df.iloc[max(len(history) - 1, 0):]
+        for col in self.columns:
+            if col not in df.columns:
+                continue
+            line, = ax.plot(history["mes"], history[col], marker="o", label=col.capitalize())
+            ax.plot(future["mes"], future[col], marker="o", linestyle="--",
+                    color=line.get_color(), label=f"{col.capitalize()} (projeção)")
 
-    # Plota as linhas
-    plt.plot(df["data"], df["faturamento"], marker="o", label="Faturamento")
-    plt.plot(df["data"], df["custos"], marker="o", label="Custos")
+        ax.set_title(self.title)
+        ax.set_xlabel("Mês")
+        ax.set_ylabel("Valores (R$)")
+        ax.grid(True, linestyle="--", alpha=0.4)
+        ax.legend()
+        ax.tick_params(axis="x", labelrotation=45)
 
-    # Ajustes visuais
-    plt.title("Faturamento x Custos")
-    plt.xlabel("Data")
-    plt.ylabel("Valores (R$)")
-    plt.grid(True, linestyle="--", alpha=0.4)
-    plt.legend()
+        fig.tight_layout()
+        return fig
 
-    # Rotacionar datas
-    plt.xticks(rotation=45)
 
-    # Salvar imagem
-    plt.tight_layout()
-    plt.savefig(out, format="png")
-    plt.close()
+def _render_worker(renderer: ChartRenderer, df, fmt: str) -> bytes:
+    # Função de módulo (picklável) usada pelo ProcessPoolExecutor
+    return renderer.render(df, fmt=fmt)
+
+
+def _render_shared_worker(renderer: ChartRenderer, handle, fmt: str) -> bytes:
+    # Recebe apenas a referência ao arquivo compartilhado e anexa sem desserializar
+    return renderer.render(handle.attach(), fmt=fmt)
+
+
+def render_charts(frames, fmt: str = "png", renderer: ChartRenderer = None,
+                  max_workers: int = None, use_processes: bool = False) -> list:
+    """
+    Renderiza vários gráficos em paralelo e retorna a lista de bytes,
+    na mesma ordem de `frames`.
+
+    - use_processes=False: ThreadPoolExecutor (menor overhead).
+    - use_processes=True: ProcessPoolExecutor (paralelismo real de CPU).
+      Com pyarrow instalado, cada DataFrame é publicado uma vez em arquivo
+      mapeado em memória (src.shared_frame) e os workers o anexam somente
+      leitura, em vez de receber uma cópia serializada.
+    """
+    renderer = renderer or ChartRenderer()
+    frames = list(frames)
+
+    if not use_processes:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(_render_worker, renderer, df, fmt) for df in frames]
+            return [future.result() for future in futures]
+
+    from src.shared_frame import shared_frame
+
+    # O ExitStack fecha depois do executor: os arquivos só são removidos após
+    # todos os workers terminarem (ou falharem)
+    with ExitStack() as stack, ProcessPoolExecutor(max_workers=max_workers) as executor:
+        try:
+            handles = [stack.enter_context(shared_frame(df)) for df in frames]
+        except ImportError:
+            # Sem pyarrow: cada worker recebe uma cópia serializada
+            handles = None
+
+        if handles is None:
+            futures = [executor.submit(_render_worker, renderer, df, fmt) for df in frames]
+        else:
+            futures = [executor.submit(_render_shared_worker, renderer, h, fmt) for h in handles]
+        return [future.result() for future in futures]
+
+
+def generate_plot(df, output_path, max_points: int = MAX_PONTOS_PADRAO, storage=None):
+    """
+    Gera um gráfico de linha usando Matplotlib (faturamento x custos)
+    e salva como imagem PNG (caminho via `storage` ou arquivo já aberto).
+
+    Séries com mais de `max_points` dias são reduzidas (downsampling)
+    antes de desenhar.
+    """
+    out = ChartRenderer(max_points=max_points).save(df, output_path, fmt="png", storage=storage)
 
     # CORREÇÃO: Usamos logger.info e removemos o emoji '✔' que quebrava no Windows
-    logger.info(f"Grafico salvo em: {out}")
\ No newline at end of file
+    logger.info(f"Grafico salvo em: {out}")
+
+
+def generate_forecast_plot(df, output_path, storage=None):
+    """
+    Gera o gráfico de projeção mensal (histórico + próximos meses) e salva
+    como PNG (caminho via `storage` ou arquivo já aberto).
+    """
+    out = ForecastChartRenderer().save(df, output_path, fmt="png", storage=storage)
+    logger.info(f"Grafico de projecao salvo em: {out}")
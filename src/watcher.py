@@ -0,0 +1,116 @@
+import os
+import time
+import zipfile
+from typing import Callable, Dict, Optional, Set, Tuple
+
+from src.logger import get_logger, lazy
+
+logger = get_logger()
+
+Signature = Tuple[int, int]  # (tamanho, mtime_ns)
+
+
+def _is_complete_workbook(path: str) -> bool:
+    """
+    Um .xlsx é um arquivo ZIP cujo diretório central fica no final do arquivo.
+    Enquanto a cópia/upload não termina, o ZIP é inválido; assim evitamos
+    ler planilhas pela metade.
+    """
+    try:
+        return zipfile.is_zipfile(path)
+    except OSError:
+        return False
+
+
+class RawFolderWatcher:
+    """
+    Observa uma pasta de planilhas por polling, com debounce.
+
+    Uma mudança só é entregue quando:
+    - o conjunto de arquivos (tamanho e mtime) ficou estável por `debounce`
+      segundos consecutivos, e
+    - todas as planilhas alteradas são ZIPs completos (não estão sendo escritas).
+
+    Arquivos extras (ex.: config.yaml) podem ser observados via `extra_files`.
+    """
+
+    def __init__(self, raw_path: str, debounce: float = 2.0, extra_files=(),
+                 clock: Callable[[], float] = time.monotonic):
+        self.raw_path = raw_path
+        self.debounce = debounce
+        self.extra_files = list(extra_files)
+        self._clock = clock
+        self._last_seen: Optional[Dict[str, Signature]] = None
+        self._last_change = clock()
+        self._delivered: Dict[str, Signature] = {}
+
+    def snapshot(self) -> Dict[str, Signature]:
+        """Retorna {caminho: (tamanho, mtime_ns)} das planilhas e arquivos extras."""
+        snap = {}
+        if os.path.isdir(self.raw_path):
+            with os.scandir(self.raw_path) as entries:
+                for entry in entries:
+                    # Ignora arquivos de trava do Excel (~$arquivo.xlsx)
+                    if entry.name.endswith(".xlsx") and not entry.name.startswith("~$") and entry.is_file():
+                        stat = entry.stat()
+                        snap[entry.path] = (stat.st_size, stat.st_mtime_ns)
+        for path in self.extra_files:
+            if os.path.exists(path):
+                stat = os.stat(path)
+                snap[path] = (stat.st_size, stat.st_mtime_ns)
+        return snap
+
+    def poll(self) -> Optional[Set[str]]:
+        """
+        Verifica a pasta uma vez. Retorna o conjunto de caminhos alterados
+        (criados, modificados ou removidos) quando há uma mudança estável e
+        completa; caso contrário, retorna None.
+        """
+        snap = self.snapshot()
+        now = self._clock()
+
+        if snap != self._last_seen:
+            # Algo mudou desde o último poll: reinicia a janela de debounce
+            self._last_seen = snap
+            self._last_change = now
+            return None
+
+        if snap == self._delivered or now - self._last_change < self.debounce:
+            return None
+
+        changed = {
+            path for path in set(snap) | set(self._delivered)
+            if snap.get(path) != self._delivered.get(path)
+        }
+        incomplete = [
+            path for path in changed
+            if path in snap and path.endswith(".xlsx") and not _is_complete_workbook(path)
+        ]
+        if incomplete:
+            logger.info("Aguardando conclusão da escrita: %s", lazy(", ".join, sorted(incomplete)))
+            return None
+
+        self._delivered = snap
+        return changed
+
+
+def watch(on_change: Callable[[Set[str]], None], watcher: RawFolderWatcher,
+          interval: float = 1.0, max_cycles: int = None, sleep: Callable[[float], None] = time.sleep):
+    """
+    Laço de observação: chama `on_change(alterados)` a cada mudança estável.
+    Erros em `on_change` são registrados e não encerram o laço.
+    `max_cycles` limita o número de polls (útil em testes).
+    """
+    cycles = 0
+    logger.info(f"Modo watch ativo em '{watcher.raw_path}' (intervalo {interval}s, debounce {watcher.debounce}s).")
+
+    while max_cycles is None or cycles < max_cycles:
+        cycles += 1
+        changed = watcher.poll()
+        if changed:
+            logger.info(f"Mudanças detectadas: {', '.join(sorted(os.path.basename(p) for p in changed))}")
+            try:
+                on_change(changed)
+            except Exception as e:
+                logger.error(f"Falha ao processar mudanças no modo watch: {e}")
+        sleep(interval)
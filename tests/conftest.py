@@ -1,5 +1,16 @@
 import sys
 from pathlib import Path
 
+import pytest
+
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture(autouse=True, scope="session")
+def log_temporario(tmp_path_factory):
+    """Os registros dos testes vão para um log temporário, não para data/reports/logs.txt."""
+    from src.logger import set_log_file
+
+    set_log_file(str(tmp_path_factory.mktemp("logs") / "logs.txt"))
+    yield
@@ -0,0 +1,120 @@
+import io
+
+import numpy as np
+import pandas as pd
+from src.anomalies import (
+    COL_DIMENSAO, COL_SERIE, COL_Z, SERIE_TOTAL, anomaly_records, detect_anomalies, rolling_robust_z,
+)
+from src.transformer import COL_DATA, COL_FATURAMENTO
+
+JANELA = 14
+
+
+def _vendas(dias: int = 120, filiais: int = 30) -> pd.DataFrame:
+    rng = np.random.default_rng(4)
+    datas = pd.date_range("2025-01-01", periods=dias, freq="D")
+    df = pd.DataFrame({
+        COL_DATA: np.repeat(datas, filiais),
+        "filial": np.tile([f"f{i:02d}" for i in range(filiais)], dias),
+        COL_FATURAMENTO: rng.normal(1000, 30, dias * filiais),
+    })
+    # Arquivo ruim: a filial f07 enviou valores 10× maiores em um dia
+    # e a f12 ficou sem vendas (arquivo vazio) em outro
+    df.loc[(df[COL_DATA] == datas[100]) & (df["filial"] == "f07"), COL_FATURAMENTO] *= 10
+    df = df[~((df[COL_DATA] == datas[110]) & (df["filial"] == "f12"))]
+    return df.reset_index(drop=True)
+
+
+def _chart(df: pd.DataFrame) -> pd.DataFrame:
+    return df.groupby(COL_DATA, as_index=False)[[COL_FATURAMENTO]].sum()
+
+
+# -----------------------------------------------------------
+# I. z-score robusto vetorizado
+# -----------------------------------------------------------
+def test_rolling_robust_z_igual_ao_calculo_por_serie():
+    """
+    Testa se a matriz inteira (todas as séries de uma vez) dá o mesmo
+    resultado que o rolling do pandas série a série sobre os dias anteriores.
+    """
+    valores = np.random.default_rng(1).gamma(3.0, 100.0, (80, 12))
+    z, mediana = rolling_robust_z(valores, JANELA)
+
+    for j in range(valores.shape[1]):
+        serie = pd.Series(valores[:, j])
+        med = serie.rolling(JANELA).median().shift(1)
+        mad = serie.rolling(JANELA).apply(lambda w: np.median(np.abs(w - np.median(w))), raw=True).shift(1)
+        np.testing.assert_allclose(mediana[:, j], med, equal_nan=True)
+        np.testing.assert_allclose(z[:, j], (serie - med) / (1.4826 * mad), equal_nan=True)
+
+
+def test_rolling_robust_z_mad_zero_e_series_esparsas():
+    """
+    Testa o desvio médio quando a MAD é zero, a janela constante (z = 0 ou
+    ±inf) e a exigência de dias com movimento na janela (`min_active`).
+    """
+    valores = np.zeros((20, 3))
+    valores[:, 1] = 5.0
+    valores[::4, 1] = 9.0       # MAD zero, desvio médio > 0
+    valores[15, 2] = 1.0        # janela constante com salto
+
+    z, _ = rolling_robust_z(valores, 8, min_active=0)
+
+    assert np.isnan(z[:8]).all()
+    assert (z[8:, 0] == 0).all()
+    assert np.isfinite(z[8:, 1]).all() and z[12, 1] > 0
+    assert z[15, 2] == np.inf
+
+    # Séries sem movimento na maior parte da janela não são pontuadas
+    z, _ = rolling_robust_z(valores, 8)
+    assert np.isnan(z[:, [0, 2]]).all() and np.isfinite(z[8:, 1]).all()
+
+
+# -----------------------------------------------------------
+# II. Etapa de detecção e seção do relatório
+# -----------------------------------------------------------
+def test_detect_anomalies_por_filial_e_total():
+    """
+    Testa se o dia com valores 10× e o dia sem vendas são sinalizados na
+    série da filial (e o 10× também no total), do mais recente ao mais
+    antigo, e se o horizonte (lookback) restringe os dias pontuados.
+    """
+    df = _vendas()
+    datas = pd.date_range("2025-01-01", periods=120, freq="D")
+    result = detect_anomalies(df, _chart(df), ["filial", "regiao"], threshold=10)
+
+    sinalizados = set(zip(result[COL_DATA], result[COL_DIMENSAO], result[COL_SERIE]))
+    assert sinalizados == {
+        (datas[110], "filial", "f12"),
+        (datas[100], "filial", "f07"),
+        (datas[100], SERIE_TOTAL, SERIE_TOTAL),
+    }
+    assert result[COL_DATA].is_monotonic_decreasing
+    assert result.loc[result[COL_SERIE] == "f12", COL_Z].item() < 0
+
+    recentes = detect_anomalies(df, _chart(df), ["filial"], threshold=10, lookback=15)
+    assert recentes[COL_SERIE].tolist() == ["f12"]
+    assert detect_anomalies(df.iloc[:0], _chart(df.iloc[:0]), ["filial"]).empty
+
+
+def test_secao_de_anomalias_no_excel_e_pdf():
+    """Testa a planilha "Anomalias" do Excel e a tabela do PDF."""
+    from openpyxl import load_workbook
+    from src.excel_generator import generate_excel_report
+    from src.pdf_generator import PdfReportTemplate
+
+    df = _vendas()
+    result = detect_anomalies(df, _chart(df), ["filial"], threshold=10)
+    registros = anomaly_records(result, limit=2)
+    assert [r[COL_SERIE] for r in registros] == ["f12", "f07"]
+    assert registros[0][COL_DATA] == "21/04/2025"
+
+    excel = io.BytesIO()
+    generate_excel_report(df.head(10), "reports", "R$ #,##0.00", "dd/mm/yyyy", anomalies=result, output=excel)
+    planilha = load_workbook(excel)["Anomalias"]
+    assert planilha.max_row == len(result) + 1
+    assert planilha["B1"].value == COL_DIMENSAO
+
+    metrics = {"faturamento_total": 1.0, "custos_totais": 0.0, "lucro_total": 1.0, "lucro_percentual": 100.0}
+    pdf = PdfReportTemplate().render_to_bytes(metrics, anomalies=registros)
+    assert pdf.startswith(b"%PDF")
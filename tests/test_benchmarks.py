@@ -0,0 +1,86 @@
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+from benchmarks.synthetic import generate_synthetic_frame, write_synthetic_workbooks
+from benchmarks.run_benchmarks import compare_to_baseline, run_suite
+from src.reader import load_excel_files
+
+
+# -----------------------------------------------------------
+# I. Gerador sintético determinístico
+# -----------------------------------------------------------
+def test_generate_synthetic_frame_deterministico_e_parametrizavel():
+    """
+    Testa se o gerador é determinístico pelo seed e se respeita a fração
+    de valores sujos e a mistura de formatos de data.
+    """
+    df_a = generate_synthetic_frame(2_000, seed=7, dirty_share=0.2)
+    df_b = generate_synthetic_frame(2_000, seed=7, dirty_share=0.2)
+    assert_frame_equal(df_a, df_b)
+    assert not df_a.equals(generate_synthetic_frame(2_000, seed=8, dirty_share=0.2))
+
+    sujos = df_a["faturamento"].map(lambda v: isinstance(v, str)).mean()
+    assert sujos == pytest.approx(0.2, abs=0.05)
+
+    somente_br = generate_synthetic_frame(100, seed=1, dirty_share=0.0, date_formats={"br": 1.0})
+    assert somente_br["data"].str.match(r"^\d{2}/\d{2}/\d{4}$").all()
+    assert somente_br["faturamento"].map(lambda v: isinstance(v, float)).all()
+
+
+def test_write_synthetic_workbooks_le_pelo_reader(tmp_path):
+    """Testa se as planilhas sintéticas são lidas pelo reader com o total de linhas."""
+    paths = write_synthetic_workbooks(str(tmp_path), rows=300, files=3, seed=3)
+    files = load_excel_files(str(tmp_path))
+
+    assert len(paths) == 3
+    assert sum(len(df) for df in files.values()) == 300
+
+
+# -----------------------------------------------------------
+# II. Comparação com baseline
+# -----------------------------------------------------------
+def test_compare_to_baseline_sinaliza_regressoes():
+    baseline = {"transformer.clean_and_convert@1000": 0.10, "generator.pdf@1000": 0.05}
+    results = {
+        "transformer.clean_and_convert@1000": 0.50,  # 5x mais lento
+        "generator.pdf@1000": 0.055,                 # dentro do limite
+        "generator.chart@1000": 0.20,                # sem baseline
+    }
+
+    regressions = compare_to_baseline(results, baseline, threshold=0.25)
+
+    assert [r[0] for r in regressions] == ["transformer.clean_and_convert@1000"]
+    assert regressions[0][3] == pytest.approx(5.0)
+
+
+def test_run_suite_cobre_reader_transformer_e_geradores():
+    """Smoke test: a suíte roda em tamanho mínimo e cobre todos os casos."""
+    results = run_suite(sizes=[200], files=2, repeat=1)
+
+    prefixos = {case.split("@")[0].split(".")[0] for case in results}
+    assert prefixos == {"reader", "transformer", "generator"}
+    assert all(seconds >= 0 for seconds in results.values())
+
+
+def test_run_currency_benchmark_smoke():
+    """Smoke test: o benchmark de conversão de moeda roda em tamanho mínimo."""
+    from benchmarks.run_benchmarks import run_currency_benchmark
+
+    results = run_currency_benchmark(rows=1_000, repeat=1)
+    assert list(results) == ["transformer.convert_currency@1000"]
+
+
+def test_run_anomaly_benchmark_smoke():
+    """Smoke test: o benchmark de detecção de anomalias roda em tamanho mínimo."""
+    from benchmarks.run_benchmarks import run_anomaly_benchmark
+
+    results = run_anomaly_benchmark(series=20, days=60, repeat=1)
+    assert list(results) == ["anomalies.detect_anomalies@20"]
+
+
+def test_run_forecast_benchmark_smoke():
+    """Smoke test: o benchmark do ajuste da projeção roda em tamanho mínimo."""
+    from benchmarks.run_benchmarks import run_forecast_benchmark
+
+    results = run_forecast_benchmark(series=10, months=24, repeat=1)
+    assert list(results) == ["forecast.fit_batched@10"]
@@ -0,0 +1,64 @@
+import pandas as pd
+import pytest
+import os
+from src.cache import ArtifactCache, hash_inputs
+from src.transformer import COL_DATA, COL_FATURAMENTO, COL_CUSTOS
+
+
+# -----------------------------------------------------------
+# I. Hash de entradas
+# -----------------------------------------------------------
+def test_hash_inputs_estavel_e_sensivel_a_mudancas():
+    """
+    Testa se o hash é estável para entradas idênticas e muda quando
+    os dados ou a configuração mudam.
+    """
+    df = pd.DataFrame({
+        COL_DATA: pd.to_datetime(["2024-01-01", "2024-01-02"]),
+        COL_FATURAMENTO: [100.0, 200.0],
+        COL_CUSTOS: [50.0, 80.0],
+    })
+    config = {"currency_format": "R$ #,##0.00"}
+
+    assert hash_inputs(df, config) == hash_inputs(df.copy(), dict(config))
+
+    df_alterado = df.copy()
+    df_alterado.loc[1, COL_FATURAMENTO] = 201.0
+    assert hash_inputs(df_alterado, config) != hash_inputs(df, config)
+    assert hash_inputs(df, {"currency_format": "US$ #,##0.00"}) != hash_inputs(df, config)
+
+
+# -----------------------------------------------------------
+# II. Reutilização e restauração de artefatos
+# -----------------------------------------------------------
+def test_artifact_cache_reutiliza_e_restaura_saida(tmp_path):
+    """
+    Testa se o ArtifactCache:
+    1. Gera o artefato na primeira execução.
+    2. Ignora a geração quando a chave não mudou.
+    3. Restaura a saída a partir do cache se o arquivo for removido.
+    4. Regenera quando a chave muda.
+    """
+    output = tmp_path / "reports" / "grafico.png"
+    chamadas = []
+
+    def gerar():
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_bytes(b"conteudo-" + str(len(chamadas)).encode())
+        chamadas.append(1)
+
+    cache = ArtifactCache(str(tmp_path / "cache"))
+
+    assert cache.run("chart", "chave-1", str(output), gerar) is False
+    assert cache.run("chart", "chave-1", str(output), gerar) is True
+    assert len(chamadas) == 1
+
+    # Nova instância (nova execução do pipeline) lê o manifest persistido
+    os.remove(output)
+    cache = ArtifactCache(str(tmp_path / "cache"))
+    assert cache.run("chart", "chave-1", str(output), gerar) is True
+    assert output.read_bytes() == b"conteudo-0"
+    assert cache.skipped == ["chart"]
+
+    assert cache.run("chart", "chave-2", str(output), gerar) is False
+    assert len(chamadas) == 2
@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.currency import COL_TAXA, RateTable, convert_currency, load_rates
+from src.transformer import COL_DATA, COL_FATURAMENTO, COL_CUSTOS, COL_LUCRO, process_pipeline
+
+
+def _cotacoes() -> pd.DataFrame:
+    # Cotações com lacunas (fins de semana/feriados) e fora de ordem
+    rng = np.random.default_rng(5)
+    dias = pd.date_range("2024-01-01", "2024-03-31", freq="D")
+    dias = dias[rng.random(len(dias)) > 0.3]
+    df = pd.DataFrame({
+        "data": np.tile(dias, 2),
+        "moeda": np.repeat(["usd", " EUR "], len(dias)),
+        "taxa": rng.uniform(4.5, 6.5, 2 * len(dias)).round(4),
+    })
+    return df.sample(frac=1, random_state=1).reset_index(drop=True)
+
+
+def _dados(rows: int = 3000) -> pd.DataFrame:
+    rng = np.random.default_rng(11)
+    return pd.DataFrame({
+        COL_DATA: pd.Timestamp("2024-01-10") + pd.to_timedelta(rng.integers(0, 80, rows), unit="D"),
+        COL_FATURAMENTO: rng.integers(0, 500_000, rows) / 100,
+        COL_CUSTOS: rng.integers(0, 300_000, rows) / 100,
+        "moeda": rng.choice(["BRL", "USD", "usd", "EUR", None], rows),
+    })
+
+
+# -----------------------------------------------------------
+# I. Junção as-of equivalente ao merge_asof
+# -----------------------------------------------------------
+def test_conversao_igual_ao_merge_asof():
+    """
+    Testa se cada linha usa a cotação da sua data ou a anterior mais
+    recente (mesmo resultado de pd.merge_asof por moeda), sem reordenar as
+    linhas; BRL e moeda vazia ficam com taxa 1.
+    """
+    df = _dados()
+    cotacoes = _cotacoes()
+    convertido = convert_currency(df, RateTable.from_frame(cotacoes))
+
+    esquerda = df.assign(
+        ordem=np.arange(len(df)),
+        moeda_norm=df["moeda"].fillna("BRL").str.upper(),
+        **{COL_DATA: df[COL_DATA].astype("datetime64[ns]")},
+    ).sort_values(COL_DATA)
+    direita = cotacoes.assign(
+        moeda_norm=cotacoes["moeda"].str.strip().str.upper(),
+        data=pd.to_datetime(cotacoes["data"]).astype("datetime64[ns]"),
+    ).sort_values("data")
+    esperado = pd.merge_asof(
+        esquerda, direita[["data", "moeda_norm", "taxa"]], left_on=COL_DATA, right_on="data",
+        by="moeda_norm", direction="backward",
+    ).sort_values("ordem")
+    taxa = esperado["taxa"].where(esperado["moeda_norm"] != "BRL", 1.0).to_numpy()
+
+    np.testing.assert_allclose(convertido[COL_TAXA], taxa)
+    np.testing.assert_allclose(convertido[COL_FATURAMENTO], df[COL_FATURAMENTO] * taxa)
+    np.testing.assert_allclose(convertido[COL_CUSTOS], df[COL_CUSTOS] * taxa)
+    assert (convertido["moeda"] == "BRL").all()
+    assert convertido[COL_DATA].equals(df[COL_DATA])
+
+
+def test_linha_sem_cotacao_gera_erro():
+    """Testa se datas anteriores à primeira cotação ou moedas desconhecidas geram ValueError."""
+    rates = RateTable.from_frame(_cotacoes())
+    anterior = pd.DataFrame({COL_DATA: pd.to_datetime(["2023-12-01"]), COL_FATURAMENTO: [1.0], "moeda": ["USD"]})
+    desconhecida = pd.DataFrame({COL_DATA: pd.to_datetime(["2024-02-01"]), COL_FATURAMENTO: [1.0], "moeda": ["JPY"]})
+
+    for df in (anterior, desconhecida):
+        with pytest.raises(ValueError, match="sem cotação"):
+            convert_currency(df, rates)
+
+
+def test_moeda_em_branco_fica_na_base():
+    """Testa se células de moeda vazias ou só com espaços são tratadas como moeda base."""
+    rates = RateTable.from_frame(_cotacoes())
+    df = pd.DataFrame({
+        COL_DATA: pd.to_datetime(["2024-02-01"] * 4),
+        COL_FATURAMENTO: [10.0, 20.0, 30.0, 40.0],
+        "moeda": ["", "   ", None, "BRL"],
+    })
+
+    convertido = convert_currency(df, rates)
+
+    assert (convertido[COL_TAXA] == 1.0).all()
+    assert convertido[COL_FATURAMENTO].tolist() == [10.0, 20.0, 30.0, 40.0]
+
+
+# -----------------------------------------------------------
+# II. Cache das cotações e etapa no transformer
+# -----------------------------------------------------------
+def test_load_rates_reaproveita_cache_entre_execucoes(tmp_path, monkeypatch):
+    """
+    Testa se a tabela convertida é gravada em .npz e reaproveitada em uma
+    nova execução (sem reler o arquivo), e invalidada quando ele muda.
+    """
+    import src.currency as currency
+
+    path = tmp_path / "cotacoes.csv"
+    _cotacoes().to_csv(path, index=False)
+    cache_dir = tmp_path / "cache"
+
+    primeira = load_rates(str(path), cache_dir=str(cache_dir))
+    assert len(list(cache_dir.glob("cotacoes_*.npz"))) == 1
+
+    # Nova execução: memória do processo vazia e leitura do arquivo proibida
+    monkeypatch.setattr(currency, "_memoria", {})
+    monkeypatch.setattr(currency, "_read_rates_file", lambda *args: pytest.fail("cache ignorado"))
+    segunda = load_rates(str(path), cache_dir=str(cache_dir))
+    assert segunda.currencies == primeira.currencies == ["EUR", "USD"]
+    np.testing.assert_array_equal(segunda.rates, primeira.rates)
+
+    monkeypatch.undo()
+    pd.DataFrame({"data": ["2024-01-01"], "moeda": ["USD"], "taxa": [5.0]}).to_csv(path, index=False)
+    assert load_rates(str(path), cache_dir=str(cache_dir)).currencies == ["USD"]
+
+
+def test_process_pipeline_converte_antes_do_lucro():
+    """Testa se a etapa de conversão roda antes do lucro e das agregações."""
+    from functools import partial
+
+    rates = RateTable.from_frame(pd.DataFrame({"data": ["2024-01-01"], "moeda": ["USD"], "taxa": [5.0]}))
+    raw = pd.DataFrame({
+        "Data": ["2024-01-02", "2024-01-02"],
+        "Faturamento": ["100", "50"],
+        "Custos": ["40", "10"],
+        "Moeda": ["USD", "BRL"],
+    })
+
+    df_final, metrics, chart_data = process_pipeline([raw], partial(convert_currency, rates=rates))
+
+    assert df_final[COL_LUCRO].tolist() == [300.0, 40.0]
+    assert metrics["faturamento_total"] == 550.0
+    assert chart_data[COL_FATURAMENTO].tolist() == [550.0]
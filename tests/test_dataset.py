@@ -0,0 +1,90 @@
+import os
+import pandas as pd
+import pytest
+from src.dataset import (
+    ARQUIVO_PARTICAO, load_dataset_stats, read_partitioned_dataset,
+    select_partitions, write_partitioned_dataset,
+)
+from src.transformer import COL_DATA, COL_FATURAMENTO, COL_CUSTOS
+
+pytest.importorskip("pyarrow")
+
+
+def _dados(datas, base: float = 100.0) -> pd.DataFrame:
+    return pd.DataFrame({
+        COL_DATA: pd.to_datetime(datas),
+        COL_FATURAMENTO: [base + i for i in range(len(datas))],
+        COL_CUSTOS: [10.0 + i for i in range(len(datas))],
+    })
+
+
+# -----------------------------------------------------------
+# I. Escrita particionada, estatísticas e leitura com poda
+# -----------------------------------------------------------
+def test_dataset_particionado_com_poda_por_data(tmp_path):
+    """
+    Testa se o dataset é particionado por ano/mês, se as estatísticas
+    min/max permitem pular partições fora do filtro e se a leitura filtrada
+    devolve as mesmas linhas que o filtro em pandas.
+    """
+    root = str(tmp_path / "dataset")
+    df = _dados(["2024-01-05", "2024-01-20", "2024-02-10", "2024-03-01", "2024-03-31"])
+
+    resumo = write_partitioned_dataset(df, root)
+    stats = load_dataset_stats(root)
+
+    assert sorted(resumo["written"]) == ["year=2024/month=01", "year=2024/month=02", "year=2024/month=03"]
+    assert stats["year=2024/month=01"]["rows"] == 2
+    assert stats["year=2024/month=03"]["columns"][COL_FATURAMENTO] == {"min": 103.0, "max": 104.0}
+    assert select_partitions(stats, "2024-02-01", "2024-02-29") == ["year=2024/month=02"]
+
+    lido = read_partitioned_dataset(root, start="2024-01-10", end="2024-03-01")
+    esperado = df[(df[COL_DATA] >= "2024-01-10") & (df[COL_DATA] <= "2024-03-01")].reset_index(drop=True)
+    pd.testing.assert_frame_equal(lido, esperado, check_dtype=False)
+
+    apenas_custos = read_partitioned_dataset(root, columns=[COL_CUSTOS])
+    assert list(apenas_custos.columns) == [COL_CUSTOS]
+    assert len(apenas_custos) == len(df)
+
+
+# -----------------------------------------------------------
+# II. Regravação incremental e modo append
+# -----------------------------------------------------------
+def test_dataset_regrava_apenas_particoes_alteradas(tmp_path):
+    """
+    Testa se uma nova gravação só regrava partições com conteúdo alterado,
+    remove partições que sumiram e se append acrescenta linhas à partição.
+    """
+    root = str(tmp_path / "dataset")
+    write_partitioned_dataset(_dados(["2024-01-05", "2024-02-10", "2024-03-01"]), root)
+    janeiro = os.path.join(root, "year=2024", "month=01", ARQUIVO_PARTICAO)
+    mtime = os.stat(janeiro).st_mtime_ns
+
+    resumo = write_partitioned_dataset(_dados(["2024-01-05", "2024-02-10"]), root)
+    assert resumo["unchanged"] == ["year=2024/month=01", "year=2024/month=02"]
+    assert resumo["removed"] == ["year=2024/month=03"]
+    assert os.stat(janeiro).st_mtime_ns == mtime
+    assert not os.path.exists(os.path.join(root, "year=2024", "month=03"))
+
+    resumo = write_partitioned_dataset(_dados(["2024-02-20"], base=500.0), root, append=True)
+    assert resumo["written"] == ["year=2024/month=02"]
+    fevereiro = read_partitioned_dataset(root, start="2024-02-01", end="2024-02-29")
+    assert fevereiro[COL_FATURAMENTO].tolist() == [101.0, 500.0]
+
+
+def test_dataset_grava_coluna_com_tipos_misturados(tmp_path):
+    """
+    Testa se uma coluna de texto livre com tipos misturados ([1, "x"]) é
+    gravada como texto, inclusive ao acrescentar linhas (append) a uma
+    partição cuja coluna era só numérica.
+    """
+    root = str(tmp_path / "dataset")
+    inicial = _dados(["2024-01-05", "2024-01-06"]).assign(observacao=[1, 2])
+    write_partitioned_dataset(inicial, root)
+
+    misturado = _dados(["2024-01-07", "2024-01-08"]).assign(observacao=pd.Series([3, "x"], dtype=object))
+    resumo = write_partitioned_dataset(misturado, root, append=True)
+
+    assert resumo["written"] == ["year=2024/month=01"]
+    df = read_partitioned_dataset(root)
+    assert df["observacao"].astype(str).tolist() == ["1", "2", "3", "x"]
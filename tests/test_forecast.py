@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.forecast import (
+    COL_DIMENSAO, COL_MES, COL_PREVISTO, COL_SERIE, design_matrix, fit_batched, forecast_series,
+)
+from src.storage import MemoryStorage
+from src.transformer import COL_DATA, COL_FATURAMENTO, COL_LUCRO
+
+
+def _sinal(t, nivel, tendencia, amplitude):
+    return nivel + tendencia * t + amplitude * np.sin(2 * np.pi * t / 12) + 0.3 * amplitude * np.cos(4 * np.pi * t / 12)
+
+
+def _vendas_mensais(meses: int = 36) -> pd.DataFrame:
+    """Uma linha por filial e mês (no último dia do mês), sem ruído."""
+    datas = pd.date_range("2023-01-31", periods=meses, freq="ME")
+    t = np.arange(meses)
+    centro = _sinal(t, 50_000, 800, 6_000)
+    norte = np.where(t >= meses - 12, 20_000 + 500 * (t - (meses - 12)), 0.0)  # abriu há 12 meses
+    df = pd.DataFrame({
+        COL_DATA: np.r_[datas, datas],
+        "filial": ["centro"] * meses + ["norte"] * meses,
+        COL_FATURAMENTO: np.r_[centro, norte],
+    })
+    df[COL_LUCRO] = df[COL_FATURAMENTO] * 0.25
+    return df[df[COL_FATURAMENTO] != 0].reset_index(drop=True)
+
+
+def _chart(df: pd.DataFrame) -> pd.DataFrame:
+    return df.groupby(COL_DATA, as_index=False)[[COL_FATURAMENTO, COL_LUCRO]].sum()
+
+
+# -----------------------------------------------------------
+# I. Ajuste em lote
+# -----------------------------------------------------------
+def test_fit_batched_igual_ao_lstsq_por_serie():
+    """
+    Testa se a resolução em lote dá os mesmos coeficientes que um lstsq
+    por série sobre os meses observados, com parâmetros desligados para
+    séries curtas e uma série vazia (coeficientes zero).
+    """
+    rng = np.random.default_rng(2)
+    X = design_matrix(np.arange(30))
+    Y = rng.normal(100, 20, (30, 5))
+    mask = np.ones(Y.shape, dtype=bool)
+    mask[:10, 1] = False            # começou no mês 10
+    mask[:28, 2] = False            # 2 meses: só a média
+    mask[:, 3] = False              # sem dados
+    active = np.ones((5, X.shape[1]), dtype=bool)
+    active[2, 1:] = False
+    active[3, 1:] = False
+    active[4, 2:] = False           # só tendência
+
+    coef = fit_batched(X, Y, mask, active)
+
+    for s in range(5):
+        cols = np.flatnonzero(active[s])
+        rows = mask[:, s]
+        esperado = np.zeros(X.shape[1])
+        if rows.any():
+            esperado[cols] = np.linalg.lstsq(X[rows][:, cols], Y[rows, s], rcond=None)[0]
+        np.testing.assert_allclose(coef[s], esperado, atol=1e-8)
+
+
+# -----------------------------------------------------------
+# II. Projeção por série
+# -----------------------------------------------------------
+def test_forecast_series_recupera_tendencia_e_sazonalidade():
+    """
+    Testa, em dados sem ruído, se a projeção de 3 meses reproduz o sinal
+    (tendência + sazonalidade no total e na filial antiga, só tendência na
+    filial aberta há 12 meses, ajustada a partir da abertura).
+    """
+    df = _vendas_mensais()
+    result = forecast_series(df, _chart(df), ["filial", "regiao"])
+    frame = result.frame()
+
+    t = np.arange(36, 39)
+    centro = _sinal(t, 50_000, 800, 6_000)
+    norte = 20_000 + 500 * (t - 24)
+    esperado = {"total": centro + norte, "centro": centro, "norte": norte}
+
+    assert [str(m) for m in result.future] == ["2026-01", "2026-02", "2026-03"]
+    assert frame[COL_SERIE].tolist() == [s for s in ["total", "centro", "norte"] for _ in range(3)]
+    for serie, valores in esperado.items():
+        linhas = frame[frame[COL_SERIE] == serie]
+        if serie != "total":
+            assert (linhas[COL_DIMENSAO] == "filial").all()
+        # O total mistura uma série sazonal e uma que só existe há 12 meses
+        tol = 0.05 if serie == "total" else 1e-6
+        np.testing.assert_allclose(linhas[COL_FATURAMENTO], valores, rtol=tol)
+        np.testing.assert_allclose(linhas[COL_LUCRO], 0.25 * valores, rtol=tol)
+
+
+def test_mes_incompleto_fica_fora_do_ajuste():
+    """Testa se o mês corrente parcial é excluído do ajuste e vira o primeiro mês projetado."""
+    df = _vendas_mensais()
+    parcial = pd.DataFrame({COL_DATA: [pd.Timestamp("2026-01-10")], "filial": ["centro"],
+                            COL_FATURAMENTO: [1_000.0], COL_LUCRO: [250.0]})
+    df = pd.concat([df, parcial], ignore_index=True)
+
+    result = forecast_series(df, _chart(df), ["filial"])
+
+    assert str(result.months[-1]) == "2025-12"
+    assert str(result.future[0]) == "2026-01"
+    centro = result.frame().query("serie == 'centro'")[COL_FATURAMENTO]
+    np.testing.assert_allclose(centro, _sinal(np.arange(36, 39), 50_000, 800, 6_000), rtol=1e-6)
+
+
+# -----------------------------------------------------------
+# III. Gráfico e seção do PDF
+# -----------------------------------------------------------
+def test_grafico_e_tabela_de_projecao():
+    """Testa o gráfico de projeção (visualizer) e a seção do PDF com tabela."""
+    from src.pdf_generator import generate_pdf_report_advanced
+    from src.visualizer import generate_forecast_plot
+
+    df = _vendas_mensais()
+    result = forecast_series(df, _chart(df), ["filial"])
+    chart = result.chart_frame()
+    registros = result.records(limit=2)
+
+    assert len(chart) == 39 and chart[COL_PREVISTO].sum() == 3
+    assert chart[COL_MES].iloc[-1] == pd.Timestamp("2026-03-01")
+    assert [r[COL_SERIE] for r in registros] == ["total", "centro"]
+    assert registros[1][COL_FATURAMENTO][0] == pytest.approx(_sinal(36, 50_000, 800, 6_000), rel=1e-6)
+
+    storage = MemoryStorage()
+    generate_forecast_plot(chart, "r/previsao.png", storage=storage)
+    assert storage.read_bytes("r/previsao.png").startswith(b"\x89PNG")
+
+    metrics = {"faturamento_total": 1.0, "custos_totais": 0.0, "lucro_total": 1.0, "lucro_percentual": 100.0}
+    generate_pdf_report_advanced(metrics, "r/relatorio.pdf", forecast=registros,
+                                 forecast_chart_path="r/previsao.png", storage=storage)
+    assert storage.read_bytes("r/relatorio.pdf").startswith(b"%PDF")
@@ -0,0 +1,115 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from src.indicators import ARQUIVO_INDICADORES, PeriodIndicators, update_indicators
+from src.transformer import COL_DATA, COL_FATURAMENTO, COL_CUSTOS, COL_LUCRO
+
+
+def _agregado_diario(days: int = 500, seed: int = 3) -> pd.DataFrame:
+    """Agregado diário como o de prepare_chart_data, com alguns dias sem movimento."""
+    rng = np.random.default_rng(seed)
+    datas = pd.date_range("2022-01-01", periods=days, freq="D")
+    datas = datas[rng.random(days) > 0.1]
+    faturamento = rng.integers(0, 500_000, len(datas)) / 100
+    custos = rng.integers(0, 300_000, len(datas)) / 100
+    return pd.DataFrame({
+        COL_DATA: datas,
+        COL_FATURAMENTO: faturamento,
+        COL_CUSTOS: custos,
+        COL_LUCRO: faturamento - custos,
+    })
+
+
+# -----------------------------------------------------------
+# I. Equivalência com pandas (rolling, resample, pct_change)
+# -----------------------------------------------------------
+def test_indicadores_iguais_ao_pandas():
+    """
+    Testa se médias móveis e crescimento MoM/YoY coincidem com o cálculo
+    direto em pandas sobre o calendário contínuo.
+    """
+    chart_data = _agregado_diario()
+    indicators = PeriodIndicators.from_daily(chart_data)
+
+    diario = chart_data.set_index(COL_DATA)[[COL_FATURAMENTO, COL_LUCRO]].asfreq("D", fill_value=0.0)
+    mensal = diario.resample("MS").sum()
+
+    daily = indicators.daily_frame()
+    monthly = indicators.monthly_frame()
+    for col in (COL_FATURAMENTO, COL_LUCRO):
+        for w in (7, 30):
+            esperado = diario[col].rolling(w).mean().to_numpy()
+            np.testing.assert_allclose(daily[f"{col}_mm{w}"], esperado, equal_nan=True)
+        mom = mensal[col].pct_change(fill_method=None).replace([np.inf, -np.inf], np.nan) * 100
+        yoy = mensal[col].pct_change(12, fill_method=None).replace([np.inf, -np.inf], np.nan) * 100
+        np.testing.assert_allclose(monthly[f"{col}_mom"], mom.to_numpy(), equal_nan=True)
+        np.testing.assert_allclose(monthly[f"{col}_yoy"], yoy.to_numpy(), equal_nan=True)
+
+
+# -----------------------------------------------------------
+# II. Atualização incremental e persistência do estado
+# -----------------------------------------------------------
+def test_incremental_igual_ao_completo(tmp_path):
+    """
+    Testa se anexar os dias novos a um estado salvo produz o mesmo resultado
+    que recalcular tudo, se um histórico alterado força o recálculo e se o
+    estado não é regravado quando nada mudou.
+    """
+    chart_data = _agregado_diario()
+    state = str(tmp_path / ARQUIVO_INDICADORES)
+    corte = chart_data[COL_DATA] <= "2022-11-15"
+
+    update_indicators(chart_data[corte], state)
+    gravado = os.stat(state).st_mtime_ns
+    update_indicators(chart_data[corte], state)
+    assert os.stat(state).st_mtime_ns == gravado, "Estado sem mudanças não deve ser regravado."
+    incremental = PeriodIndicators.load(state)
+    assert incremental.update(chart_data) == "incremental"
+    assert incremental.update(chart_data) == "unchanged"
+
+    completo = PeriodIndicators.from_daily(chart_data)
+    pd.testing.assert_frame_equal(incremental.daily_frame(), completo.daily_frame())
+    pd.testing.assert_frame_equal(incremental.monthly_frame(), completo.monthly_frame())
+    assert incremental.latest() == completo.latest()
+
+    alterado = chart_data.copy()
+    alterado.loc[0, COL_FATURAMENTO] += 1
+    assert incremental.update(alterado) == "full"
+
+
+def test_append_rejeita_dias_antigos():
+    """Testa se append recusa dias anteriores ou iguais ao último processado."""
+    chart_data = _agregado_diario(days=60)
+    indicators = PeriodIndicators.from_daily(chart_data)
+    with pytest.raises(ValueError):
+        indicators.append(chart_data.tail(1))
+
+
+# -----------------------------------------------------------
+# III. Exposição aos geradores de Excel e PDF
+# -----------------------------------------------------------
+def test_indicadores_no_excel_e_no_pdf(tmp_path):
+    """
+    Testa se o Excel ganha as planilhas de indicadores (com formato de
+    percentual no crescimento) e se o PDF renderiza a tabela de indicadores.
+    """
+    from openpyxl import load_workbook
+    from src.excel_generator import generate_excel_report
+    from src.pdf_generator import PdfReportTemplate
+
+    chart_data = _agregado_diario(days=120)
+    indicators = PeriodIndicators.from_daily(chart_data)
+
+    generate_excel_report(chart_data, str(tmp_path), 'R$ #,##0.00', 'dd/mm/yyyy', indicators=indicators)
+    workbook = load_workbook(tmp_path / "relatorio_financeiro.xlsx")
+    assert {"Indicadores Diários", "Indicadores Mensais"} <= set(workbook.sheetnames)
+    mensal = workbook["Indicadores Mensais"]
+    assert mensal.max_row == len(indicators.monthly_frame()) + 1
+    assert "%" in mensal.column_dimensions["C"].number_format
+
+    metrics = {"faturamento_total": 1.0, "custos_totais": 0.5, "lucro_total": 0.5, "lucro_percentual": 50.0}
+    template = PdfReportTemplate(logo_path=None)
+    story = template.build_story(metrics, indicators=indicators.latest())
+    assert len(story) > len(template.build_story(metrics))
+    assert template.render_to_bytes(metrics, indicators=indicators.latest()).startswith(b"%PDF")
@@ -0,0 +1,69 @@
+import json
+import os
+import pandas as pd
+import pytest
+from src.instrumentation import RunProfiler, stage
+from src.scheduler import Stage, run_stages
+from src.transformer import process_pipeline
+
+
+# -----------------------------------------------------------
+# I. Registro de etapas e sub-etapas do transformer
+# -----------------------------------------------------------
+def test_run_profiler_registra_etapas_do_transformer(tmp_path):
+    """
+    Testa se o RunProfiler registra as sub-etapas do transformer
+    (com linhas de entrada/saída e etapa pai) e grava o relatório JSON.
+    """
+    df = pd.DataFrame({
+        "Data": ["2024-01-01", "2024-01-02", "2024-01-02"],
+        "Faturamento": [100.0, 200.0, 50.0],
+        "Custos": [10.0, 20.0, 5.0],
+    })
+
+    with RunProfiler(trace_memory=True, profile_stage="clean_and_convert") as profiler:
+        with stage("process_pipeline", rows_in=len(df)) as s:
+            df_final, _, chart_data = process_pipeline([df])
+            s.rows_out = len(df_final)
+
+    records = {r.name: r for r in profiler.records}
+    assert {"concat", "clean_and_convert", "consolidate", "calculate_metrics",
+            "prepare_chart_data", "process_pipeline"} <= set(records)
+    assert records["clean_and_convert"].parent == "consolidate"
+    assert records["prepare_chart_data"].rows_out == len(chart_data) == 2
+    assert all(r.wall_s >= 0 and r.cpu_s >= 0 for r in profiler.records)
+    assert all(r.peak_mem_mb is not None for r in profiler.records)
+
+    report_path = profiler.write_report(str(tmp_path))
+    with open(report_path, encoding="utf-8") as f:
+        report = json.load(f)
+
+    assert report["status"] == "ok"
+    assert len(report["stages"]) == len(profiler.records)
+    assert os.path.exists(report["profile_output"])
+
+
+# -----------------------------------------------------------
+# II. Memória e etapas executadas pelo scheduler (threads)
+# -----------------------------------------------------------
+def test_run_profiler_mede_pico_de_memoria_em_threads():
+    """
+    Testa se etapas executadas em threads pelo scheduler são registradas
+    e se uma alocação grande aparece no pico de memória da etapa.
+    """
+    def aloca():
+        bloco = bytearray(20 * 1024 * 1024)
+        return len(bloco)
+
+    with RunProfiler(trace_memory=True) as profiler:
+        run_stages([Stage("aloca", aloca), Stage("leve", lambda: None)])
+
+    records = {r.name: r for r in profiler.records}
+    assert records["aloca"].peak_mem_mb >= 20
+    assert "leve" in records
+
+
+def test_stage_sem_profiler_ativo_nao_registra_nada():
+    with stage("qualquer", rows_in=10) as s:
+        s.rows_out = 5
+    assert s.rows_out == 5
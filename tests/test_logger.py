@@ -0,0 +1,122 @@
+import json
+import logging
+import os
+import threading
+
+import pytest
+from src import logger as log_module
+from src.instrumentation import RunProfiler, stage
+from src.logger import configure_logging, flush_logs, get_logger, lazy, set_log_file
+
+
+@pytest.fixture
+def restaura_log():
+    settings = log_module._state["settings"]
+    yield
+    if settings is not None:
+        configure_logging(**settings)
+    else:
+        log_module._stop_listener()
+        logging.getLogger().removeHandler(log_module._state["queue_handler"])
+        log_module._state.update(settings=None, queue_handler=None)
+
+
+# -----------------------------------------------------------
+# I. Linhas JSON com run_id e stage vindos do contexto
+# -----------------------------------------------------------
+def test_log_json_com_run_id_e_stage(tmp_path, restaura_log):
+    """
+    Testa se o formato JSON grava uma linha por registro com run_id do
+    RunProfiler ativo e o nome da etapa, inclusive a partir de outra thread
+    que herda o contexto.
+    """
+    import contextvars
+
+    log_path = tmp_path / "logs.jsonl"
+    configure_logging(path=str(log_path), format="json", console=False)
+    logger = get_logger("financial.teste")
+
+    with RunProfiler(trace_memory=False) as profiler:
+        with stage("carga"):
+            logger.info("lendo %s", "arquivo.xlsx")
+            ctx = contextvars.copy_context()
+            t = threading.Thread(target=ctx.run, args=(logger.warning, "na thread"))
+            t.start()
+            t.join()
+        logger.info("fora de etapa")
+    flush_logs()
+
+    linhas = [json.loads(l) for l in log_path.read_text(encoding="utf-8").splitlines()]
+    por_mensagem = {l["message"]: l for l in linhas}
+    assert por_mensagem["lendo arquivo.xlsx"]["stage"] == "carga"
+    assert por_mensagem["lendo arquivo.xlsx"]["run_id"] == profiler.run_id
+    assert por_mensagem["na thread"]["stage"] == "carga"
+    assert por_mensagem["na thread"]["level"] == "WARNING"
+    assert por_mensagem["fora de etapa"]["stage"] is None
+
+
+# -----------------------------------------------------------
+# II. Rotação por tamanho, troca de arquivo e mensagens preguiçosas
+# -----------------------------------------------------------
+def test_log_rotaciona_e_formata_preguicosamente(tmp_path, restaura_log):
+    """
+    Testa se o arquivo é rotacionado ao atingir max_bytes, se set_log_file
+    preserva as demais opções e se `lazy` só é avaliado quando emitido.
+    """
+    log_path = tmp_path / "logs.txt"
+    configure_logging(path=str(log_path), max_bytes=2000, backup_count=2, console=False)
+    logger = get_logger("financial.teste")
+
+    for i in range(200):
+        logger.info("linha %03d %s", i, "x" * 40)
+    flush_logs()
+    assert (tmp_path / "logs.txt.1").exists()
+    assert log_path.stat().st_size <= 2000
+
+    chamadas = []
+    logger.debug("caro: %s", lazy(lambda: chamadas.append(1) or "valor"))
+    assert chamadas == [], "Mensagem DEBUG desabilitada não deve ser construída."
+
+    set_log_file(str(tmp_path / "outro.txt"))
+    assert log_module._state["settings"]["max_bytes"] == 2000
+    logger.info("no novo arquivo: %s", lazy(str.upper, "ok"))
+    flush_logs()
+    assert "no novo arquivo: OK" in (tmp_path / "outro.txt").read_text(encoding="utf-8")
+
+
+# -----------------------------------------------------------
+# III. Processos filhos (fork) não escrevem no arquivo do pai
+# -----------------------------------------------------------
+def _worker_com_arquivo_proprio(log_path: str):
+    logger = get_logger("financial.teste")
+    logger.warning("filho antes do set_log_file")
+    anterior = set_log_file(log_path)
+    logger.info("filho no próprio arquivo")
+    set_log_file(anterior)
+    logger.warning("filho após restaurar")
+    flush_logs()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requer fork")
+def test_filho_do_fork_so_escreve_no_proprio_arquivo(tmp_path, restaura_log):
+    """
+    Testa se um processo filho (fork), como os workers do modo batch, não
+    grava no arquivo herdado do pai — nem antes do set_log_file nem após
+    restaurar o log anterior — e grava normalmente no próprio arquivo.
+    """
+    import multiprocessing
+
+    pai, filho = tmp_path / "pai.txt", tmp_path / "filho.txt"
+    configure_logging(path=str(pai), console=False)
+
+    processo = multiprocessing.get_context("fork").Process(target=_worker_com_arquivo_proprio, args=(str(filho),))
+    processo.start()
+    processo.join(30)
+    get_logger("financial.teste").info("pai continua registrando")
+    flush_logs()
+
+    assert processo.exitcode == 0
+    assert "filho" not in pai.read_text(encoding="utf-8")
+    assert "pai continua registrando" in pai.read_text(encoding="utf-8")
+    assert filho.read_text(encoding="utf-8").count("filho") == 1
+    assert "filho no próprio arquivo" in filho.read_text(encoding="utf-8")
@@ -0,0 +1,315 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from openpyxl import Workbook
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Dependências pesadas que não devem ser importadas sem necessidade
+MODULOS_PESADOS = ["pandas", "yaml", "openpyxl", "matplotlib", "xlsxwriter", "reportlab"]
+
+
+def _run_python(code: str, cwd: Path) -> dict:
+    """Executa código Python em um interpretador novo e retorna o JSON impresso na última linha."""
+    env = {**os.environ, "PYTHONPATH": str(ROOT)}
+    proc = subprocess.run(
+        [sys.executable, "-c", code], cwd=cwd, env=env,
+        capture_output=True, text=True, timeout=120,
+    )
+    assert proc.returncode == 0, proc.stderr
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def _planilha(linhas) -> bytes:
+    """Planilha .xlsx (data, faturamento, custos) em bytes."""
+    import io
+
+    wb = Workbook()
+    wb.active.append(["data", "faturamento", "custos"])
+    for linha in linhas:
+        wb.active.append(linha)
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+# -----------------------------------------------------------
+# I. Tempo de importação da CLI
+# -----------------------------------------------------------
+def test_import_main_nao_carrega_dependencias_pesadas(tmp_path):
+    """
+    Testa se importar main.py não carrega pandas/matplotlib/reportlab etc.
+    e mede o tempo de importação em um interpretador limpo.
+    """
+    code = (
+        "import json, sys, time\n"
+        "t = time.perf_counter()\n"
+        "import main\n"
+        "dt = time.perf_counter() - t\n"
+        f"pesados = [m for m in {MODULOS_PESADOS!r} if m in sys.modules]\n"
+        "print(json.dumps({'seconds': dt, 'pesados': pesados}))\n"
+    )
+    result = _run_python(code, tmp_path)
+
+    assert result["pesados"] == [], f"Módulos pesados importados: {result['pesados']}"
+    assert result["seconds"] < 0.5, f"Importação de main levou {result['seconds']:.3f}s"
+
+
+# -----------------------------------------------------------
+# II. Seleção de etapas (--only process)
+# -----------------------------------------------------------
+def test_only_process_nao_importa_geradores_de_relatorio(tmp_path):
+    """
+    Testa se `--only process` gera apenas o dataset consolidado, sem
+    importar as dependências dos relatórios (matplotlib e reportlab).
+    """
+    raw = tmp_path / "data" / "raw"
+    raw.mkdir(parents=True)
+    wb = Workbook()
+    wb.active.append(["data", "faturamento", "custos"])
+    wb.active.append(["2025-01-01", 1000, 500])
+    wb.save(raw / "vendas.xlsx")
+
+    (tmp_path / "config.yaml").write_text(
+        "paths:\n"
+        "  raw: data/raw\n"
+        "  processed: data/processed\n"
+        "  reports: data/reports\n"
+        "columns:\n"
+        "  required: [data, faturamento, custos]\n",
+        encoding="utf-8",
+    )
+
+    code = (
+        "import json, sys\n"
+        "import main\n"
+        "main.main(['--only', 'process'])\n"
+        "pesados = [m for m in ['matplotlib', 'reportlab'] if m in sys.modules]\n"
+        "print(json.dumps({'pesados': pesados}))\n"
+    )
+    result = _run_python(code, tmp_path)
+
+    assert result["pesados"] == []
+    assert (tmp_path / "data" / "processed" / "dados_processados.xlsx").exists()
+    assert not (tmp_path / "data" / "reports" / "relatorio_financeiro.pdf").exists()
+
+
+def test_parse_args_valida_formatos():
+    sys.path.insert(0, str(ROOT))
+    import main
+
+    args = main.parse_args(["--formats", "excel,pdf"])
+    assert args.formats == ["excel", "pdf"]
+    assert args.only is None
+
+    with pytest.raises(SystemExit):
+        main.parse_args(["--formats", "docx"])
+
+
+# -----------------------------------------------------------
+# III. Modo batch (multi-cliente)
+# -----------------------------------------------------------
+def _criar_cliente(base: Path, nome: str, valor: float, com_dados: bool = True) -> Path:
+    pasta = base / nome
+    raw = pasta / "data" / "raw"
+    raw.mkdir(parents=True)
+    if com_dados:
+        wb = Workbook()
+        wb.active.append(["data", "faturamento", "custos"])
+        wb.active.append(["2025-01-01", valor, 100])
+        wb.save(raw / "vendas.xlsx")
+    else:
+        raw.rmdir()  # diretório de dados ausente → falha do cliente
+
+    config = pasta / "config.yaml"
+    config.write_text(
+        "paths:\n"
+        "  raw: data/raw\n"
+        "  processed: data/processed\n"
+        "  reports: data/reports\n"
+        "columns:\n"
+        "  required: [data, faturamento, custos]\n",
+        encoding="utf-8",
+    )
+    return config
+
+
+def test_run_batch_isola_clientes_e_resume_falhas(tmp_path):
+    """
+    Testa se o modo batch processa cada cliente em sua própria pasta
+    (saídas e log isolados) e se o resumo aponta o cliente com falha.
+    """
+    sys.path.insert(0, str(ROOT))
+    import main
+
+    configs = [
+        _criar_cliente(tmp_path, "cliente_a", 1000),
+        _criar_cliente(tmp_path, "cliente_b", 2000),
+        _criar_cliente(tmp_path, "cliente_c", 0, com_dados=False),
+    ]
+
+    summary = main.run_batch([str(c) for c in configs], max_workers=2, formats=["excel"])
+
+    status = {t["tenant"]: t["status"] for t in summary["tenants"]}
+    assert status == {"cliente_a": "ok", "cliente_b": "ok", "cliente_c": "failed"}
+    assert summary["failed"] == ["cliente_c"]
+    assert summary["workers"] == 2
+
+    for nome in ("cliente_a", "cliente_b"):
+        reports = tmp_path / nome / "data" / "reports"
+        assert (reports / "relatorio_financeiro.xlsx").exists()
+        log = (reports / "logs.txt").read_text(encoding="utf-8")
+        assert f"Iniciando cliente '{nome}'" in log
+        outro = "cliente_b" if nome == "cliente_a" else "cliente_a"
+        assert f"Iniciando cliente '{outro}'" not in log
+
+
+# -----------------------------------------------------------
+# V. Planejador de memória (leitura em lotes)
+# -----------------------------------------------------------
+def test_pipeline_em_lotes_produz_o_mesmo_consolidado(tmp_path, monkeypatch):
+    """
+    Testa se, com orçamento de memória pequeno, o pipeline lê os arquivos
+    em lotes e gera o mesmo dataset consolidado da leitura em memória.
+    """
+    sys.path.insert(0, str(ROOT))
+    import main
+    import pandas as pd
+    from benchmarks.synthetic import write_synthetic_workbooks
+    from src.dataset import read_partitioned_dataset
+
+    consolidados = {}
+    for nome, limite in (("memoria", 4096), ("lotes", 0.05)):
+        pasta = tmp_path / nome
+        write_synthetic_workbooks(str(pasta / "data" / "raw"), rows=2000, files=4, seed=5)
+        (pasta / "config.yaml").write_text(
+            "paths: {raw: data/raw, processed: data/processed, reports: data/reports}\n"
+            "columns: {required: [data, faturamento, custos]}\n"
+            f"memory_budget: {{limit_mb: {limite}}}\n",
+            encoding="utf-8",
+        )
+        monkeypatch.chdir(pasta)
+        assert main.run_pipeline("config.yaml", only="process") == "ok"
+        df = read_partitioned_dataset("data/processed/dataset")
+        consolidados[nome] = df.sort_values(list(df.columns)).reset_index(drop=True)
+
+    pd.testing.assert_frame_equal(consolidados["lotes"], consolidados["memoria"])
+
+
+# -----------------------------------------------------------
+# VI. Ingestão tolerante (quarentena)
+# -----------------------------------------------------------
+def test_pipeline_tolerante_isola_arquivos_invalidos(tmp_path, monkeypatch):
+    """
+    Testa se, no modo tolerante, arquivos corrompidos ou sem as colunas
+    obrigatórias vão para a quarentena e o pipeline processa os demais,
+    terminando como "partial".
+    """
+    sys.path.insert(0, str(ROOT))
+    import main
+
+    raw = tmp_path / "data" / "raw"
+    raw.mkdir(parents=True)
+    wb = Workbook()
+    wb.active.append(["data", "faturamento", "custos"])
+    wb.active.append(["2025-01-01", 1000, 100])
+    wb.save(raw / "filial_a.xlsx")
+    wb = Workbook()
+    wb.active.append(["data", "vendas"])
+    wb.active.append(["2025-01-01", 1])
+    wb.save(raw / "filial_b.xlsx")
+    (raw / "filial_c.xlsx").write_bytes(b"upload interrompido")
+
+    (tmp_path / "config.yaml").write_text(
+        "paths: {raw: data/raw, processed: data/processed, reports: data/reports}\n"
+        "columns: {required: [data, faturamento, custos]}\n"
+        "ingestion: {mode: tolerant, quarantine_dir: data/quarantine}\n"
+        "memory_budget: {limit_mb: 512}\n",
+        encoding="utf-8",
+    )
+    monkeypatch.chdir(tmp_path)
+
+    assert main.run_pipeline("config.yaml", only="process") == "partial"
+    assert os.listdir(raw) == ["filial_a.xlsx"]
+    sidecars = [f for f in os.listdir(tmp_path / "data" / "quarantine") if f.endswith(".error.json")]
+    assert sorted(s.split("_", 3)[-1] for s in sidecars) == ["filial_b.xlsx.error.json", "filial_c.xlsx.error.json"]
+    assert (tmp_path / "data" / "processed" / "dataset").exists()
+
+
+# -----------------------------------------------------------
+# VII. Execução inteiramente em memória (MemoryStorage)
+# -----------------------------------------------------------
+def test_pipeline_completo_em_memoria_sem_disco(tmp_path, monkeypatch):
+    """
+    Testa se run_pipeline com MemoryStorage lê config e planilhas e grava
+    dataset, índice, indicadores, gráfico, Excel e PDF apenas em memória,
+    sem criar nenhum arquivo no diretório de trabalho.
+    """
+    sys.path.insert(0, str(ROOT))
+    import main
+    from src.dataset import read_partitioned_dataset
+    from src.storage import MemoryStorage
+
+    storage = MemoryStorage({
+        "config.yaml": (
+            "paths: {raw: data/raw, processed: data/processed, reports: data/reports}\n"
+            "columns: {required: [data, faturamento, custos]}\n"
+            "cache: {enabled: true, dir: data/cache}\n"
+            "memory_budget: {limit_mb: 512}\n"
+            "instrumentation: {enabled: true, trace_memory: false, reports_dir: data/reports/run_reports}\n"
+        ),
+        "data/raw/filial_a.xlsx": _planilha([["2025-01-01", 1000, 100], ["2025-01-02", 500, 50]]),
+        "data/raw/filial_b.xlsx": _planilha([["2025-02-01", 2000, 300]]),
+    })
+    monkeypatch.chdir(tmp_path)
+
+    assert main.run_pipeline("config.yaml", storage=storage) == "ok"
+    assert list(tmp_path.iterdir()) == []
+
+    arquivos = storage.files
+    for nome in ("relatorio_financeiro.xlsx", "relatorio_financeiro.pdf", "grafico_financeiro.png"):
+        assert len(arquivos[f"data/reports/{nome}"]) > 0
+    assert arquivos["data/reports/relatorio_financeiro.pdf"].startswith(b"%PDF")
+    assert "data/processed/consolidado_indice.npz" in arquivos
+    assert "data/processed/indicadores_estado.npz" in arquivos
+    assert len(storage.listdir("data/reports/run_reports")) == 1
+
+    df = read_partitioned_dataset("data/processed/dataset", storage=storage)
+    assert df["faturamento"].sum() == 3500
+
+
+def test_cache_do_pdf_considera_titulo_do_config(tmp_path, monkeypatch):
+    """
+    Testa se o PDF vem do cache quando nada muda e se é refeito quando
+    apenas o `pdf_title` do config.yaml muda.
+    """
+    sys.path.insert(0, str(ROOT))
+    import main
+
+    config = (
+        "paths: {raw: data/raw, processed: data/processed, reports: data/reports}\n"
+        "columns: {required: [data, faturamento, custos]}\n"
+        "cache: {enabled: true, dir: data/cache}\n"
+        "instrumentation: {enabled: false}\n"
+        "report_settings: {pdf_title: %s}\n"
+    )
+    (tmp_path / "data" / "raw").mkdir(parents=True)
+    (tmp_path / "data" / "raw" / "filial_a.xlsx").write_bytes(
+        _planilha([["2025-01-01", 1000, 100], ["2025-01-02", 500, 50]])
+    )
+    (tmp_path / "config.yaml").write_text(config % "Relatorio A", encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+    pdf = tmp_path / "data" / "reports" / "relatorio_financeiro.pdf"
+
+    assert main.run_pipeline("config.yaml") == "ok"
+    primeiro = pdf.read_bytes()
+    assert main.run_pipeline("config.yaml") == "ok"
+    assert pdf.read_bytes() == primeiro
+
+    (tmp_path / "config.yaml").write_text(config % "Relatorio B", encoding="utf-8")
+    assert main.run_pipeline("config.yaml") == "ok"
+    assert pdf.read_bytes() != primeiro
@@ -64,4 +64,62 @@ def test_generate_pdf_report_creates_file(tmp_path):
     assert file_size > expected_min_size, \
         f"O PDF foi criado, mas seu tamanho ({file_size} bytes) é muito pequeno, sugerindo falha na inclusão de conteúdo."
         
-    logger.info(f"Teste de geração de PDF concluído com sucesso. Arquivo salvo em: {pdf_output}")
\ No newline at end of file
+    logger.info(f"Teste de geração de PDF concluído com sucesso. Arquivo salvo em: {pdf_output}")
+
+# -----------------------------------------------------------
+# Teste: Template reutilizável (PdfReportTemplate)
+# -----------------------------------------------------------
+
+def test_pdf_report_template_renderiza_varios_pdfs_em_memoria(tmp_path):
+    """
+    Testa se um único PdfReportTemplate renderiza vários PDFs (em buffer e em
+    arquivo) sem alterar os estilos globais do ReportLab.
+    """
+    from reportlab.lib.styles import getSampleStyleSheet
+    from src.pdf_generator import PdfReportTemplate
+
+    # 1. Setup
+    normal_antes = getSampleStyleSheet()["Normal"].fontSize
+    template = PdfReportTemplate(logo_path=None)
+    mock_metrics = {
+        "faturamento_total": 15000.50,
+        "custos_totais": 10000.25,
+        "lucro_total": 5000.25,
+        "lucro_percentual": 33.33,
+    }
+
+    # 2. Action: várias renderizações com o mesmo template
+    pdfs = [template.render_to_bytes(mock_metrics) for _ in range(5)]
+    pdf_output = tmp_path / "relatorio_template.pdf"
+    template.render(mock_metrics, str(pdf_output))
+
+    # 3. Assertion
+    assert all(pdf.startswith(b"%PDF") for pdf in pdfs)
+    assert os.path.getsize(pdf_output) > 1000
+    assert getSampleStyleSheet()["Normal"].fontSize == normal_antes, \
+        "O template não deve alterar os estilos globais."
+    assert template.footer_style.fontSize == 8
+
+
+def test_get_report_template_separa_logos_relativos_por_diretorio(tmp_path, monkeypatch):
+    """
+    Testa se o mesmo caminho relativo de logo em diretórios diferentes
+    (clientes do modo batch) resulta em templates diferentes.
+    """
+    from src.pdf_generator import get_report_template
+
+    # 1. Setup: dois clientes com "logo.png" no próprio diretório
+    for cliente in ("cliente_a", "cliente_b"):
+        (tmp_path / cliente).mkdir()
+        with open(tmp_path / cliente / "logo.png", "wb") as f:
+            f.write(b"\x89PNG\r\n\x1a\n")
+
+    # 2. Action
+    monkeypatch.chdir(tmp_path / "cliente_a")
+    template_a = get_report_template("logo.png")
+    monkeypatch.chdir(tmp_path / "cliente_b")
+    template_b = get_report_template("logo.png")
+
+    # 3. Assertion
+    assert template_a is not template_b
+    assert get_report_template("logo.png") is template_b
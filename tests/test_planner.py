@@ -0,0 +1,51 @@
+import os
+
+import pandas as pd
+import pytest
+from benchmarks.synthetic import write_synthetic_workbooks
+from src.planner import ESTRATEGIA_LOTES, ESTRATEGIA_MEMORIA, estimate_file, plan_execution
+from src.reader import read_excel_file
+
+
+# -----------------------------------------------------------
+# I. Estimativa do tamanho decodificado por amostragem
+# -----------------------------------------------------------
+def test_estimativa_proxima_do_tamanho_real(tmp_path):
+    """
+    Testa se a estimativa por amostra (dimensão da planilha + primeiras
+    linhas) fica próxima do memory_usage real do DataFrame lido.
+    """
+    (path,) = write_synthetic_workbooks(str(tmp_path), rows=3000, files=1, seed=1)
+
+    estimativa = estimate_file(path, sample_rows=200)
+    real = read_excel_file(path).memory_usage(index=False, deep=True).sum()
+
+    assert estimativa.rows == pytest.approx(3000, rel=0.1)
+    assert estimativa.decoded_bytes == pytest.approx(real, rel=0.25)
+
+
+# -----------------------------------------------------------
+# II. Escolha da estratégia, lotes e workers
+# -----------------------------------------------------------
+def test_plano_escolhe_lotes_dentro_do_orcamento(tmp_path):
+    """
+    Testa se o planejador mantém tudo em memória quando cabe no orçamento
+    e, caso contrário, agrupa os arquivos em lotes que respeitam o orçamento.
+    """
+    write_synthetic_workbooks(str(tmp_path), rows=4000, files=4, seed=2)
+
+    folgado = plan_execution(str(tmp_path), budget_mb=1024, max_workers=4)
+    assert folgado.strategy == ESTRATEGIA_MEMORIA
+    assert folgado.batches == [sorted(os.listdir(tmp_path))]
+    assert folgado.workers == 4
+
+    orcamento = folgado.peak_mb / 2
+    apertado = plan_execution(str(tmp_path), budget_mb=orcamento, max_workers=4)
+    assert apertado.strategy == ESTRATEGIA_LOTES
+    assert sorted(n for lote in apertado.batches for n in lote) == sorted(os.listdir(tmp_path))
+    custo = {e.name: e.decoded_mb * 3.0 for e in apertado.files}
+    assert all(sum(custo[n] for n in lote) <= orcamento for lote in apertado.batches)
+    assert 1 <= apertado.workers <= 4
+
+    with pytest.raises(FileNotFoundError):
+        plan_execution(str(tmp_path / "inexistente"), budget_mb=10)
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.query import ConsolidatedIndex, index_path, open_index
+from src.transformer import COL_DATA, COL_FATURAMENTO, COL_CUSTOS, COL_LUCRO, calculate_metrics, prepare_chart_data
+
+
+def _dados(rows: int = 5000, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    faturamento = rng.integers(0, 500_000, rows) / 100
+    custos = rng.integers(0, 300_000, rows) / 100
+    return pd.DataFrame({
+        COL_DATA: pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 400, rows), unit="D"),
+        COL_FATURAMENTO: faturamento,
+        COL_CUSTOS: custos,
+        COL_LUCRO: faturamento - custos,
+    })
+
+
+# -----------------------------------------------------------
+# I. Totais por período idênticos a calculate_metrics
+# -----------------------------------------------------------
+def test_totais_iguais_a_calculate_metrics():
+    """
+    Testa se os totais do índice (somas de prefixo em centavos) coincidem
+    exatamente com calculate_metrics sobre o recorte filtrado em pandas.
+    """
+    df = _dados()
+    index = ConsolidatedIndex.from_frame(df)
+    assert index.exact_cents
+
+    periodos = [(None, None), ("2023-02-01", "2023-02-28"), ("2023-06-15", None),
+                (None, "2023-01-01"), ("2025-01-01", "2025-12-31")]
+    for start, end in periodos:
+        mask = pd.Series(True, index=df.index)
+        if start:
+            mask &= df[COL_DATA] >= start
+        if end:
+            mask &= df[COL_DATA] <= end
+        recorte = df[mask]
+
+        totais = index.totals(start, end)
+        assert {k: totais[k] for k in calculate_metrics(recorte)} == calculate_metrics(recorte)
+        assert totais["rows"] == len(recorte)
+
+
+
+def test_custos_em_branco_somam_zero():
+    """
+    Testa se custos em branco (mantidos por clean_and_convert) não
+    contaminam as somas de prefixo: totais iguais a calculate_metrics e
+    série igual a prepare_chart_data, sem NaN.
+    """
+    df = _dados(rows=500)
+    df.loc[df.index[::7], COL_CUSTOS] = np.nan
+    df[COL_LUCRO] = df[COL_FATURAMENTO] - df[COL_CUSTOS]
+    index = ConsolidatedIndex.from_frame(df)
+
+    for start, end in [(None, None), ("2023-03-01", "2023-08-31")]:
+        mask = pd.Series(True, index=df.index)
+        if start:
+            mask &= (df[COL_DATA] >= start) & (df[COL_DATA] <= end)
+        esperado = calculate_metrics(df[mask])
+        totais = index.totals(start, end)
+        assert {k: totais[k] for k in esperado} == esperado
+
+    serie = index.series()
+    assert not serie[[COL_FATURAMENTO, COL_CUSTOS, COL_LUCRO]].isna().any().any()
+    np.testing.assert_allclose(serie[COL_LUCRO], prepare_chart_data(df)[COL_LUCRO])
+
+# -----------------------------------------------------------
+# II. Série diária e persistência em .npz
+# -----------------------------------------------------------
+def test_series_e_persistencia(tmp_path):
+    """
+    Testa se a série do índice equivale a prepare_chart_data e se o índice
+    salvo em disco é reaberto com os mesmos resultados.
+    """
+    df = _dados(rows=800)
+    index = ConsolidatedIndex.from_frame(df)
+    index.save(index_path(str(tmp_path)))
+
+    reaberto = open_index(str(tmp_path))
+    recorte = df[(df[COL_DATA] >= "2023-03-01") & (df[COL_DATA] <= "2023-03-31")]
+    esperado = prepare_chart_data(recorte)
+    serie = reaberto.series("2023-03-01", "2023-03-31")
+
+    assert list(serie.columns) == list(esperado.columns)
+    assert (serie[COL_DATA].to_numpy() == esperado[COL_DATA].to_numpy()).all()
+    for col in (COL_FATURAMENTO, COL_CUSTOS, COL_LUCRO):
+        assert serie[col].to_numpy() == pytest.approx(esperado[col].to_numpy())
+    assert reaberto.totals() == index.totals()
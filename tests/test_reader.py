@@ -76,3 +76,107 @@ def test_validate_columns_missing():
 
     with pytest.raises(ValueError):
         validate_columns(df, ["data", "faturamento", "custos"])
+
+
+# ----------------------------------------------------------
+# Teste 6 — Cache de arquivos em memória (modo watch)
+# ----------------------------------------------------------
+def test_load_excel_files_reutiliza_cache_em_memoria(tmp_path):
+    import os
+
+    folder = tmp_path / "raw"
+    folder.mkdir()
+
+    for nome, valor in [("a.xlsx", 1000), ("b.xlsx", 2000)]:
+        wb = Workbook()
+        wb.active.append(["data", "faturamento", "custos"])
+        wb.active.append(["2025-01-01", valor, 500])
+        wb.save(folder / nome)
+
+    file_cache = {}
+    primeiro = load_excel_files(str(folder), file_cache=file_cache)
+    segundo = load_excel_files(str(folder), file_cache=file_cache)
+
+    # Arquivos inalterados não são relidos (mesmo objeto)
+    assert segundo["a.xlsx"] is primeiro["a.xlsx"]
+
+    # Arquivo alterado é relido; arquivo removido sai do cache
+    wb = Workbook()
+    wb.active.append(["data", "faturamento", "custos"])
+    wb.active.append(["2025-01-02", 3000, 700])
+    wb.active.append(["2025-01-03", 3500, 800])
+    wb.save(folder / "a.xlsx")
+    os.remove(folder / "b.xlsx")
+
+    terceiro = load_excel_files(str(folder), file_cache=file_cache)
+
+    assert len(terceiro["a.xlsx"]) == 2
+    assert set(file_cache) == {"a.xlsx"}
+
+
+# -----------------------------------------------------------
+# Modo tolerante (quarentena)
+# -----------------------------------------------------------
+def test_load_excel_files_modo_tolerante_move_para_quarentena(tmp_path):
+    """
+    Testa se, com strict=False, arquivos vazios e corrompidos vão para a
+    quarentena com sidecar de erro e os demais continuam sendo carregados.
+    """
+    import json
+    import os
+
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    quarentena = tmp_path / "quarentena"
+
+    wb = Workbook()
+    wb.active.append(["data", "faturamento", "custos"])
+    wb.active.append(["2024-01-01", 100, 10])
+    wb.save(raw / "valido.xlsx")
+    Workbook().save(raw / "vazio.xlsx")
+    (raw / "corrompido.xlsx").write_bytes(b"isto nao e um xlsx")
+
+    resumo = {}
+    result = load_excel_files(str(raw), strict=False, quarantine_dir=str(quarentena), summary=resumo)
+
+    assert list(result) == ["valido.xlsx"]
+    assert resumo["loaded"] == ["valido.xlsx"]
+    assert sorted(e["file"] for e in resumo["quarantined"]) == ["corrompido.xlsx", "vazio.xlsx"]
+    assert sorted(os.listdir(raw)) == ["valido.xlsx"]
+
+    for entry in resumo["quarantined"]:
+        assert os.path.exists(entry["quarantined_as"])
+        with open(entry["sidecar"], encoding="utf-8") as f:
+            sidecar = json.load(f)
+        assert sidecar["file"] == entry["file"]
+        assert sidecar["error_type"] in ("ValueError", "InvalidFileException", "BadZipFile")
+
+    # O modo estrito continua sendo o padrão
+    Workbook().save(raw / "vazio.xlsx")
+    with pytest.raises(ValueError):
+        load_excel_files(str(raw))
+
+
+# -----------------------------------------------------------
+# Arquivos de trava do Excel (~$)
+# -----------------------------------------------------------
+def test_load_excel_files_ignora_trava_como_o_planejador(tmp_path):
+    """
+    Testa se o reader ignora arquivos de trava do Excel, listando o mesmo
+    conjunto de arquivos que o planejador de memória.
+    """
+    from src.planner import plan_execution
+
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    wb = Workbook()
+    wb.active.append(["data", "faturamento", "custos"])
+    wb.active.append(["2024-01-01", 100, 10])
+    wb.save(raw / "filial.xlsx")
+    (raw / "~$filial.xlsx").write_bytes(b"lock")
+
+    result = load_excel_files(str(raw))
+    plano = plan_execution(str(raw), budget_mb=512)
+
+    assert list(result) == ["filial.xlsx"]
+    assert [e.name for e in plano.files] == list(result)
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.rules import RuleSet, apply_rules, violations_report
+from src.storage import MemoryStorage
+from src.transformer import COL_DATA, COL_FATURAMENTO, COL_CUSTOS, COL_LUCRO
+
+REGRAS = [
+    {"name": "custos_nao_negativos", "column": "custos", "check": "min", "value": 0},
+    {"name": "data_nao_futura", "column": "data", "check": "not_future"},
+    {"name": "teto_filial", "column": "faturamento", "check": "max_by", "by": "filial",
+     "limits": {"centro": 1000}, "default": 5000},
+    {"name": "lucro_confere", "column": "lucro", "check": "matches", "expr": "faturamento - custos"},
+]
+AGORA = pd.Timestamp("2025-06-30 15:00")
+
+
+def _dados() -> pd.DataFrame:
+    return pd.DataFrame({
+        COL_DATA: pd.to_datetime(["2025-06-01", "2025-06-30 23:59", "2025-07-01", "2025-06-02", "2025-06-03"], format="ISO8601"),
+        "filial": ["centro", "centro", "norte", "norte", "sul"],
+        COL_FATURAMENTO: [900.0, 1500.0, 100.0, 6000.0, 100.0],
+        COL_CUSTOS: [100.0, 200.0, -5.0, 1000.0, np.nan],
+        COL_LUCRO: [800.0, 1300.0, 105.0, 4000.0, np.nan],
+    })
+
+
+# -----------------------------------------------------------
+# I. Máscaras vetorizadas por regra
+# -----------------------------------------------------------
+def test_regras_geram_matriz_de_violacoes():
+    """
+    Testa se cada verificação marca exatamente as linhas esperadas:
+    custos negativos, data futura, teto por filial (com padrão) e lucro de
+    origem divergente de faturamento − custos. Valores ausentes não violam.
+    """
+    result = RuleSet.from_config(REGRAS).evaluate(_dados(), now=AGORA)
+
+    assert result.violations.shape == (5, 4)
+    assert result.counts() == {
+        "custos_nao_negativos": 1,  # linha 2
+        "data_nao_futura": 1,       # linha 2 (2025-06-30 23:59 ainda é hoje)
+        "teto_filial": 2,           # linhas 1 (centro > 1000) e 3 (norte > padrão 5000)
+        "lucro_confere": 1,         # linha 3 (4000 != 5000)
+    }
+    assert result.invalid_rows.tolist() == [False, True, True, True, False]
+
+
+def test_configuracao_invalida_e_colunas_ausentes():
+    """Testa erros de configuração e o descarte (com aviso) de regras sem colunas."""
+    with pytest.raises(ValueError, match="Verificação inválida"):
+        RuleSet.from_config([{"column": "custos", "check": "positivo"}])
+    with pytest.raises(ValueError, match="sem os parâmetros"):
+        RuleSet.from_config([{"column": "custos", "check": "min"}])
+    with pytest.raises(ValueError, match="repetidos"):
+        RuleSet.from_config([REGRAS[0], REGRAS[0]])
+
+    result = RuleSet.from_config(REGRAS).evaluate(_dados().drop(columns=["filial"]), now=AGORA)
+    assert result.skipped == ["teto_filial"]
+    assert "teto_filial" not in result.counts()
+
+
+# -----------------------------------------------------------
+# II. Relatório compacto e ações
+# -----------------------------------------------------------
+def test_relatorio_compacto_e_descarte():
+    """
+    Testa se o relatório tem uma linha por registro inválido com todas as
+    regras violadas, e se action="drop" remove apenas essas linhas.
+    """
+    df = _dados()
+    ruleset = RuleSet.from_config(REGRAS)
+    report = violations_report(df, ruleset.evaluate(df, now=AGORA))
+
+    assert report["linha"].tolist() == [1, 2, 3]
+    assert report["regras"].tolist() == [
+        "teto_filial", "custos_nao_negativos;data_nao_futura", "teto_filial;lucro_confere",
+    ]
+    assert list(report.columns) == ["linha", "regras", "custos", "data", "faturamento", "filial", "lucro"]
+
+    storage = MemoryStorage()
+    summary = {}
+    mantido = apply_rules(df, ruleset, action="report", report_path="r/erros.csv", storage=storage, summary=summary)
+    assert mantido is df
+    assert summary["invalid"] == 3
+    gravado = pd.read_csv(storage.open("r/erros.csv"))
+    assert gravado["linha"].tolist() == [1, 2, 3]
+
+    # "data_nao_futura" depende do relógio: sem ela, o descarte é determinístico
+    sem_data = RuleSet.from_config([r for r in REGRAS if r["check"] != "not_future"])
+    filtrado = apply_rules(df, sem_data, action="drop")
+    assert filtrado[COL_FATURAMENTO].tolist() == [900.0, 100.0]
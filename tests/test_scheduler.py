@@ -0,0 +1,77 @@
+import time
+import pytest
+from src.scheduler import Stage, run_stages, STATUS_OK, STATUS_FAILED, STATUS_SKIPPED
+
+
+# -----------------------------------------------------------
+# I. Execução concorrente respeitando dependências
+# -----------------------------------------------------------
+def test_run_stages_executa_independentes_em_paralelo():
+    """
+    Testa se etapas independentes rodam em paralelo e se uma etapa
+    dependente só começa após a dependência terminar.
+    """
+    ordem = []
+
+    def etapa(nome, duracao):
+        def _run():
+            time.sleep(duracao)
+            ordem.append(nome)
+            return nome
+        return _run
+
+    stages = [
+        Stage("excel", etapa("excel", 0.3)),
+        Stage("chart", etapa("chart", 0.3)),
+        Stage("pdf", etapa("pdf", 0.0), depends_on=("chart",)),
+    ]
+
+    inicio = time.perf_counter()
+    results = run_stages(stages, max_workers=4)
+    total = time.perf_counter() - inicio
+
+    assert all(r.status == STATUS_OK for r in results.values())
+    assert list(results) == ["excel", "chart", "pdf"]
+    assert ordem.index("pdf") > ordem.index("chart")
+    assert results["pdf"].value == "pdf"
+    # Execução sequencial levaria ~0.6s
+    assert total < 0.55, f"Etapas independentes não rodaram em paralelo ({total:.2f}s)."
+
+
+# -----------------------------------------------------------
+# II. Isolamento de falhas
+# -----------------------------------------------------------
+def test_run_stages_isola_falhas():
+    """
+    Testa se a falha do gráfico ignora apenas o PDF (dependente)
+    e não impede a geração do Excel.
+    """
+    def falha():
+        raise RuntimeError("erro no gráfico")
+
+    stages = [
+        Stage("chart", falha),
+        Stage("excel", lambda: "ok"),
+        Stage("pdf", lambda: "ok", depends_on=("chart",)),
+    ]
+
+    results = run_stages(stages)
+
+    assert results["chart"].status == STATUS_FAILED
+    assert isinstance(results["chart"].error, RuntimeError)
+    assert results["excel"].status == STATUS_OK
+    assert results["pdf"].status == STATUS_SKIPPED
+
+
+# -----------------------------------------------------------
+# III. Validação do grafo
+# -----------------------------------------------------------
+def test_run_stages_rejeita_grafo_invalido():
+    with pytest.raises(ValueError, match="circular"):
+        run_stages([
+            Stage("a", lambda: None, depends_on=("b",)),
+            Stage("b", lambda: None, depends_on=("a",)),
+        ])
+
+    with pytest.raises(ValueError, match="inexistentes"):
+        run_stages([Stage("pdf", lambda: None, depends_on=("chart",))])
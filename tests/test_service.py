@@ -0,0 +1,121 @@
+import asyncio
+import json
+import os
+import pandas as pd
+import pytest
+from src.service import MetricsService, write_run_marker
+from src.transformer import COL_DATA, COL_FATURAMENTO, COL_CUSTOS, COL_LUCRO, calculate_metrics
+
+
+async def _get(port: int, target: str):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {target} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    head, body = raw.split(b"\r\n\r\n", 1)
+    status = int(head.split()[1])
+    return status, json.loads(body)
+
+
+def _dados(fator: float = 1.0) -> pd.DataFrame:
+    return pd.DataFrame({
+        COL_DATA: pd.to_datetime(["2024-03-01", "2024-01-15", "2024-02-10", "2024-02-10"]),
+        COL_FATURAMENTO: [400.0 * fator, 100.0, 200.0, 300.0],
+        COL_CUSTOS: [40.0, 10.0, 20.0, 30.0],
+        COL_LUCRO: [400.0 * fator - 40.0, 90.0, 180.0, 270.0],
+    })
+
+
+# -----------------------------------------------------------
+# I. Rotas de métricas e séries com filtro de datas
+# -----------------------------------------------------------
+def test_service_metricas_e_series_com_filtro_de_datas(tmp_path):
+    """
+    Testa se /metrics retorna os mesmos totais de calculate_metrics para o
+    recorte de datas, se /series agrega por dia e se erros viram 400/404.
+    """
+    cargas = []
+
+    def loader():
+        cargas.append(1)
+        return _dados()
+
+    async def cenario():
+        service = MetricsService(loader, marker_path=str(tmp_path / "_last_run.json"))
+        server = await service.start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            status, metricas = await _get(port, "/metrics?start=2024-02-01&end=2024-02-29")
+            _, serie = await _get(port, "/series?end=2024-02-29")
+            _, repetida = await _get(port, "/metrics?start=2024-02-01&end=2024-02-29")
+            invalida = await _get(port, "/metrics?start=ontem")
+            inexistente = await _get(port, "/relatorio")
+        return status, metricas, serie, repetida, invalida, inexistente
+
+    status, metricas, serie, repetida, invalida, inexistente = asyncio.run(cenario())
+
+    df = _dados()
+    esperado = calculate_metrics(df[(df[COL_DATA] >= "2024-02-01") & (df[COL_DATA] <= "2024-02-29")])
+    assert status == 200
+    assert {k: metricas[k] for k in esperado} == esperado
+    assert metricas["rows"] == 2
+    assert repetida == metricas
+    assert len(cargas) == 1, "Os dados devem ser carregados uma única vez."
+
+    assert [p[COL_DATA] for p in serie["points"]] == ["2024-01-15", "2024-02-10"]
+    assert serie["points"][1][COL_FATURAMENTO] == pytest.approx(500.0)
+
+    assert invalida[0] == 400
+    assert inexistente[0] == 404
+
+
+# -----------------------------------------------------------
+# II. Invalidação do cache após nova execução do pipeline
+# -----------------------------------------------------------
+def test_service_recarrega_apos_nova_execucao(tmp_path):
+    """
+    Testa se o serviço recarrega os dados e invalida o cache quando o
+    marcador de execução do pipeline é atualizado.
+    """
+    versoes = iter([_dados(1.0), _dados(2.0)])
+    write_run_marker(str(tmp_path), "ok")
+
+    async def cenario():
+        service = MetricsService(lambda: next(versoes), marker_path=str(tmp_path / "_last_run.json"))
+        server = await service.start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            _, antes = await _get(port, "/metrics")
+            # Nova execução do pipeline (mtime do marcador muda)
+            marker = tmp_path / "_last_run.json"
+            stat = os.stat(marker)
+            write_run_marker(str(tmp_path), "ok")
+            os.utime(marker, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+            _, depois = await _get(port, "/metrics")
+        return antes, depois
+
+    antes, depois = asyncio.run(cenario())
+
+    assert antes["faturamento_total"] == pytest.approx(1000.0)
+    assert depois["faturamento_total"] == pytest.approx(1400.0)
+
+
+def test_service_cache_de_respostas_limitado(tmp_path):
+    """
+    Testa se o cache de respostas mantém no máximo `cache_size` recortes,
+    descartando o menos usado recentemente.
+    """
+    async def cenario():
+        service = MetricsService(_dados, cache_size=2)
+        for target in ("/metrics?end=2024-01-31", "/metrics?end=2024-02-29",
+                       "/metrics?end=2024-01-31", "/series?end=2024-03-31"):
+            status, _ = await service.handle("GET", target)
+            assert status == 200
+        return list(service._cache)
+
+    chaves = asyncio.run(cenario())
+
+    assert [(rota, fim.strftime("%Y-%m-%d")) for rota, _, fim in chaves] == [
+        ("/metrics", "2024-01-31"), ("/series", "2024-03-31"),
+    ]
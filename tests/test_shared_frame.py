@@ -0,0 +1,67 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.shared_frame import attach_frame, shared_frame
+from src.transformer import COL_DATA, COL_FATURAMENTO, COL_CUSTOS
+from src.visualizer import ChartRenderer, render_charts
+
+pytest.importorskip("pyarrow")
+
+
+def _dados(rows: int = 500) -> pd.DataFrame:
+    return pd.DataFrame({
+        COL_DATA: pd.date_range("2024-01-01", periods=rows, freq="D"),
+        COL_FATURAMENTO: np.arange(rows, dtype=float),
+        COL_CUSTOS: np.arange(rows, dtype=float) / 2,
+    })
+
+
+def _soma_no_worker(handle) -> float:
+    return float(handle.attach()[COL_FATURAMENTO].sum())
+
+
+# -----------------------------------------------------------
+# I. Publicação, anexação somente leitura e limpeza
+# -----------------------------------------------------------
+def test_shared_frame_anexa_somente_leitura_e_remove_arquivo(tmp_path):
+    """
+    Testa se o DataFrame publicado é reaberto igual e sem cópia gravável,
+    se workers de outro processo o anexam e se o arquivo é removido ao sair
+    do bloco, inclusive em caso de erro.
+    """
+    df = _dados()
+
+    with shared_frame(df, directory=str(tmp_path)) as handle:
+        anexado = attach_frame(handle)
+        pd.testing.assert_frame_equal(anexado, df, check_dtype=False)
+        assert not anexado[COL_FATURAMENTO].to_numpy().flags.writeable
+
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            assert executor.submit(_soma_no_worker, handle).result() == df[COL_FATURAMENTO].sum()
+
+    assert not os.path.exists(handle.path)
+
+    with pytest.raises(RuntimeError):
+        with shared_frame(df, directory=str(tmp_path)) as handle:
+            raise RuntimeError("falha na execução")
+    assert not os.path.exists(handle.path)
+
+
+# -----------------------------------------------------------
+# II. Renderização em processos a partir do frame compartilhado
+# -----------------------------------------------------------
+def test_render_charts_em_processos_usa_frame_compartilhado():
+    """
+    Testa se a renderização em processos (frames compartilhados) produz os
+    mesmos bytes da renderização em threads.
+    """
+    frames = [_dados(50), _dados(80)]
+    renderer = ChartRenderer(figsize=(4, 2), dpi=50)
+
+    em_processos = render_charts(frames, fmt="png", renderer=renderer, max_workers=2, use_processes=True)
+    em_threads = render_charts(frames, fmt="png", renderer=renderer)
+
+    assert em_processos == em_threads
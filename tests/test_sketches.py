@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.sketches import MetricSketches, SpaceSaving, TDigest, write_sketch_report
+from src.storage import MemoryStorage
+from src.transformer import COL_FATURAMENTO
+
+QUANTIS = [0.01, 0.1, 0.5, 0.9, 0.95, 0.99]
+
+
+def _tickets(rows: int = 400_000) -> np.ndarray:
+    # Ticket assimétrico (cauda longa), como faturamento por venda
+    return np.random.default_rng(3).lognormal(5, 1.2, rows)
+
+
+def _vendas(rows: int = 200_000) -> pd.DataFrame:
+    rng = np.random.default_rng(8)
+    return pd.DataFrame({
+        "produto": np.char.add("p", (rng.zipf(1.4, rows) % 3000).astype(str)),
+        "filial": rng.choice(["centro", "norte", "sul", "leste"], rows, p=[0.4, 0.3, 0.2, 0.1]),
+        COL_FATURAMENTO: rng.uniform(0, 500, rows).round(2),
+    })
+
+
+# -----------------------------------------------------------
+# I. t-digest contra os quantis exatos do pandas
+# -----------------------------------------------------------
+@pytest.mark.parametrize("modo", ["lote_unico", "blocos", "merge"])
+def test_tdigest_respeita_limite_de_erro(modo):
+    """
+    Testa se a estimativa de cada quantil fica entre os quantis exatos de
+    posição q ± rank_error(q), alimentando tudo de uma vez, em blocos ou
+    mesclando digests independentes.
+    """
+    valores = _tickets()
+    blocos = np.array_split(valores, 23)
+    if modo == "lote_unico":
+        digest = TDigest().update(valores)
+    elif modo == "blocos":
+        digest = TDigest()
+        for bloco in blocos:
+            digest.update(bloco)
+    else:
+        digest = TDigest()
+        for parcial in [TDigest().update(bloco) for bloco in blocos]:
+            digest.merge(parcial)
+
+    exato = pd.Series(valores)
+    assert digest.count == len(valores)
+    assert len(digest.means) <= digest.compression  # memória limitada
+    for q in QUANTIS:
+        erro = digest.rank_error(q)
+        estimado = digest.quantile(q)
+        assert exato.quantile(max(q - erro, 0)) <= estimado <= exato.quantile(min(q + erro, 1)), q
+
+
+def test_tdigest_ignora_ausentes_e_vazio():
+    """Testa se NaN é ignorado e se o digest vazio devolve NaN."""
+    assert np.isnan(TDigest().quantile(0.5))
+    digest = TDigest().update([np.nan, 1.0, 2.0, 3.0, np.nan])
+    assert digest.count == 3
+    assert digest.quantile(0.0) == 1.0 and digest.quantile(1.0) == 3.0
+
+
+# -----------------------------------------------------------
+# II. Space-Saving contra o groupby exato
+# -----------------------------------------------------------
+def test_space_saving_mesclado_respeita_limites():
+    """
+    Testa, com resumos por bloco mesclados, se valor − erro ≤ real ≤ valor
+    para cada chave, se erro e chaves fora do resumo ficam ≤ W / capacity e
+    se as chaves marcadas como garantidas estão no top-N exato.
+    """
+    df = _vendas()
+    capacidade = 150
+    resumo = SpaceSaving(capacidade)
+    for inicio in range(0, len(df), 12_000):
+        bloco = df.iloc[inicio:inicio + 12_000]
+        resumo.merge(SpaceSaving(capacidade).update(bloco["produto"], bloco[COL_FATURAMENTO]))
+
+    exato = df.groupby("produto")[COL_FATURAMENTO].sum()
+    limite = exato.sum() / capacidade
+    real = exato[resumo.counts.index]
+
+    assert len(resumo.counts) == capacidade
+    assert resumo.total == pytest.approx(exato.sum())
+    assert ((resumo.counts - resumo.errors) <= real + 1e-6).all()
+    assert (real <= resumo.counts + 1e-6).all()
+    assert resumo.errors.max() <= resumo.floor <= limite
+    assert exato.drop(resumo.counts.index).max() <= resumo.floor
+
+    top = resumo.top(10, "produto")
+    garantidos = top.loc[top["garantido"], "produto"]
+    assert len(garantidos) >= 5
+    assert set(garantidos) <= set(exato.nlargest(10).index)
+
+
+# -----------------------------------------------------------
+# III. Saída da etapa de métricas
+# -----------------------------------------------------------
+def test_metric_sketches_em_blocos_e_relatorio():
+    """
+    Testa se feed (blocos) e merge de execuções parciais dão o mesmo
+    resumo, com dimensões ausentes ignoradas e JSON gravado no storage.
+    """
+    df = _vendas(50_000)
+    inteiro = MetricSketches(["filial", "regiao"], top_n=3, chunk_rows=7_000).feed(df)
+    metade = MetricSketches(["filial", "regiao"], top_n=3).update(df.iloc[:25_000])
+    metade.merge(MetricSketches(["filial", "regiao"], top_n=3).update(df.iloc[25_000:]))
+
+    storage = MemoryStorage()
+    resumo = write_sketch_report(inteiro, "r/aprox.json", storage)
+
+    assert inteiro.skipped == ["regiao"]
+    assert list(resumo["top"]) == ["filial"]
+    assert [r["filial"] for r in resumo["top"]["filial"]] == ["centro", "norte", "sul"]
+    assert resumo["top"]["filial"] == metade.summary()["top"]["filial"]
+    assert resumo["ticket_mediano"] == pytest.approx(df[COL_FATURAMENTO].median(), rel=0.02)
+    assert resumo["ticket_p95"] == pytest.approx(df[COL_FATURAMENTO].quantile(0.95), rel=0.01)
+    assert b'"ticket_p95"' in storage.read_bytes("r/aprox.json")
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+from src.sqlite_store import SQLiteStore
+from src.transformer import COL_DATA, COL_FATURAMENTO, COL_CUSTOS, COL_LUCRO, calculate_metrics, prepare_chart_data
+
+
+def _dados(rows: int = 3000, seed: int = 3) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    faturamento = rng.integers(0, 500_000, rows) / 100
+    custos = rng.integers(0, 300_000, rows) / 100
+    faturamento[::97] = np.nan
+    return pd.DataFrame({
+        COL_DATA: pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 120, rows), unit="D"),
+        "loja": rng.choice(["norte", "sul", "leste"], rows),
+        COL_FATURAMENTO: faturamento,
+        COL_CUSTOS: custos,
+        COL_LUCRO: faturamento - custos,
+    })
+
+
+# -----------------------------------------------------------
+# I. Agregações em SQL idênticas ao caminho pandas
+# -----------------------------------------------------------
+def test_sqlite_agregacoes_iguais_ao_pandas(tmp_path):
+    """
+    Testa se calculate_metrics e prepare_chart_data em SQL retornam o mesmo
+    que as versões pandas, com e sem filtro de datas e de dimensão.
+    """
+    df = _dados()
+    store = SQLiteStore(str(tmp_path / "consolidado.sqlite"), dimensions=["loja"])
+    store.write(df, batch_size=1000)
+
+    assert store.calculate_metrics() == calculate_metrics(df)
+
+    recorte = df[(df[COL_DATA] >= "2024-02-01") & (df[COL_DATA] <= "2024-02-29") & (df["loja"] == "sul")]
+    assert store.calculate_metrics("2024-02-01", "2024-02-29", filters={"loja": "sul"}) == calculate_metrics(recorte)
+
+    pd.testing.assert_frame_equal(
+        store.prepare_chart_data().reset_index(drop=True),
+        prepare_chart_data(df).reset_index(drop=True),
+        check_dtype=False,
+    )
+
+
+# -----------------------------------------------------------
+# II. Índices e regravação
+# -----------------------------------------------------------
+def test_sqlite_cria_indices_e_substitui_dados(tmp_path):
+    """
+    Testa se os índices de data e dimensões são criados e se uma nova
+    gravação substitui o conteúdo anterior.
+    """
+    import sqlite3
+
+    path = str(tmp_path / "consolidado.sqlite")
+    store = SQLiteStore(path, dimensions=["loja"])
+    store.write(_dados(rows=50))
+    store.write(_dados(rows=20, seed=9))
+
+    with sqlite3.connect(path) as conn:
+        indices = {row[1] for row in conn.execute("PRAGMA index_list(consolidado)")}
+        total = conn.execute("SELECT COUNT(*) FROM consolidado").fetchone()[0]
+
+    assert indices == {"idx_data", "idx_loja"}
+    assert total == 20
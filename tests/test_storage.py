@@ -0,0 +1,129 @@
+import io
+import os
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+from src.storage import LocalStorage, MemoryStorage
+from src.transformer import COL_DATA, COL_FATURAMENTO, COL_CUSTOS, COL_LUCRO
+
+
+# -----------------------------------------------------------
+# I. Semântica de arquivos e diretórios do MemoryStorage
+# -----------------------------------------------------------
+@pytest.mark.parametrize("fabrica", [MemoryStorage, None], ids=["memoria", "local"])
+def test_storage_arquivos_e_diretorios(fabrica, tmp_path):
+    """
+    Testa se MemoryStorage e LocalStorage se comportam igual em escrita
+    atômica, texto/binário, listagem, renomeação e remoção.
+    """
+    storage = fabrica() if fabrica else LocalStorage()
+    raiz = "dados" if fabrica else str(tmp_path / "dados")
+
+    storage.write_bytes(f"{raiz}/a/um.bin", b"\x00\x01")
+    with storage.atomic_write(f"{raiz}/a/dois.txt", "w") as f:
+        f.write("olá")
+    storage.makedirs(f"{raiz}/vazio")
+
+    assert sorted(storage.listdir(raiz)) == ["a", "vazio"]
+    assert sorted(storage.listdir(f"{raiz}/a")) == ["dois.txt", "um.bin"]
+    assert storage.read_bytes(f"{raiz}/a/um.bin") == b"\x00\x01"
+    with storage.open(f"{raiz}/a/dois.txt", "r") as f:
+        assert f.read() == "olá"
+    assert storage.stat(f"{raiz}/a/um.bin")[0] == 2
+
+    storage.move(f"{raiz}/a/um.bin", f"{raiz}/b/um.bin")
+    assert not storage.exists(f"{raiz}/a/um.bin") and storage.exists(f"{raiz}/b/um.bin")
+
+    storage.rmtree(f"{raiz}/b")
+    assert not storage.exists(f"{raiz}/b")
+    with pytest.raises(FileNotFoundError):
+        storage.listdir(f"{raiz}/inexistente")
+    with pytest.raises(FileNotFoundError):
+        storage.open(f"{raiz}/a/inexistente.bin", "rb")
+
+
+def test_escrita_atomica_falha_nao_publica_arquivo():
+    """Testa se uma exceção durante a escrita não deixa arquivo final nem temporário."""
+    storage = MemoryStorage({"out/existente.txt": "antigo"})
+
+    with pytest.raises(RuntimeError):
+        with storage.atomic_write("out/existente.txt", "w") as f:
+            f.write("novo")
+            raise RuntimeError("falha no meio da escrita")
+
+    assert storage.files == {"out/existente.txt": b"antigo"}
+
+
+# -----------------------------------------------------------
+# II. Leitores e geradores com BytesIO / MemoryStorage
+# -----------------------------------------------------------
+def test_reader_e_geradores_sem_disco():
+    """
+    Testa se o reader lê planilhas do MemoryStorage e se Excel, gráfico e
+    PDF aceitam tanto caminhos no storage quanto BytesIO.
+    """
+    from src.excel_generator import generate_excel_report
+    from src.pdf_generator import generate_pdf_report_advanced
+    from src.reader import load_excel_files, read_excel_file
+    from src.visualizer import generate_plot
+
+    wb = Workbook()
+    wb.active.append(["Data", "Faturamento", "Custos"])
+    wb.active.append(["2025-01-01", 100, 40])
+    buffer = io.BytesIO()
+    wb.save(buffer)
+
+    storage = MemoryStorage({"raw/filial.xlsx": buffer.getvalue(), "raw/notas.txt": "ignorado"})
+    files = load_excel_files("raw", storage=storage)
+    assert list(files) == ["filial.xlsx"]
+    assert list(read_excel_file(io.BytesIO(buffer.getvalue())).columns) == ["data", "faturamento", "custos"]
+
+    df = pd.DataFrame({
+        COL_DATA: pd.to_datetime(["2025-01-01", "2025-01-02"]),
+        COL_FATURAMENTO: [100.0, 200.0], COL_CUSTOS: [40.0, 50.0], COL_LUCRO: [60.0, 150.0],
+    })
+    excel = io.BytesIO()
+    generate_excel_report(df, "reports", "R$ #,##0.00", "dd/mm/yyyy", output=excel)
+    assert excel.getvalue().startswith(b"PK")
+
+    generate_plot(df, "reports/grafico.png", storage=storage)
+    assert storage.read_bytes("reports/grafico.png").startswith(b"\x89PNG")
+
+    metrics = {"faturamento_total": 300.0, "custos_totais": 90.0, "lucro_total": 210.0, "lucro_percentual": 70.0}
+    generate_pdf_report_advanced(metrics, "reports/relatorio.pdf", chart_path="reports/grafico.png", storage=storage)
+    pdf = io.BytesIO()
+    generate_pdf_report_advanced(metrics, pdf, chart_path=storage.read_bytes("reports/grafico.png"))
+
+    assert storage.read_bytes("reports/relatorio.pdf").startswith(b"%PDF")
+    assert pdf.getvalue().startswith(b"%PDF")
+
+
+def test_pdf_le_logo_e_grafico_do_storage(tmp_path, monkeypatch):
+    """
+    Testa se o logo e o gráfico do PDF vêm do MemoryStorage (e não de um
+    arquivo homônimo no disco) e se trocar o logo em memória refaz o template.
+    """
+    from PIL import Image
+    from src.pdf_generator import generate_pdf_report_advanced, get_report_template
+
+    def png(cor) -> bytes:
+        buffer = io.BytesIO()
+        Image.new("RGB", (40, 20), cor).save(buffer, format="PNG")
+        return buffer.getvalue()
+
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "logo.png").write_bytes(b"nao e uma imagem")  # homônimo no disco: não deve ser lido
+    storage = MemoryStorage({"logo.png": png("red"), "reports/grafico.png": png("blue")})
+
+    metrics = {"faturamento_total": 300.0, "custos_totais": 90.0, "lucro_total": 210.0, "lucro_percentual": 70.0}
+    generate_pdf_report_advanced(metrics, "reports/relatorio.pdf", chart_path="reports/grafico.png",
+                                 logo_path="logo.png", storage=storage)
+
+    template = get_report_template("logo.png", storage=storage)
+    assert template.logo is not None
+    assert storage.read_bytes("reports/relatorio.pdf").count(b"/Subtype /Image") == 2
+    assert sorted(os.listdir(tmp_path)) == ["logo.png"]
+
+    storage.write_bytes("logo.png", png("green"))
+    assert get_report_template("logo.png", storage=storage) is not template
@@ -1,3 +1,5 @@
+import time
+import numpy as np
 import pandas as pd
 import pytest
 import os
@@ -54,4 +56,98 @@ def test_generate_plot_creates_file(tmp_path):
     assert file_size > 1000, \
         f"O arquivo foi criado, mas seu tamanho ({file_size} bytes) sugere que está vazio ou corrompido."
         
-    logger.info(f"Teste de geração de PNG concluído com sucesso. Arquivo salvo em: {output_path}")
\ No newline at end of file
+    logger.info(f"Teste de geração de PNG concluído com sucesso. Arquivo salvo em: {output_path}")
+
+# -----------------------------------------------------------
+# Teste: Renderizador headless em memória (ChartRenderer)
+# -----------------------------------------------------------
+
+def test_chart_renderer_retorna_bytes_png_svg_e_paralelo():
+    """
+    Testa se o ChartRenderer gera PNG/SVG em memória e se render_charts
+    renderiza vários gráficos em paralelo (threads) mantendo a ordem.
+    """
+    from src.visualizer import ChartRenderer, render_charts
+
+    # 1. Setup
+    df_chart_data = pd.DataFrame({
+        COL_DATA: pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-03"]),
+        COL_FATURAMENTO: [100.0, 150.0, 200.0],
+        COL_CUSTOS: [30.0, 50.0, 60.0],
+        COL_LUCRO: [70.0, 100.0, 140.0]
+    })
+    renderer = ChartRenderer()
+
+    # 2. Action
+    png = renderer.render(df_chart_data, fmt="png")
+    svg = renderer.render(df_chart_data, fmt="svg")
+    lote = render_charts([df_chart_data] * 4, renderer=renderer, max_workers=4)
+
+    # 3. Assertion
+    assert png.startswith(b"\x89PNG")
+    assert b"<svg" in svg
+    assert len(lote) == 4 and all(img.startswith(b"\x89PNG") for img in lote)
+
+    with pytest.raises(ValueError):
+        renderer.render(df_chart_data, fmt="gif")
+
+
+# -----------------------------------------------------------
+# Teste: Downsampling preserva picos e mantém o tempo de renderização estável
+# -----------------------------------------------------------
+
+def _serie_diaria(n_dias: int) -> pd.DataFrame:
+    rng = np.random.default_rng(42)
+    faturamento = rng.normal(1000.0, 100.0, n_dias)
+    custos = rng.normal(600.0, 80.0, n_dias)
+    return pd.DataFrame({
+        COL_DATA: pd.date_range("2000-01-01", periods=n_dias, freq="D"),
+        COL_FATURAMENTO: faturamento,
+        COL_CUSTOS: custos,
+        COL_LUCRO: faturamento - custos,
+    })
+
+
+def test_downsample_chart_data_preserva_picos_e_vales():
+    """
+    Testa se o downsampling respeita o limite de pontos e mantém os extremos
+    globais de faturamento e custos, além do primeiro e último dia.
+    """
+    from src.visualizer import downsample_chart_data
+
+    df = _serie_diaria(50_000)
+    reduzido = downsample_chart_data(df, max_points=500)
+
+    assert len(reduzido) <= 500
+    assert reduzido[COL_DATA].is_monotonic_increasing
+    for col in (COL_FATURAMENTO, COL_CUSTOS):
+        assert reduzido[col].max() == df[col].max()
+        assert reduzido[col].min() == df[col].min()
+    assert reduzido[COL_DATA].iloc[0] == df[COL_DATA].iloc[0]
+    assert reduzido[COL_DATA].iloc[-1] == df[COL_DATA].iloc[-1]
+
+    # Séries curtas não são alteradas
+    curto = _serie_diaria(30)
+    assert downsample_chart_data(curto, max_points=500) is curto
+
+
+def test_tempo_de_renderizacao_estavel_com_entrada_crescente():
+    """
+    Testa se o tempo de renderização permanece aproximadamente constante
+    quando a entrada cresce 100x (o número de pontos desenhados é limitado).
+    """
+    from src.visualizer import ChartRenderer
+
+    renderer = ChartRenderer(max_points=500)
+
+    def tempo_render(df):
+        renderer.render(df)  # aquecimento (fontes, caches do Matplotlib)
+        inicio = time.perf_counter()
+        renderer.render(df)
+        return time.perf_counter() - inicio
+
+    t_pequeno = tempo_render(_serie_diaria(1_000))
+    t_grande = tempo_render(_serie_diaria(100_000))
+
+    assert t_grande < 3 * t_pequeno + 0.5, \
+        f"Renderização não ficou estável: {t_pequeno:.3f}s (1k) vs {t_grande:.3f}s (100k)"
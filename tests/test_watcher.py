@@ -0,0 +1,96 @@
+import os
+import pytest
+from openpyxl import Workbook
+from src.watcher import RawFolderWatcher, watch
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _write_workbook(path, valor=1000):
+    wb = Workbook()
+    wb.active.append(["data", "faturamento", "custos"])
+    wb.active.append(["2025-01-01", valor, 500])
+    wb.save(path)
+
+
+# -----------------------------------------------------------
+# I. Debounce
+# -----------------------------------------------------------
+def test_watcher_so_entrega_mudancas_estaveis(tmp_path):
+    """
+    Testa se a mudança só é entregue depois que a pasta fica estável
+    pelo tempo de debounce, e apenas uma vez.
+    """
+    clock = FakeClock()
+    watcher = RawFolderWatcher(str(tmp_path), debounce=2.0, clock=clock)
+    arquivo = tmp_path / "vendas.xlsx"
+    _write_workbook(arquivo)
+
+    assert watcher.poll() is None          # primeira observação
+    clock.now = 1.0
+    assert watcher.poll() is None          # ainda dentro do debounce
+    clock.now = 2.5
+    assert watcher.poll() == {str(arquivo)}
+    clock.now = 10.0
+    assert watcher.poll() is None          # nada novo
+
+    # Arquivo removido também é uma mudança
+    os.remove(arquivo)
+    assert watcher.poll() is None
+    clock.now = 13.0
+    assert watcher.poll() == {str(arquivo)}
+
+
+# -----------------------------------------------------------
+# II. Arquivos ainda em escrita
+# -----------------------------------------------------------
+def test_watcher_ignora_planilha_escrita_pela_metade(tmp_path):
+    """
+    Testa se uma planilha incompleta (ZIP truncado) não dispara o
+    reprocessamento, e se ela é entregue quando a escrita termina.
+    """
+    clock = FakeClock()
+    watcher = RawFolderWatcher(str(tmp_path), debounce=1.0, clock=clock)
+
+    completo = tmp_path / "completo.xlsx"
+    _write_workbook(completo)
+    conteudo = completo.read_bytes()
+    os.remove(completo)
+
+    parcial = tmp_path / "upload.xlsx"
+    parcial.write_bytes(conteudo[: len(conteudo) // 2])
+    (tmp_path / "~$upload.xlsx").write_bytes(b"lock")  # arquivo de trava do Excel
+
+    watcher.poll()
+    clock.now = 5.0
+    assert watcher.poll() is None, "Planilha truncada não deveria disparar o pipeline."
+
+    parcial.write_bytes(conteudo)
+    watcher.poll()
+    clock.now = 10.0
+    assert watcher.poll() == {str(parcial)}
+
+
+def test_watch_executa_callback_e_sobrevive_a_erros(tmp_path):
+    """Testa se o laço chama o callback nas mudanças e continua após uma falha."""
+    clock = FakeClock()
+    watcher = RawFolderWatcher(str(tmp_path), debounce=0.0, clock=clock)
+    _write_workbook(tmp_path / "a.xlsx")
+    chamadas = []
+
+    def on_change(changed):
+        chamadas.append(changed)
+        raise RuntimeError("falha simulada")
+
+    def fake_sleep(_):
+        clock.now += 1.0
+
+    watch(on_change, watcher, interval=1.0, max_cycles=4, sleep=fake_sleep)
+
+    assert len(chamadas) == 1